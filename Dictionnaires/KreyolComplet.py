@@ -20,6 +20,26 @@ Pipeline automatique intégré:
 
 Usage simple: python KreyolComplet.py
 
+Options:
+  --workers N      Tokenisation et comptage répartis sur N processus
+                   (sortie identique à l'exécution en série)
+  --full-rebuild   Ignore l'état du corpus (etat/) et recompte tout le corpus
+  --ngram-model M  Modèle des prédictions : kneser-ney (défaut, scores lissés
+                   précalculés) ou mle (fréquences relatives brutes)
+  --evaluate       Évaluation hors ligne : construit le modèle sur 90 % du
+                   corpus et rejoue les autres textes (précision top-k,
+                   économie de frappes) ; aucun fichier d'assets n'est écrit
+  --test-fraction F  Part des textes mise de côté pour --evaluate (défaut 0.1)
+  --max-asset-bytes N  Budget en octets du fichier de n-grammes : les
+                   prédictions les moins utiles sont retirées
+  --max-contexts N Nombre maximal de clés du fichier de n-grammes
+  --compact-json   Assets JSON sans indentation ni espaces (même contenu)
+  --compress M     Variante précompressée de chaque asset JSON : gzip ou zstd
+  --profile DOSSIER  Profil cProfile de chaque étape dans DOSSIER
+  --tracemalloc    Mesure en plus le pic mémoire Python de chaque étape
+                   (tracemalloc, qui ralentit nettement les étapes) ; par
+                   défaut, le rapport ne garde que les temps et le pic RSS
+
 Fait avec ❤️ pour préserver le Kreyòl Guadeloupéen
 """
 
@@ -28,29 +48,49 @@ import re
 import os
 import shutil
 import sys
-from collections import Counter, defaultdict
 from datetime import datetime
+from functools import cached_property
 from pathlib import Path
 
+from cache_corpus import CacheCorpus
+from comptage_ngrammes import CompteurNgrammes, compter_en_parallele
+from ecriture_assets import BilanTailles, ecrire_json, ecrire_paires_json, methode_compression
+from elagage_ngrammes import afficher_elagage, elaguer_predictions
+from etat_corpus import EtatCorpus, empreintes_au_passage, fusionner_frequences, remplacer_frequences
+from evaluation_predictions import (PART_TEST_PAR_DEFAUT, EvaluateurPredictions, afficher_evaluation,
+                                    ecrire_evaluation, separer_textes, tokeniser_textes_test)
+from index_corrections import (chemin_index_corrections, ecrire_index_corrections,
+                               valider_index_corrections)
+from index_prefixes import chemin_index, ecrire_index_prefixes, valider_index_prefixes
+from instrumentation import MesureEtapes
+from modele_kneser_ney import MODELES, ModeleKneserNey, chemin_poids_repli
+from ngrams_binaires import chemin_binaire, ecrire_ngrams_binaires, valider_ngrams_binaires
+from options import option_presente, valeur_option
+from projection_colonnes import COLONNES_TEXTE, HAS_DATASETS, charger_colonnes, lots_de_colonnes
+from statistiques_lexique import StatistiquesLexique
+from tokenisation import iterer_contenus, tokeniser_corpus
+
 # Configuration d'encodage pour Windows
 if sys.platform.startswith('win'):
     import codecs
     sys.stdout = codecs.getwriter('utf-8')(sys.stdout.buffer, 'strict')
     sys.stderr = codecs.getwriter('utf-8')(sys.stderr.buffer, 'strict')
 
-# Gestion optionnelle des imports
-try:
-    from datasets import load_dataset
-    HAS_DATASETS = True
-except ImportError:
-    HAS_DATASETS = False
-
+# Gestion optionnelle des imports (datasets : cf. projection_colonnes)
 try:
     from dotenv import load_dotenv
     HAS_DOTENV = True
 except ImportError:
     HAS_DOTENV = False
 
+# Dataset Hugging Face du corpus créole
+DEPOT_HF = "POTOMITAN/PawolKreyol-gfc"
+# Seules colonnes lues (les anciennes versions du dataset nomment le texte "text")
+COLONNES_HF = COLONNES_TEXTE + ("text", "source")
+
+# Motif d'un mot créole : lettres (diacritiques compris) et traits d'union
+PATTERN_MOT = re.compile(r'\b[a-zA-ZàáâäèéêëìíîïòóôöùúûüçñÀÁÂÄÈÉÊËÌÍÎÏÒÓÔÖÙÚÛÜÇÑ\-]{2,}\b')
+
 class KreyolPipelineUnique:
     """Pipeline unique automatique pour le système créole"""
     
@@ -60,26 +100,64 @@ class KreyolPipelineUnique:
         self.chemin_dict = "../clavier_creole/assets/creole_dict.json"
         self.chemin_ngrams = "../clavier_creole/assets/creole_ngrams.json"
         self.chemin_rapport = "RAPPORT_LINGUISTIQUE.md"
+        # Rapport d'exécution (durée, mémoire, volumes de chaque étape)
+        self.chemin_rapport_execution = "rapport_execution_creole.json"
+        # Résultats de --evaluate (précision des prédictions sur textes mis de côté)
+        self.chemin_rapport_evaluation = "rapport_evaluation_creole.json"
         # Chemins pour synchronisation Android
         self.chemin_dict_android = "../android_keyboard/app/src/main/assets/creole_dict.json"
         self.chemin_ngrams_android = "../android_keyboard/app/src/main/assets/creole_ngrams.json"
-        self.hf_token = None
+        # État du corpus (empreintes et comptes) pour la reconstruction incrémentale
+        self.chemin_etat = "etat/creole_corpus.npz"
         self.textes_kreyol = []
-        self.dictionnaire_actuel = {}
-        self.ngrams_actuels = {}
+        self.corpus_tokenise = None  # Flux d'identifiants partagé par les étapes
+        self.compteur_ngrammes = None  # Comptes uni/bi/trigrammes (NumPy)
+        # --workers N : tokenisation et comptage répartis sur N processus.
+        # Les fichiers produits sont identiques à ceux d'une exécution en série.
+        self.workers = max(1, valeur_option("--workers", 1, int))
+        # --ngram-model : kneser-ney (scores lissés, cf. modele_kneser_ney.py) ou mle
+        self.modele_ngrammes = valeur_option("--ngram-model", "kneser-ney")
+        if self.modele_ngrammes not in MODELES:
+            print(f"⚠️ Modèle N-grams inconnu '{self.modele_ngrammes}', kneser-ney utilisé "
+                  f"(choix: {', '.join(MODELES)})")
+            self.modele_ngrammes = "kneser-ney"
+        self.modele_lisse = None
+        # --max-asset-bytes / --max-contexts : budget de l'asset de n-grammes,
+        # atteint en retirant les prédictions les moins utiles (cf. elagage_ngrammes.py)
+        self.max_octets_ngrams = valeur_option("--max-asset-bytes", None, int)
+        self.max_contextes_ngrams = valeur_option("--max-contexts", None, int)
+        self.rapport_elagage = None
+        # --compact-json / --compress : format des assets JSON (cf. ecriture_assets.py)
+        self.json_compact = option_presente("--compact-json")
+        self.compression = methode_compression(valeur_option("--compress"))
+        # Sans --full-rebuild, seuls les textes modifiés depuis la dernière
+        # exécution sont recomptés (cf. etat_corpus.py).
+        self.recomptage_complet = option_presente("--full-rebuild")
+        # --evaluate : apprentissage sur une part du corpus, test sur le reste.
+        # L'état incrémental décrit le corpus complet, il n'est donc pas utilisé.
+        self.evaluation = option_presente("--evaluate")
+        self.part_test = valeur_option("--test-fraction", PART_TEST_PAR_DEFAUT, float)
+        self.textes_test = []
+        if self.evaluation:
+            self.recomptage_complet = True
+        self.etat_precedent = None
+        self.etat_corpus = None
+        self.empreintes_textes = []  # Empreintes calculées pendant la tokenisation
+        # hf_token, dictionnaire_actuel et ngrams_actuels : lus au premier
+        # accès (cf. propriétés), la construction ne touche pas au disque
         self.nouveau_dictionnaire = {}
         self.nouveaux_ngrams = {}
+        self.statistiques_lexique = None  # cf. _statistiques_lexique()
         self.stats_corpus = {}  # Nouvelles statistiques pour le rapport
-        
-        # Affichage d'en-tête
+    
+    def initialiser(self):
+        """En-tête et configuration (.env, token), affichés avant les étapes ;
+        les assets existants ne sont lus qu'à leur première utilisation"""
         self._afficher_entete()
-        
-        # Chargement automatique
-        self._charger_configuration()
-        self._charger_donnees_existantes()
-        
+        token = self.hf_token
         print("✅ Pipeline initialisé")
-    
+        return token
+
     def _afficher_entete(self):
         """Affiche l'en-tête du pipeline"""
         print(" KREYÒL POTOMITAN™ - PIPELINE UNIQUE ET AUTOMATIQUE ")
@@ -91,8 +169,9 @@ class KreyolPipelineUnique:
         print("\n🔧 INITIALISATION")
         print("-" * 30)
     
-    def _charger_configuration(self):
-        """Charge la configuration depuis .env"""
+    @cached_property
+    def hf_token(self):
+        """Token Hugging Face, lu (avec .env) au premier accès"""
         env_paths = [".env", "../.env", "../../.env"]
         env_found = False
         
@@ -112,31 +191,38 @@ class KreyolPipelineUnique:
         # fichier .env) : cette lecture doit donc s'exécuter dans tous les cas
         token = os.getenv('HF_TOKEN') or os.getenv('HF_TOKEN_read_write')
         if token:
-            self.hf_token = token
             print("🔑 Token Hugging Face configuré")
         else:
             print("⚠️ Token Hugging Face non trouvé")
+        return token or None
     
-    def _charger_donnees_existantes(self):
-        """Charge les données existantes si disponibles"""
-        # Dictionnaire existant
+    @cached_property
+    def dictionnaire_actuel(self):
+        """Dictionnaire déjà livré, lu au premier accès ({} s'il est absent)"""
         if os.path.exists(self.chemin_dict):
             try:
                 with open(self.chemin_dict, 'r', encoding='utf-8') as f:
-                    self.dictionnaire_actuel = json.load(f)
-                print(f"📚 Dictionnaire existant: {len(self.dictionnaire_actuel)} mots")
+                    dictionnaire = json.load(f)
+                print(f"📚 Dictionnaire existant: {len(dictionnaire)} mots")
+                return dictionnaire
             except Exception as e:
                 print(f"⚠️ Erreur lecture dictionnaire: {e}")
-        
-        # N-grams existants
+        return {}
+    
+    @cached_property
+    def ngrams_actuels(self):
+        """N-grams déjà livrés, lus au premier accès ({} s'ils sont absents) :
+        à consulter avant `sauvegarder_donnees`, qui remplace le fichier"""
         if os.path.exists(self.chemin_ngrams):
             try:
                 with open(self.chemin_ngrams, 'r', encoding='utf-8') as f:
-                    self.ngrams_actuels = json.load(f)
-                predictions = len([k for k, v in self.ngrams_actuels.items() if isinstance(v, list) and v])
+                    ngrams = json.load(f)
+                predictions = len([k for k, v in ngrams.items() if isinstance(v, list) and v])
                 print(f"🧠 N-grams existants: {predictions} prédictions")
+                return ngrams
             except Exception as e:
                 print(f"⚠️ Erreur lecture N-grams: {e}")
+        return {}
     
     def charger_textes_kreyol(self):
         """Charge les textes créoles depuis Hugging Face ou localement"""
@@ -146,15 +232,35 @@ class KreyolPipelineUnique:
         textes_charges = False
         source_chargement = "Inconnu"
 
-        # Essayer Hugging Face d'abord
-        if HAS_DATASETS:
+        # Cache local : une révision déjà téléchargée est relue depuis le
+        # disque, sans load_dataset. Hors ligne, on reprend le dernier
+        # instantané connu, ou à défaut le dernier fichier de secours importé
+        # (sans nouvelle tentative réseau).
+        cache = CacheCorpus(DEPOT_HF)
+        revision = cache.revision_distante(self.hf_token)
+        # Hub injoignable : pas de sonde des colonnes avant load_dataset
+        hub_joignable = revision is not None
+        if revision:
+            instantane = cache.instantane(revision)
+        else:
+            revision, instantane = cache.dernier_instantane()
+        if instantane:
+            self.textes_kreyol = instantane
+            textes_charges = True
+            source_chargement = f"Cache local (révision {revision[:12]})"
+            print(f"💾 Corpus en cache: {len(instantane)} textes (révision {revision[:12]})")
+
+        # Sinon, Hugging Face
+        if not textes_charges and HAS_DATASETS:
             try:
                 print("🔄 Téléchargement depuis Hugging Face...")
-                print(f"   📡 Connexion au dataset POTOMITAN/PawolKreyol-gfc...")
+                print(f"   📡 Connexion au dataset {DEPOT_HF}...")
                 print(f"   🔑 Token configuré: {'✅ Oui' if self.hf_token else '❌ Non'}")
                 
-                dataset = load_dataset("POTOMITAN/PawolKreyol-gfc", token=self.hf_token)
+                dataset, projetee = charger_colonnes(DEPOT_HF, COLONNES_HF, sonder=hub_joignable,
+                                                     token=self.hf_token, revision=revision)
                 print("   ✅ Dataset récupéré avec succès")
+                print(f"   🎯 Colonnes de texte seules ({'à la lecture' if projetee else 'après ouverture'})")
                 
                 # NOUVEAU: Afficher tous les splits disponibles
                 print(f"   � Splits disponibles: {list(dataset.keys())}")
@@ -162,53 +268,42 @@ class KreyolPipelineUnique:
                     print(f"      - {split_name}: {len(dataset[split_name])} rows")
                 
                 print("   🔍 Extraction des textes de TOUS les splits...")
-                
-                # NOUVEAU: Combiner tous les splits
-                all_items = []
+
+                # Les rows de tous les splits sont lues par lots Arrow et
+                # écrites directement dans l'instantané du cache, sans liste
+                # intermédiaire ni dictionnaire par row.
                 total_rows = 0
-                for split_name in dataset.keys():
-                    split_data = dataset[split_name]
-                    all_items.extend(split_data)
-                    total_rows += len(split_data)
-                    print(f"      ✅ {split_name}: {len(split_data)} rows ajoutées")
-                
-                print(f"   📊 Nombre total de rows dans TOUT le dataset: {total_rows}")
-                
-                # Échantillon des premières rows pour debug
-                print("   🔬 Échantillon des premières rows:")
-                for i in range(min(3, len(all_items))):
-                    item = all_items[i]
-                    print(f"      Row {i+1}: {list(item.keys())}")
-                    if 'Texte' in item:
-                        preview = str(item['Texte'])[:50] + "..." if len(str(item['Texte'])) > 50 else str(item['Texte'])
-                        print(f"         Texte: '{preview}'")
-                    if 'text' in item:
-                        preview = str(item['text'])[:50] + "..." if len(str(item['text'])) > 50 else str(item['text'])
-                        print(f"         text: '{preview}'")
-                
-                self.textes_kreyol = []
                 textes_vides = 0
                 textes_avec_texte = 0
                 textes_avec_text = 0
+                with cache.ecrire(revision or "inconnue") as ecriture:
+                    for split_name in dataset.keys():
+                        split_data = dataset[split_name]
+                        print(f"      Colonnes lues ({split_name}): {split_data.column_names}")
+                        for nombre, colonnes in lots_de_colonnes(split_data, COLONNES_HF):
+                            vides = [None] * nombre
+                            textes, sources = [], []
+                            for i, (texte, source, text, source_text) in enumerate(zip(
+                                    colonnes["Texte"] or vides, colonnes["Source"] or vides,
+                                    colonnes["text"] or vides, colonnes["source"] or vides)):
+                                if texte:
+                                    textes.append(texte)
+                                    sources.append(source if colonnes["Source"] is not None else "Hugging Face")
+                                    textes_avec_texte += 1
+                                elif text:
+                                    textes.append(text)
+                                    sources.append(source_text if colonnes["source"] is not None else "Hugging Face")
+                                    textes_avec_text += 1
+                                else:
+                                    textes_vides += 1
+                                    if textes_vides <= 3:  # Afficher seulement les 3 premiers exemples
+                                        print(f"   ⚠️ Row {total_rows + i + 1} sans texte valide")
+                            ecriture.ajouter_lot(textes, sources)
+                            total_rows += nombre
+                        print(f"      ✅ {split_name}: {len(split_data)} rows ajoutées")
+                self.textes_kreyol = ecriture.textes
                 
-                for i, item in enumerate(all_items):
-                    if "Texte" in item and item["Texte"]:
-                        self.textes_kreyol.append({
-                            "Texte": item["Texte"],
-                            "Source": item.get("Source", "Hugging Face")
-                        })
-                        textes_avec_texte += 1
-                    elif "text" in item and item["text"]:
-                        self.textes_kreyol.append({
-                            "Texte": item["text"],
-                            "Source": item.get("source", "Hugging Face")
-                        })
-                        textes_avec_text += 1
-                    else:
-                        textes_vides += 1
-                        if textes_vides <= 3:  # Afficher seulement les 3 premiers exemples
-                            print(f"   ⚠️ Row {i+1} sans texte valide: {list(item.keys())}")
-                
+                print(f"   📊 Nombre total de rows dans TOUT le dataset: {total_rows}")
                 print(f"   📈 Statistiques d'extraction:")
                 print(f"      - Rows totales (tous splits): {total_rows}")
                 print(f"      - Avec champ 'Texte': {textes_avec_texte}")
@@ -219,7 +314,7 @@ class KreyolPipelineUnique:
                 if self.textes_kreyol:
                     print(f"🎉 TÉLÉCHARGEMENT HUGGING FACE RÉUSSI !")
                     print(f"   ✅ {len(self.textes_kreyol)} textes récupérés")
-                    print(f"   📊 Source: Dataset POTOMITAN/PawolKreyol-gfc")
+                    print(f"   📊 Source: Dataset {DEPOT_HF}")
                     textes_charges = True
                     source_chargement = "Hugging Face"
                 else:
@@ -230,12 +325,12 @@ class KreyolPipelineUnique:
                 print("❌ TÉLÉCHARGEMENT HUGGING FACE ÉCHOUÉ !")
                 print(f"   💥 Erreur: {e}")
                 print("   🔄 Passage au mode fallback local...")
-        else:
+        elif not textes_charges:
             print("❌ TÉLÉCHARGEMENT HUGGING FACE IMPOSSIBLE !")
             print("   📦 Bibliothèque 'datasets' non installée")
             print("   🔄 Passage au mode fallback local...")
         
-        # Fallback local si Hugging Face échoue
+        # Fallback local si Hugging Face échoue (importé dans le cache)
         if not textes_charges:
             print("\n🔄 FALLBACK: Recherche de fichiers locaux...")
             chemins_locaux = [
@@ -249,16 +344,11 @@ class KreyolPipelineUnique:
                 if os.path.exists(chemin):
                     try:
                         print(f"   📁 Fichier trouvé, chargement...")
-                        with open(chemin, 'r', encoding='utf-8') as f:
-                            data = json.load(f)
-                        
-                        if isinstance(data, list):
-                            self.textes_kreyol = data
-                        elif isinstance(data, dict) and "textes" in data:
-                            self.textes_kreyol = data["textes"]
-                        else:
+                        textes = cache.importer_json(chemin)
+                        if textes is None:
                             print(f"   ⚠️ Format inattendu dans {chemin}")
                             continue
+                        self.textes_kreyol = textes
                         
                         print(f"✅ FALLBACK RÉUSSI !")
                         print(f"   📊 {len(self.textes_kreyol)} textes chargés depuis {chemin}")
@@ -283,74 +373,111 @@ class KreyolPipelineUnique:
         print(f"   ✅ Prêt pour traitement")
         
         return True
-    
+
+    def tokeniser_textes(self):
+        """Tokenise le corpus une seule fois pour toutes les étapes suivantes"""
+        print("\n🔤 TOKENISATION DU CORPUS")
+        print("-" * 30)
+
+        if not self.textes_kreyol:
+            print("❌ Aucun texte disponible")
+            return False
+
+        if not self.recomptage_complet:
+            self.etat_precedent = EtatCorpus.charger(self.chemin_etat, PATTERN_MOT)
+
+        if self.etat_precedent is not None:
+            self.etat_corpus, bilan = self.etat_precedent.mettre_a_jour(
+                self.textes_kreyol, PATTERN_MOT, self.workers)
+            self.corpus_tokenise = self.etat_corpus.corpus
+            self.compteur_ngrammes = self.etat_corpus.compteur
+            print(f"♻️ Reconstruction incrémentale ({self.chemin_etat}):")
+            print(f"   - Textes inchangés: {bilan['conserves']}")
+            print(f"   - Textes nouveaux comptés: {bilan['nouveaux']}")
+            print(f"   - Textes retirés: {bilan['retires']}")
+        else:
+            # Les textes passent un à un du chargeur au comptage ; leur empreinte
+            # (pour la prochaine exécution incrémentale) est prise au passage.
+            self.empreintes_textes = []
+            flux = empreintes_au_passage(iterer_contenus(self.textes_kreyol),
+                                         self.empreintes_textes)
+            if self.workers > 1:
+                print(f"⚙️ Tokenisation et comptage répartis sur {self.workers} processus")
+                self.corpus_tokenise, self.compteur_ngrammes = compter_en_parallele(
+                    flux, PATTERN_MOT, self.workers, nombre_textes=len(self.textes_kreyol))
+            else:
+                self.corpus_tokenise = tokeniser_corpus(flux, PATTERN_MOT)
+                self.compteur_ngrammes = None
+
+        print(f"✅ Corpus tokenisé:")
+        print(f"   - Textes: {self.corpus_tokenise.nombre_textes}")
+        print(f"   - Tokens: {self.corpus_tokenise.total_tokens}")
+        print(f"   - Vocabulaire: {len(self.corpus_tokenise.vocabulaire)} mots")
+
+        return True
+
+    def _corpus(self):
+        """Flux tokenisé, produit à la demande si l'étape n'a pas encore tourné"""
+        if self.corpus_tokenise is None:
+            self.tokeniser_textes()
+        return self.corpus_tokenise
+
+    def _compteur(self):
+        """Comptes des n-grammes, calculés à la demande depuis le flux tokenisé"""
+        if self.compteur_ngrammes is None:
+            self.compteur_ngrammes = CompteurNgrammes.depuis_corpus(self._corpus())
+        return self.compteur_ngrammes
+
     def creer_dictionnaire(self):
         """Crée un dictionnaire enrichi à partir des textes"""
         print("\n📚 CRÉATION DU DICTIONNAIRE")
         print("-" * 35)
-        
+
         if not self.textes_kreyol:
             print("❌ Aucun texte disponible")
             return False
-        
+
         print(f"🔍 Analyse de {len(self.textes_kreyol)} textes...")
-        
-        compteur_mots = Counter()
-        pattern_mot = re.compile(r'\b[a-zA-ZàáâäèéêëìíîïòóôöùúûüçñÀÁÂÄÈÉÊËÌÍÎÏÒÓÔÖÙÚÛÜÇÑ\-]{2,}\b')
-        
-        for texte in self.textes_kreyol:
-            if isinstance(texte, dict):
-                contenu_texte = texte.get("Texte", "")
-            else:
-                contenu_texte = str(texte) if texte is not None else ""
-            
-            if not contenu_texte:
-                continue
-                
-            mots = pattern_mot.findall(contenu_texte.lower())
-            for mot in mots:
-                mot = mot.strip('-')
-                if len(mot) >= 2:
-                    compteur_mots[mot] += 1
-        
-        # Le comptage du corpus REMPLACE la fréquence stockée, il ne s'y ajoute
-        # pas. L'ancienne fusion faisait `stockée + nouvelle` alors que la valeur
-        # stockée provenait déjà d'un passage sur ce même corpus : chaque exécution
-        # gonflait donc le dictionnaire d'un corpus supplémentaire. Le rapport
-        # mesuré entre valeurs stockées et comptage frais était uniforme, autour de
-        # 12, soit une douzaine d'exécutions accumulées. Les fréquences ne
-        # mesuraient plus le kréyòl écrit mais le nombre de fois qu'on avait lancé
-        # le script. Avec ce remplacement, deux exécutions de suite donnent
-        # exactement le même dictionnaire.
-        # Facteur d'échelle entre fréquences stockées et comptage frais, estimé sur
-        # les mots présents des deux côtés. Il vaut 1 en régime établi (le stock
-        # est déjà à la bonne échelle) et corrige la transition depuis un stock
-        # gonflé par les cumuls passés.
-        stock_commun = sum(f for m, f in self.dictionnaire_actuel.items() if m in compteur_mots)
-        frais_commun = sum(compteur_mots[m] for m in self.dictionnaire_actuel if m in compteur_mots)
-        echelle = (frais_commun / stock_commun) if stock_commun else 1.0
-
-        mots_conserves = 0
-        for mot, freq in self.dictionnaire_actuel.items():
-            if mot not in compteur_mots:
-                # Mot absent du corpus : ajout curé à la main, ou reliquat d'un
-                # corpus antérieur. Sa fréquence stockée est la seule dont on
-                # dispose, mais la garder telle quelle le propulserait en tête dès
-                # que l'échelle générale change : on la ramène à l'échelle du
-                # comptage frais, sans jamais descendre sous 1.
-                compteur_mots[mot] = max(1, round(freq * echelle))
-                mots_conserves += 1
+
+        # Les identifiants sont attribués dans l'ordre de première apparition :
+        # le Counter garde donc l'ordre d'insertion qu'avait le comptage mot à mot.
+        corpus = self._corpus()
+        if self.etat_precedent is not None:
+            # L'état de la dernière exécution dit exactement quelle part de
+            # chaque fréquence stockée venait du corpus : on la remplace par le
+            # comptage actuel et on garde le reste (ajouts manuels), sans échelle.
+            comptes = {mot: compte for mot, compte
+                       in zip(corpus.vocabulaire, self._compteur().unigrammes.tolist()) if compte}
+            compteur_mots, mots_conserves = fusionner_frequences(
+                comptes, self.dictionnaire_actuel, self.etat_precedent.comptes_mots())
+            self.nouveau_dictionnaire = dict(compteur_mots.most_common())
+            self._afficher_bilan_dictionnaire(compteur_mots, mots_conserves)
+            return True
+
+        # Sans état (première exécution, --full-rebuild) : le comptage du corpus
+        # REMPLACE la fréquence stockée, il ne s'y ajoute pas. L'ancienne fusion
+        # `stockée + nouvelle` gonflait le dictionnaire d'un corpus à chaque
+        # exécution : le rapport mesuré entre valeurs stockées et comptage frais
+        # était uniforme, autour de 12, soit une douzaine d'exécutions accumulées.
+        # Les fréquences ne mesuraient plus le kréyòl écrit mais le nombre de fois
+        # qu'on avait lancé le script (cf. remplacer_frequences).
+        compteur_mots, mots_conserves = remplacer_frequences(
+            dict(zip(corpus.vocabulaire, self._compteur().unigrammes.tolist())),
+            self.dictionnaire_actuel)
 
         self.nouveau_dictionnaire = dict(compteur_mots.most_common())
+        self._afficher_bilan_dictionnaire(compteur_mots, mots_conserves)
+
+        return True
 
+    def _afficher_bilan_dictionnaire(self, compteur_mots, mots_conserves):
+        """Affiche le résumé de la création du dictionnaire"""
         nouveaux_mots = len(set(compteur_mots) - set(self.dictionnaire_actuel))
         print(f"✅ Dictionnaire créé:")
         print(f"   - Total mots: {len(self.nouveau_dictionnaire)}")
         print(f"   - Nouveaux mots: {nouveaux_mots}")
         print(f"   - Mots existants: {len(self.dictionnaire_actuel)}")
         print(f"   - Mots hors corpus conservés: {mots_conserves}")
-
-        return True
     
     def creer_ngrams(self):
         """Crée des N-grams pour les prédictions"""
@@ -369,102 +496,71 @@ class KreyolPipelineUnique:
         # Occurrences minimales d'un contexte à deux mots pour qu'il soit retenu
         MIN_OCCURRENCES_CONTEXTE = 2
 
-        unigrammes = Counter()
-        bigrammes = Counter()
-        trigrammes = Counter()
-        # Suites observées par contexte : {contexte: Counter(mot_suivant)}
-        suivants_unigramme = defaultdict(Counter)
-        suivants_bigramme = defaultdict(Counter)
+        corpus = self._corpus()
 
-        pattern_mot = re.compile(r'\b[a-zA-ZàáâäèéêëìíîïòóôöùúûüçñÀÁÂÄÈÉÊËÌÍÎÏÒÓÔÖÙÚÛÜÇÑ\-]{2,}\b')
-        
-        for texte in self.textes_kreyol:
-            if isinstance(texte, dict):
-                contenu_texte = texte.get("Texte", "")
-            else:
-                contenu_texte = str(texte) if texte is not None else ""
-            
-            if not contenu_texte:
-                continue
-                
-            mots = [mot.lower().strip('-') for mot in pattern_mot.findall(contenu_texte.lower()) if len(mot.strip('-')) >= 2]
-            
-            # Unigrammes
-            for mot in mots:
-                unigrammes[mot] += 1
-
-            # Bigrammes
-            for i in range(len(mots) - 1):
-                bigramme = (mots[i], mots[i + 1])
-                bigrammes[bigramme] += 1
-                suivants_unigramme[mots[i]][mots[i + 1]] += 1
-
-            # Trigrammes
-            for i in range(len(mots) - 2):
-                trigramme = (mots[i], mots[i + 1], mots[i + 2])
-                trigrammes[trigramme] += 1
-                suivants_bigramme[(mots[i], mots[i + 1])][mots[i + 2]] += 1
-
-        # Créer le modèle de prédictions
-        predictions = {}
-        total_unigrammes = sum(unigrammes.values())
-
-        def meilleurs_candidats(compteur_suivants, total_contexte):
-            """Candidats d'un contexte, triés et filtrés par probabilité"""
-            candidats = [
-                {"word": suivant, "probability": round(freq / total_contexte, 3)}
-                for suivant, freq in compteur_suivants.items()
-                if freq / total_contexte > SEUIL_PROBABILITE
-            ]
-            candidats.sort(key=lambda x: x["probability"], reverse=True)
-            return candidats[:MAX_CANDIDATS]
+        # Comptage sur identifiants entiers : bigrammes et trigrammes sont des
+        # clés de 64 bits comptées en bloc (cf. comptage_ngrammes), au lieu de
+        # Counter indexés par tuples de chaînes.
+        compteur = self._compteur()
 
         # Contextes à un mot : clé = le mot précédent.
-        # Parcours par mot plutôt que balayage complet des bigrammes pour chaque
-        # unigramme : l'ancienne double boucle était en O(unigrammes × bigrammes),
-        # soit des centaines de millions d'itérations sur le corpus actuel.
-        for mot, compteur_suivants in suivants_unigramme.items():
-            candidats = meilleurs_candidats(compteur_suivants, unigrammes[mot])
-            if candidats:
-                predictions[mot] = candidats
-
         # Contextes à deux mots : clé = "mot1 mot2", séparés par une espace.
         # Aucune collision possible avec les clés à un mot, le motif de tokenisation
         # excluant les espaces. Le clavier essaie d'abord la clé à deux mots et
         # retombe sur celle à un mot, ce qui garde le modèle rétrocompatible.
-        contextes_ignores = 0
-        for (mot1, mot2), compteur_suivants in suivants_bigramme.items():
-            occurrences_contexte = bigrammes[(mot1, mot2)]
-            # Un contexte vu une seule fois donne une probabilité de 1.0 à son
-            # unique suite : ce n'est pas une prédiction, c'est la citation d'un
-            # passage du corpus. On l'écarte.
-            if occurrences_contexte < MIN_OCCURRENCES_CONTEXTE:
-                contextes_ignores += 1
-                continue
-            candidats = meilleurs_candidats(compteur_suivants, occurrences_contexte)
-            if candidats:
-                predictions[f"{mot1} {mot2}"] = candidats
+        # Un contexte à deux mots vu une seule fois donne une probabilité de 1.0
+        # à son unique suite : ce n'est pas une prédiction, c'est la citation
+        # d'un passage du corpus. On l'écarte (MIN_OCCURRENCES_CONTEXTE).
+        # Avec Kneser-Ney, les suites de chaque clé sont déjà interpolées avec
+        # le niveau inférieur : le seuil porte sur la probabilité lissée.
+        if self.modele_ngrammes == "mle":
+            modele = compteur
+        else:
+            modele = self.modele_lisse = ModeleKneserNey(compteur)
+        predictions, contextes_ignores = modele.predictions(
+            corpus.vocabulaire, SEUIL_PROBABILITE, MAX_CANDIDATS,
+            min_occurrences_contexte=MIN_OCCURRENCES_CONTEXTE)
+
+        if self.max_octets_ngrams is not None or self.max_contextes_ngrams is not None:
+            predictions, self.rapport_elagage = elaguer_predictions(
+                predictions, compteur, corpus.index,
+                self.max_octets_ngrams, self.max_contextes_ngrams, self.json_compact)
+            if self.modele_lisse is not None:
+                # Poids de repli des seules clés restantes
+                self.modele_lisse.poids_repli = {cle: poids for cle, poids
+                                                 in self.modele_lisse.poids_repli.items()
+                                                 if cle in predictions}
 
         self.nouveaux_ngrams = predictions
         self.stats_corpus['contextes_bigrammes_ignores'] = contextes_ignores
-        
-        # Stocker pour le rapport
-        self.stats_corpus['unigrammes'] = unigrammes
-        self.stats_corpus['bigrammes'] = bigrammes
-        self.stats_corpus['trigrammes'] = trigrammes
-        self.stats_corpus['total_tokens'] = total_unigrammes
-        
+
+        # Stocker pour le rapport (clés en identifiants, cf. corpus_tokenise)
+        self.stats_corpus['ngrammes'] = compteur
+        self.stats_corpus['total_tokens'] = compteur.total_tokens
+
         cles_contexte_2 = sum(1 for cle in predictions if ' ' in cle)
         print(f"✅ N-grams créés:")
-        print(f"   - Unigrammes: {len(unigrammes)}")
-        print(f"   - Bigrammes: {len(bigrammes)}")
-        print(f"   - Trigrammes: {len(trigrammes)}")
+        print(f"   - Unigrammes: {compteur.nombre_unigrammes}")
+        print(f"   - Bigrammes: {compteur.nombre_bigrammes}")
+        print(f"   - Trigrammes: {compteur.nombre_trigrammes}")
         print(f"   - Prédictions: {len(predictions)}")
         print(f"      · contexte 1 mot : {len(predictions) - cles_contexte_2}")
         print(f"      · contexte 2 mots: {cles_contexte_2} ({contextes_ignores} contextes vus une seule fois écartés)")
+        if self.modele_lisse is not None:
+            print(f"   - Modèle: Kneser-Ney interpolé ({self.modele_lisse.cles_redondantes} clés à deux mots "
+                  f"identiques à leur repli non exportées)")
+        if self.rapport_elagage is not None:
+            afficher_elagage(self.rapport_elagage)
         
         return True
     
+    def _statistiques_lexique(self):
+        """Statistiques vectorisées du nouveau dictionnaire (calculées une fois)"""
+        if self.statistiques_lexique is None or \
+                self.statistiques_lexique.dictionnaire is not self.nouveau_dictionnaire:
+            self.statistiques_lexique = StatistiquesLexique(self.nouveau_dictionnaire)
+        return self.statistiques_lexique
+
     def analyser_statistiques(self):
         """Analyse statistique complète du dictionnaire et des N-grams"""
         print("\n📊 ANALYSE STATISTIQUE COMPLÈTE")
@@ -475,25 +571,26 @@ class KreyolPipelineUnique:
             return False
         
         # Statistiques du dictionnaire
-        mots = list(self.nouveau_dictionnaire.keys())
-        frequences = list(self.nouveau_dictionnaire.values())
+        stats = self._statistiques_lexique()
+        frequences = stats.frequences
+        nombre_mots = len(stats)
         
         print(f"\n📚 ANALYSE DICTIONNAIRE:")
-        print(f"   - Total mots: {len(mots)}")
-        print(f"   - Fréquence min: {min(frequences)}")
-        print(f"   - Fréquence max: {max(frequences)}")
-        print(f"   - Fréquence moyenne: {sum(frequences) / len(frequences):.1f}")
+        print(f"   - Total mots: {nombre_mots}")
+        print(f"   - Fréquence min: {frequences.min()}")
+        print(f"   - Fréquence max: {frequences.max()}")
+        print(f"   - Fréquence moyenne: {stats.total / nombre_mots:.1f}")
         
         # Catégories de fréquence
-        tres_rares = sum(1 for f in frequences if f == 1)
-        rares = sum(1 for f in frequences if 2 <= f <= 5)
-        frequents = sum(1 for f in frequences if 6 <= f <= 20)
-        tres_frequents = sum(1 for f in frequences if f > 20)
+        tres_rares = stats.effectif(1, 1)
+        rares = stats.effectif(2, 5)
+        frequents = stats.effectif(6, 20)
+        tres_frequents = stats.effectif(21)
         
-        print(f"   - Très rares (freq=1): {tres_rares} ({tres_rares/len(mots)*100:.1f}%)")
-        print(f"   - Rares (freq 2-5): {rares} ({rares/len(mots)*100:.1f}%)")
-        print(f"   - Fréquents (freq 6-20): {frequents} ({frequents/len(mots)*100:.1f}%)")
-        print(f"   - Très fréquents (freq>20): {tres_frequents} ({tres_frequents/len(mots)*100:.1f}%)")
+        print(f"   - Très rares (freq=1): {tres_rares} ({tres_rares/nombre_mots*100:.1f}%)")
+        print(f"   - Rares (freq 2-5): {rares} ({rares/nombre_mots*100:.1f}%)")
+        print(f"   - Fréquents (freq 6-20): {frequents} ({frequents/nombre_mots*100:.1f}%)")
+        print(f"   - Très fréquents (freq>20): {tres_frequents} ({tres_frequents/nombre_mots*100:.1f}%)")
         
         # Top 15 des mots
         print(f"\n   🏆 TOP 15 MOTS:")
@@ -501,16 +598,14 @@ class KreyolPipelineUnique:
             print(f"        {i+1:2d}. {mot:<15} (freq: {freq})")
         
         # Analyse des mots longs
-        mots_longs = [(mot, len(mot)) for mot in mots if len(mot) >= 10]
-        mots_longs.sort(key=lambda x: x[1], reverse=True)
+        mots_longs = stats.mots_longs(10, limite=5)
         
         print(f"\n   📏 ANALYSE MOTS LONGS:")
-        print(f"   - Mots ≥10 caractères: {len(mots_longs)}")
+        print(f"   - Mots ≥10 caractères: {stats.nombre_mots_longs(10)}")
         if mots_longs:
             print(f"   - Mot le plus long: '{mots_longs[0][0]}' ({mots_longs[0][1]} caractères)")
             print(f"   - Top 5 mots longs:")
-            for i, (mot, longueur) in enumerate(mots_longs[:5]):
-                freq = self.nouveau_dictionnaire[mot]
+            for i, (mot, longueur, freq) in enumerate(mots_longs[:5]):
                 print(f"     {i+1}. {mot} ({longueur} char, freq: {freq})")
         
         # Statistiques N-grams
@@ -604,19 +699,19 @@ class KreyolPipelineUnique:
         # ============================================================
         # 2. CORPUS & REPRÉSENTATIVITÉ
         # ============================================================
-        mots = list(self.nouveau_dictionnaire.keys())
-        frequences = list(self.nouveau_dictionnaire.values())
-        total_tokens = sum(frequences)
+        stats = self._statistiques_lexique()
+        nombre_mots = len(stats)
+        total_tokens = stats.total
         
         # Calculer Type-Token Ratio
-        ttr = len(mots) / total_tokens if total_tokens > 0 else 0
+        ttr = stats.type_token_ratio
         
         rapport.append("## 1. Corpus et Échantillonnage")
         rapport.append("")
         rapport.append("### 1.1 Taille et Couverture")
         rapport.append("")
         rapport.append(f"- **Total des tokens** : {total_tokens:,}")
-        rapport.append(f"- **Types lexicaux uniques** : {len(mots):,}")
+        rapport.append(f"- **Types lexicaux uniques** : {nombre_mots:,}")
         rapport.append(f"- **Type-Token Ratio (TTR)** : {ttr:.4f}")
         rapport.append(f"- **Richesse lexicale** : {'Élevée' if ttr > 0.1 else 'Moyenne' if ttr > 0.05 else 'Faible'}")
         rapport.append("")
@@ -628,28 +723,24 @@ class KreyolPipelineUnique:
         rapport.append("")
         
         # Distribution par longueur
-        longueurs = defaultdict(int)
-        for mot in mots:
-            longueurs[len(mot)] += 1
         
         rapport.append("### 2.1 Distribution par Longueur")
         rapport.append("")
         rapport.append("| Longueur | Nombre de mots | Pourcentage |")
         rapport.append("|----------|----------------|-------------|")
         
-        for longueur in sorted(longueurs.keys())[:20]:  # Top 20 longueurs
-            count = longueurs[longueur]
-            pct = (count / len(mots)) * 100
+        for longueur, count in stats.histogramme_longueurs()[:20]:  # Top 20 longueurs
+            pct = (count / nombre_mots) * 100
             barre = "█" * int(pct / 2)  # Graphique ASCII
             rapport.append(f"| {longueur:2d} lettres | {count:6,} | {pct:5.1f}% {barre} |")
         
         rapport.append("")
         
         # Mots avec traits d'union
-        mots_composes = [m for m in mots if '-' in m]
+        mots_composes = stats.mots_contenant('-')
         rapport.append("### 2.2 Mots Composés (avec trait d'union)")
         rapport.append("")
-        rapport.append(f"- **Total** : {len(mots_composes)} mots ({len(mots_composes)/len(mots)*100:.1f}%)")
+        rapport.append(f"- **Total** : {len(mots_composes)} mots ({len(mots_composes)/nombre_mots*100:.1f}%)")
         rapport.append(f"- **Exemples** : {', '.join(mots_composes[:15])}")
         rapport.append("")
         
@@ -660,11 +751,7 @@ class KreyolPipelineUnique:
         rapport.append("")
         
         # Caractères spéciaux créoles
-        caracteres_creoles = {'à': 0, 'é': 0, 'è': 0, 'ê': 0, 'ò': 0, 'ô': 0, 'ù': 0, 'ñ': 0, 'ç': 0}
-        for mot in mots:
-            for char in mot:
-                if char in caracteres_creoles:
-                    caracteres_creoles[char] += 1
+        caracteres_creoles = stats.occurrences_caracteres(['à', 'é', 'è', 'ê', 'ò', 'ô', 'ù', 'ñ', 'ç'])
         
         rapport.append("### 3.1 Caractères Diacritiques")
         rapport.append("")
@@ -676,16 +763,12 @@ class KreyolPipelineUnique:
         rapport.append("")
         
         # Digrammes fréquents
-        digrammes = Counter()
-        for mot in mots:
-            for i in range(len(mot) - 1):
-                digrammes[mot[i:i+2]] += 1
         
         rapport.append("### 3.2 Digrammes les Plus Fréquents")
         rapport.append("")
         rapport.append("| Digramme | Fréquence |")
         rapport.append("|----------|-----------|")
-        for digr, freq in digrammes.most_common(20):
+        for digr, freq in stats.digrammes_frequents(20):
             rapport.append(f"| **{digr}** | {freq:,} |")
         rapport.append("")
         
@@ -696,32 +779,25 @@ class KreyolPipelineUnique:
         rapport.append("")
         
         # Hapax et distribution de fréquence
-        hapax = sum(1 for f in frequences if f == 1)
-        dis_legomena = sum(1 for f in frequences if f == 2)
+        hapax = stats.effectif(1, 1)
+        dis_legomena = stats.effectif(2, 2)
         
         rapport.append("### 4.1 Distribution de Fréquence (Loi de Zipf)")
         rapport.append("")
-        rapport.append(f"- **Hapax legomena** (freq=1) : {hapax:,} mots ({hapax/len(mots)*100:.1f}%)")
-        rapport.append(f"- **Dis legomena** (freq=2) : {dis_legomena:,} mots ({dis_legomena/len(mots)*100:.1f}%)")
-        rapport.append(f"- **Mots rares** (freq 3-5) : {sum(1 for f in frequences if 3 <= f <= 5):,} mots")
-        rapport.append(f"- **Mots fréquents** (freq 6-20) : {sum(1 for f in frequences if 6 <= f <= 20):,} mots")
-        rapport.append(f"- **Mots très fréquents** (freq >20) : {sum(1 for f in frequences if f > 20):,} mots")
+        rapport.append(f"- **Hapax legomena** (freq=1) : {hapax:,} mots ({hapax/nombre_mots*100:.1f}%)")
+        rapport.append(f"- **Dis legomena** (freq=2) : {dis_legomena:,} mots ({dis_legomena/nombre_mots*100:.1f}%)")
+        rapport.append(f"- **Mots rares** (freq 3-5) : {stats.effectif(3, 5):,} mots")
+        rapport.append(f"- **Mots fréquents** (freq 6-20) : {stats.effectif(6, 20):,} mots")
+        rapport.append(f"- **Mots très fréquents** (freq >20) : {stats.effectif(21):,} mots")
         rapport.append("")
         
         # Principe de Pareto
-        cumul = 0
-        seuil_80 = total_tokens * 0.8
-        mots_80 = 0
-        for freq in sorted(frequences, reverse=True):
-            cumul += freq
-            mots_80 += 1
-            if cumul >= seuil_80:
-                break
+        mots_80 = stats.mots_pour_couvrir(0.8)
         
         rapport.append("### 4.2 Principe de Pareto")
         rapport.append("")
-        rapport.append(f"- **{mots_80:,} mots** ({mots_80/len(mots)*100:.1f}%) représentent **80%** des occurrences")
-        rapport.append(f"- **Vocabulaire fondamental** : Les {min(1000, len(mots))} mots les plus fréquents")
+        rapport.append(f"- **{mots_80:,} mots** ({mots_80/nombre_mots*100:.1f}%) représentent **80%** des occurrences")
+        rapport.append(f"- **Vocabulaire fondamental** : Les {min(1000, nombre_mots)} mots les plus fréquents")
         rapport.append("")
         
         # Top 50 mots
@@ -730,9 +806,8 @@ class KreyolPipelineUnique:
         rapport.append("| Rang | Mot | Fréquence | % Cumul |")
         rapport.append("|------|-----|-----------|---------|")
         
-        cumul = 0
-        for i, (mot, freq) in enumerate(list(self.nouveau_dictionnaire.items())[:50], 1):
-            cumul += freq
+        cumuls = stats.cumul_premiers(50).tolist()
+        for i, (mot, freq, cumul) in enumerate(zip(stats.mots, stats.frequences[:50].tolist(), cumuls), 1):
             pct_cumul = (cumul / total_tokens) * 100
             rapport.append(f"| {i:2d} | **{mot}** | {freq:,} | {pct_cumul:.2f}% |")
         
@@ -744,16 +819,17 @@ class KreyolPipelineUnique:
         rapport.append("## 5. Analyse Syntaxique et Collocations")
         rapport.append("")
         
-        if 'bigrammes' in self.stats_corpus:
-            bigrammes = self.stats_corpus['bigrammes']
+        if 'ngrammes' in self.stats_corpus:
+            compteur = self.stats_corpus['ngrammes']
+            vocabulaire = self.corpus_tokenise.vocabulaire
             
             rapport.append("### 5.1 Bigrammes les Plus Fréquents")
             rapport.append("")
             rapport.append("| Rang | Bigramme | Fréquence |")
             rapport.append("|------|----------|-----------|")
             
-            for i, ((w1, w2), freq) in enumerate(bigrammes.most_common(30), 1):
-                rapport.append(f"| {i:2d} | **{w1} {w2}** | {freq:,} |")
+            for i, ((w1, w2), freq) in enumerate(compteur.bigrammes_plus_frequents(30), 1):
+                rapport.append(f"| {i:2d} | **{vocabulaire[w1]} {vocabulaire[w2]}** | {freq:,} |")
             
             rapport.append("")
             
@@ -778,9 +854,9 @@ class KreyolPipelineUnique:
                     freq = self.nouveau_dictionnaire[marqueur]
                     # Trouver les collocations
                     collocations = []
-                    for (w1, w2), f in bigrammes.most_common(100):
-                        if w1 == marqueur:
-                            collocations.append(w2)
+                    for (w1, w2), f in compteur.bigrammes_plus_frequents(100):
+                        if vocabulaire[w1] == marqueur:
+                            collocations.append(vocabulaire[w2])
                         if len(collocations) >= 3:
                             break
                     coll_str = ', '.join(collocations) if collocations else "—"
@@ -810,10 +886,9 @@ class KreyolPipelineUnique:
         rapport.append("## 6. Mots Longs et Complexité Morphologique")
         rapport.append("")
         
-        mots_longs = [(mot, len(mot), self.nouveau_dictionnaire[mot]) for mot in mots if len(mot) >= 10]
-        mots_longs.sort(key=lambda x: x[1], reverse=True)
+        mots_longs = stats.mots_longs(10, limite=30)
         
-        rapport.append(f"### 6.1 Mots de 10 Lettres et Plus ({len(mots_longs)} mots)")
+        rapport.append(f"### 6.1 Mots de 10 Lettres et Plus ({stats.nombre_mots_longs(10)} mots)")
         rapport.append("")
         rapport.append("| Rang | Mot | Longueur | Fréquence |")
         rapport.append("|------|-----|----------|-----------|")
@@ -856,13 +931,15 @@ class KreyolPipelineUnique:
         rapport.append("")
         
         # Mots suspects (très courts ou avec caractères inhabituels)
-        mots_suspects = [m for m in mots if len(m) == 2 or any(c.isdigit() for c in m)]
+        deux_lettres = stats.longueurs == 2
+        avec_chiffres = stats.masque_chiffres()
+        mots_suspects = int((deux_lettres | avec_chiffres).sum())
         
         rapport.append("### 8.1 Analyse de Qualité")
         rapport.append("")
-        rapport.append(f"- **Mots de 2 lettres** : {len([m for m in mots if len(m) == 2]):,}")
-        rapport.append(f"- **Mots avec chiffres** : {len([m for m in mots if any(c.isdigit() for c in m)]):,}")
-        rapport.append(f"- **Cohérence orthographique** : {'✓ Bonne' if len(mots_suspects) < len(mots) * 0.05 else '⚠ À vérifier'}")
+        rapport.append(f"- **Mots de 2 lettres** : {int(deux_lettres.sum()):,}")
+        rapport.append(f"- **Mots avec chiffres** : {int(avec_chiffres.sum()):,}")
+        rapport.append(f"- **Cohérence orthographique** : {'✓ Bonne' if mots_suspects < nombre_mots * 0.05 else '⚠ À vérifier'}")
         rapport.append("")
         
         # ============================================================
@@ -872,8 +949,7 @@ class KreyolPipelineUnique:
         rapport.append("")
         
         # Entropie de Shannon (simplifiée)
-        import math
-        entropie = -sum((f/total_tokens) * math.log2(f/total_tokens) for f in frequences if f > 0)
+        entropie = stats.entropie()
         
         rapport.append(f"- **Type-Token Ratio (TTR)** : {ttr:.4f}")
         rapport.append(f"- **Entropie lexicale (Shannon)** : {entropie:.2f} bits")
@@ -887,8 +963,8 @@ class KreyolPipelineUnique:
         rapport.append("")
         rapport.append("### 10.1 Forces du Corpus")
         rapport.append("")
-        rapport.append(f"- Couverture lexicale importante ({len(mots):,} types)")
-        rapport.append(f"- Richesse des bigrammes ({len(self.stats_corpus.get('bigrammes', {})):,} patterns)")
+        rapport.append(f"- Couverture lexicale importante ({nombre_mots:,} types)")
+        rapport.append(f"- Richesse des bigrammes ({self.stats_corpus['ngrammes'].nombre_bigrammes if 'ngrammes' in self.stats_corpus else 0:,} patterns)")
         rapport.append(f"- Présence des marqueurs TMA caractéristiques du créole")
         rapport.append("")
         
@@ -942,6 +1018,11 @@ class KreyolPipelineUnique:
             print(f"❌ Erreur lors de la sauvegarde du rapport : {e}")
             return False
     
+    def _ecrire_asset(self, donnees, chemins, bilan):
+        """Écrit un asset JSON au format choisi (--compact-json, --compress),
+        sérialisé une fois pour toutes ses cibles"""
+        return ecrire_json(donnees, chemins, self.json_compact, self.compression, bilan)
+
     def sauvegarder_donnees(self):
         """Sauvegarde les nouvelles données"""
         print("\n💾 SAUVEGARDE DES DONNÉES")
@@ -960,37 +1041,55 @@ class KreyolPipelineUnique:
             shutil.copy2(self.chemin_ngrams, backup_ngrams)
             print(f"📁 Backup N-grams: {backup_ngrams}")
         
+        # Format des assets JSON (indenté ou compact) et bilan de leurs tailles
+        bilan = BilanTailles(self.json_compact, self.compression)
+
         # Sauvegarder le nouveau dictionnaire
         if self.nouveau_dictionnaire:
-            os.makedirs(os.path.dirname(self.chemin_dict), exist_ok=True)
-            
             # Format pour Flutter (dictionnaire simple mot -> fréquence)
-            with open(self.chemin_dict, 'w', encoding='utf-8') as f:
-                json.dump(self.nouveau_dictionnaire, f, ensure_ascii=False, indent=2)
+            self._ecrire_asset(self.nouveau_dictionnaire, self.chemin_dict, bilan)
             print(f"✅ Dictionnaire sauvegardé: {len(self.nouveau_dictionnaire)} mots")
             
-            # Format pour Android (array de paires [mot, fréquence])
+            # Format pour Android (array de paires [mot, fréquence]), écrit au
+            # fil des paires du dictionnaire.
             # Ce format sera migré par l'app Android en { mot: {frequency: X, user_count: 0} }
-            dict_android_format = [[mot, freq] for mot, freq in self.nouveau_dictionnaire.items()]
             android_dict_path = self.chemin_dict.replace('clavier_creole', 'android_keyboard/app/src/main')
-            os.makedirs(os.path.dirname(android_dict_path), exist_ok=True)
-            with open(android_dict_path, 'w', encoding='utf-8') as f:
-                json.dump(dict_android_format, f, ensure_ascii=False, indent=2)
+            ecrire_paires_json(self.nouveau_dictionnaire.items(), android_dict_path,
+                               self.json_compact, self.compression, bilan)
             print(f"✅ Dictionnaire Android sauvegardé: format array [[mot, freq], ...]")
+
+            # Index de préfixes (complétion sans parcours du dictionnaire)
+            taille_idx = ecrire_index_prefixes(self.nouveau_dictionnaire, chemin_index(android_dict_path))
+            print(f"✅ Index de préfixes sauvegardé: {taille_idx:,} octets")
+
+            # Index de corrections (suppressions symétriques, distance ≤ 2)
+            taille_corr = ecrire_index_corrections(self.nouveau_dictionnaire,
+                                                   chemin_index_corrections(android_dict_path))
+            print(f"✅ Index de corrections sauvegardé: {taille_corr:,} octets")
         
-        # Sauvegarder les nouveaux N-grams
+        # Sauvegarder les nouveaux N-grams, synchronisés avec Android : une
+        # sérialisation, deux cibles remplacées ensemble
         if self.nouveaux_ngrams:
-            os.makedirs(os.path.dirname(self.chemin_ngrams), exist_ok=True)
-            with open(self.chemin_ngrams, 'w', encoding='utf-8') as f:
-                json.dump(self.nouveaux_ngrams, f, ensure_ascii=False, indent=2)
-            print(f"✅ N-grams sauvegardés: {len(self.nouveaux_ngrams)} prédictions")
-            
-            # Synchroniser avec Android
             ngrams_android_path = self.chemin_ngrams.replace('clavier_creole', 'android_keyboard/app/src/main')
-            os.makedirs(os.path.dirname(ngrams_android_path), exist_ok=True)
-            with open(ngrams_android_path, 'w', encoding='utf-8') as f:
-                json.dump(self.nouveaux_ngrams, f, ensure_ascii=False, indent=2)
+            self._ecrire_asset(self.nouveaux_ngrams, [self.chemin_ngrams, ngrams_android_path], bilan)
+            print(f"✅ N-grams sauvegardés: {len(self.nouveaux_ngrams)} prédictions")
             print(f"✅ N-grams Android sauvegardés")
+
+            # Format binaire compact (mmap), en évaluation hors de l'APK
+            chemin_bin = chemin_binaire(ngrams_android_path)
+            taille_bin = ecrire_ngrams_binaires(self.nouveaux_ngrams, chemin_bin)
+            taille_json = os.path.getsize(ngrams_android_path)
+            print(f"✅ N-grams binaires sauvegardés: {taille_bin:,} octets "
+                  f"(JSON: {taille_json:,}, {taille_bin / taille_json:.0%})")
+
+            if self.modele_lisse is not None:
+                chemin_repli = chemin_poids_repli(ngrams_android_path)
+                self.modele_lisse.ecrire_poids_repli(chemin_repli, self.json_compact,
+                                                     self.compression, bilan)
+                print(f"✅ Poids de repli sauvegardés: {chemin_repli}")
+
+        bilan.afficher()
+        self._sauvegarder_etat()
         
         print("\n📱 SYNCHRONISATION TERMINÉE")
         print("-" * 35)
@@ -998,6 +1097,18 @@ class KreyolPipelineUnique:
         
         return True
     
+    def _sauvegarder_etat(self):
+        """Écrit l'état du corpus pour la prochaine reconstruction incrémentale"""
+        if self.corpus_tokenise is None or not self.nouveau_dictionnaire:
+            return
+        etat = self.etat_corpus or EtatCorpus(
+            self.empreintes_textes, self._corpus(), self._compteur())
+        try:
+            etat.sauvegarder(self.chemin_etat, PATTERN_MOT)
+            print(f"✅ État du corpus sauvegardé: {self.chemin_etat}")
+        except OSError as e:
+            print(f"⚠️ État du corpus non sauvegardé: {e}")
+
     def valider_donnees(self):
         """Validation complète des données"""
         print("\n🔍 VALIDATION COMPLÈTE")
@@ -1034,6 +1145,55 @@ class KreyolPipelineUnique:
             print("   ❌ Fichier N-grams manquant")
             succes_total = False
         
+        # Test index de préfixes
+        android_dict = self.chemin_dict.replace('clavier_creole', 'android_keyboard/app/src/main')
+        chemin_idx = chemin_index(android_dict)
+        if os.path.exists(chemin_idx) and os.path.exists(android_dict):
+            print("\n🔤 Test index de préfixes...")
+            try:
+                with open(android_dict, 'r', encoding='utf-8') as f:
+                    ecarts = valider_index_prefixes(chemin_idx, json.load(f))
+                if ecarts:
+                    print(f"   ❌ {len(ecarts)} préfixes différents du parcours linéaire (ex.: {ecarts[:3]})")
+                    succes_total = False
+                else:
+                    print("   ✅ Complétions identiques au parcours linéaire")
+            except Exception as e:
+                print(f"   ❌ Erreur: {e}")
+                succes_total = False
+
+        # Test index de corrections
+        chemin_corr = chemin_index_corrections(android_dict)
+        if os.path.exists(chemin_corr) and os.path.exists(android_dict):
+            print("\n🔧 Test index de corrections...")
+            try:
+                with open(android_dict, 'r', encoding='utf-8') as f:
+                    ecarts = valider_index_corrections(chemin_corr, json.load(f))
+                if ecarts:
+                    print(f"   ❌ {len(ecarts)} saisies corrigées autrement que par le parcours linéaire "
+                          f"(ex.: {ecarts[:3]})")
+                    succes_total = False
+                else:
+                    print("   ✅ Corrections identiques au parcours linéaire")
+            except Exception as e:
+                print(f"   ❌ Erreur: {e}")
+                succes_total = False
+
+        # Test format binaire, face aux N-grams de cette exécution (sans relire le JSON)
+        chemin_bin = chemin_binaire(self.chemin_ngrams)
+        if os.path.exists(chemin_bin) and self.nouveaux_ngrams:
+            print("\n📦 Test N-grams binaires...")
+            try:
+                ecarts = valider_ngrams_binaires(chemin_bin, self.nouveaux_ngrams)
+                if ecarts:
+                    print(f"   ❌ {len(ecarts)} contextes différents du JSON (ex.: {ecarts[:3]})")
+                    succes_total = False
+                else:
+                    print("   ✅ Relecture identique au JSON")
+            except Exception as e:
+                print(f"   ❌ Erreur: {e}")
+                succes_total = False
+
         # Test prédictions
         print("\n🎯 Test prédictions...")
         exemples = ["ka", "nou", "mwen", "yo"]
@@ -1092,13 +1252,83 @@ class KreyolPipelineUnique:
         
         return score >= 3
     
+    def separer_corpus(self):
+        """Met de côté une part stable des textes pour l'évaluation"""
+        print("\n✂️ SÉPARATION APPRENTISSAGE / TEST")
+        print("-" * 35)
+
+        self.textes_kreyol, self.textes_test = separer_textes(self.textes_kreyol, self.part_test)
+        # Le dictionnaire livré a vu tout le corpus : le fusionner ferait
+        # fuiter les mots des textes de test dans l'apprentissage.
+        self.dictionnaire_actuel = {}
+        print(f"✅ {len(self.textes_kreyol)} textes d'apprentissage, {len(self.textes_test)} textes de test "
+              f"(part visée {self.part_test:.0%})")
+        return bool(self.textes_kreyol and self.textes_test)
+
+    def evaluer_predictions(self):
+        """Rejoue les textes de test face au dictionnaire et aux N-grams construits"""
+        print("\n🎯 ÉVALUATION DES PRÉDICTIONS")
+        print("-" * 35)
+
+        textes = tokeniser_textes_test(self.textes_test, PATTERN_MOT)
+        if not textes or not self.nouveaux_ngrams:
+            print("❌ Rien à évaluer")
+            return False
+
+        evaluateur = EvaluateurPredictions(self.nouveaux_ngrams, self.nouveau_dictionnaire)
+        resultat = evaluateur.evaluer(textes)
+        afficher_evaluation(resultat)
+
+        rapport = {
+            "langue": "creole",
+            "date": datetime.now().isoformat(timespec='seconds'),
+            "modele": self.modele_ngrammes,
+            "part_test": self.part_test,
+            "textes_apprentissage": len(self.textes_kreyol),
+            "textes_test": len(self.textes_test),
+            "suggestions_visibles": evaluateur.suggestions_visibles,
+            **resultat,
+        }
+        if self.rapport_elagage is not None:
+            rapport["elagage"] = self.rapport_elagage
+        ecrire_evaluation(rapport, self.chemin_rapport_evaluation)
+        print(f"💾 Résultats: {self.chemin_rapport_evaluation}")
+        return True
+
+    def _ecrire_rapport_execution(self):
+        """Rapport JSON des étapes, à côté du rapport linguistique"""
+        self.mesures.afficher_resume()
+        if self.mesures.ecrire(self.chemin_rapport_execution, version=self.version,
+                               mode="evaluation" if self.evaluation else "construction",
+                               workers=self.workers, volumes=self._volumes()):
+            print(f"📈 Rapport d'exécution : {self.chemin_rapport_execution}")
+
+    def _volumes(self):
+        """Volumes traités jusqu'ici, relevés après chaque étape"""
+        volumes = {"textes": len(self.textes_kreyol)}
+        if self.corpus_tokenise is not None:
+            volumes["tokens"] = self.corpus_tokenise.total_tokens
+            volumes["vocabulaire"] = len(self.corpus_tokenise.vocabulaire)
+        if self.compteur_ngrammes is not None:
+            compteur = self.compteur_ngrammes
+            volumes["tokens"] = compteur.total_tokens
+            volumes["bigrammes"] = compteur.nombre_bigrammes
+            volumes["trigrammes"] = compteur.nombre_trigrammes
+        volumes["mots_dictionnaire"] = len(self.nouveau_dictionnaire)
+        volumes["contextes_ngrams"] = len(self.nouveaux_ngrams)
+        if self.rapport_elagage is not None:
+            volumes["octets_ngrams_elagues"] = self.rapport_elagage["octets_apres"]
+        return volumes
+
     def executer_pipeline(self):
         """Exécute le pipeline complet automatiquement"""
+        self.initialiser()
         print("\n🚀 PIPELINE AUTOMATIQUE COMPLET")
         print("=" * 40)
         
         etapes = [
             ("Chargement textes", self.charger_textes_kreyol),
+            ("Tokenisation", self.tokeniser_textes),
             ("Création dictionnaire", self.creer_dictionnaire),
             ("Génération N-grams", self.creer_ngrams),
             ("Analyse statistiques", self.analyser_statistiques),
@@ -1108,12 +1338,33 @@ class KreyolPipelineUnique:
             ("Validation finale", self.valider_donnees),
         ]
         
+        return self._executer_etapes(etapes)
+
+    def executer_evaluation(self):
+        """Construit le modèle sur la part d'apprentissage et l'évalue sur le reste"""
+        print("\n🎯 ÉVALUATION HORS LIGNE DES PRÉDICTIONS")
+        print("=" * 40)
+
+        etapes = [
+            ("Chargement textes", self.charger_textes_kreyol),
+            ("Séparation apprentissage/test", self.separer_corpus),
+            ("Tokenisation", self.tokeniser_textes),
+            ("Création dictionnaire", self.creer_dictionnaire),
+            ("Génération N-grams", self.creer_ngrams),
+            ("Évaluation", self.evaluer_predictions),
+        ]
+        return self._executer_etapes(etapes)
+
+    def _executer_etapes(self, etapes):
+        """Exécute et mesure les étapes, puis écrit le rapport d'exécution"""
         succes_total = True
+        self.mesures = MesureEtapes("creole", self._volumes, valeur_option("--profile"),
+                                    trace_memoire=option_presente("--tracemalloc"))
         
         for i, (nom, fonction) in enumerate(etapes, 1):
             print(f"\n⏳ Étape {i}/{len(etapes)}: {nom}")
             try:
-                succes = fonction()
+                succes = self.mesures.executer(nom, fonction)
                 if succes:
                     print(f"✅ {nom} - Terminé")
                 else:
@@ -1122,7 +1373,8 @@ class KreyolPipelineUnique:
             except Exception as e:
                 print(f"❌ {nom} - Erreur: {e}")
                 succes_total = False
-        
+
+        self._ecrire_rapport_execution()
         return succes_total
 
 def main():
@@ -1130,6 +1382,11 @@ def main():
     try:
         # Créer et exécuter le pipeline
         pipeline = KreyolPipelineUnique()
+        if pipeline.evaluation:
+            succes = pipeline.executer_evaluation()
+            print("\n" + "=" * 60)
+            print("🎯 ÉVALUATION TERMINÉE" if succes else "⚠️ ÉVALUATION INCOMPLÈTE")
+            sys.exit(0 if succes else 1)
         succes = pipeline.executer_pipeline()
         
         # Afficher les statistiques finales
@@ -21,6 +21,26 @@ Pipeline automatique intégré:
 
 Usage simple: python LuxembourgishComplet.py
 
+Options:
+  --workers N      Tokenisation et comptage répartis sur N processus
+                   (sortie identique à l'exécution en série)
+  --full-rebuild   Ignore l'état du corpus (etat/) et recompte tout le corpus
+  --bounded-memory Comptage en mémoire bornée, en deux passes (automatique
+                   au-delà de 200 000 textes) ; désactive la reconstruction
+                   incrémentale
+  --lossy-epsilon E  Erreur ε du comptage borné (défaut 1e-5)
+  --ngram-model M  Modèle des prédictions : kneser-ney (défaut, scores lissés
+                   précalculés) ou mle (fréquences relatives brutes)
+  --max-asset-bytes N  Budget en octets du fichier de n-grammes : les
+                   prédictions les moins utiles sont retirées
+  --max-contexts N Nombre maximal de clés du fichier de n-grammes
+  --compact-json   Assets JSON sans indentation ni espaces (même contenu)
+  --compress M     Variante précompressée de chaque asset JSON : gzip ou zstd
+  --profile DOSSIER  Profil cProfile de chaque étape dans DOSSIER
+  --tracemalloc    Mesure en plus le pic mémoire Python de chaque étape
+                   (tracemalloc, qui ralentit nettement les étapes) ; par
+                   défaut, le rapport ne garde que les temps et le pic RSS
+
 Fait avec ❤️ pour préserver le Luxembourgeois
 """
 
@@ -29,29 +49,51 @@ import re
 import os
 import shutil
 import sys
-from collections import Counter, defaultdict
 from datetime import datetime
+from functools import cached_property
 from pathlib import Path
 
+from cache_corpus import CacheCorpus
+from comptage_borne import ERREUR_PAR_DEFAUT, compter_en_flux
+from comptage_ngrammes import CompteurNgrammes, compter_en_parallele
+from ecriture_assets import BilanTailles, ecrire_json, ecrire_paires_json, methode_compression
+from elagage_ngrammes import afficher_elagage, elaguer_predictions
+from etat_corpus import EtatCorpus, empreintes_au_passage, fusionner_frequences, remplacer_frequences
+from index_corrections import (chemin_index_corrections, ecrire_index_corrections,
+                               valider_index_corrections)
+from index_prefixes import chemin_index, ecrire_index_prefixes, valider_index_prefixes
+from instrumentation import MesureEtapes
+from modele_kneser_ney import MODELES, ModeleKneserNey, chemin_poids_repli
+from ngrams_binaires import chemin_binaire, ecrire_ngrams_binaires, valider_ngrams_binaires
+from options import option_presente, valeur_option
+from projection_colonnes import HAS_DATASETS, charger_colonnes, lots_de_colonnes
+from statistiques_lexique import StatistiquesLexique
+from tokenisation import iterer_contenus, tokeniser_corpus
+
 # Configuration d'encodage pour Windows
 if sys.platform.startswith('win'):
     import codecs
     sys.stdout = codecs.getwriter('utf-8')(sys.stdout.buffer, 'strict')
     sys.stderr = codecs.getwriter('utf-8')(sys.stderr.buffer, 'strict')
 
-# Gestion optionnelle des imports
-try:
-    from datasets import load_dataset
-    HAS_DATASETS = True
-except ImportError:
-    HAS_DATASETS = False
-
+# Gestion optionnelle des imports (datasets : cf. projection_colonnes)
 try:
     from dotenv import load_dotenv
     HAS_DOTENV = True
 except ImportError:
     HAS_DOTENV = False
 
+# Dataset Hugging Face du corpus luxembourgeois
+DEPOT_HF = "POTOMITAN/luxembourgish-corpus"
+# Corpus de transcriptions : seule la colonne de texte est lue, jamais l'audio
+COLONNES_HF = ("Texte",)
+# Au-delà de ce nombre de textes, le comptage passe en mémoire bornée
+# (comptage_borne.py) plutôt que de garder tout le flux tokenisé.
+SEUIL_TEXTES_COMPTAGE_EXACT = 200_000
+
+# Pattern adapté pour le luxembourgeois (incluant les caractères spéciaux)
+PATTERN_MOT = re.compile(r'\b[a-zA-ZàáâäèéêëìíîïòóôöùúûüçñÀÁÂÄÈÉÊËÌÍÎÏÒÓÔÖÙÚÛÜÇÑäëéöü\-]{2,}\b')
+
 class LuxembourgishPipelineUnique:
     """Pipeline unique automatique pour le système luxembourgeois"""
     
@@ -60,25 +102,58 @@ class LuxembourgishPipelineUnique:
         self.version = "1.0 - Pipeline Luxembourgeois"
         self.chemin_dict = "../android_keyboard/app/src/main/assets/luxemburgish_dict.json"
         self.chemin_ngrams = "../android_keyboard/app/src/main/assets/luxemburgish_ngrams.json"
-        self.hf_token = None
+        # Rapport d'exécution (durée, mémoire, volumes de chaque étape)
+        self.chemin_rapport_execution = "rapport_execution_luxembourgeois.json"
+        # État du corpus (empreintes et comptes) pour la reconstruction incrémentale
+        self.chemin_etat = "etat/luxemburgish_corpus.npz"
         # En mode strict, le repli sur le corpus local est refusé : mieux vaut
         # un build rouge qu'un dictionnaire reconstruit sur quinze phrases.
         self.strict = "--strict" in sys.argv
         self.textes_luxembourgeois = []
-        self.dictionnaire_actuel = {}
-        self.ngrams_actuels = {}
+        self.corpus_tokenise = None  # Flux d'identifiants partagé par les étapes
+        self.compteur_ngrammes = None  # Comptes uni/bi/trigrammes (NumPy)
+        # --workers N : tokenisation et comptage répartis sur N processus.
+        # Les fichiers produits sont identiques à ceux d'une exécution en série.
+        self.workers = max(1, valeur_option("--workers", 1, int))
+        # --ngram-model : kneser-ney (scores lissés, cf. modele_kneser_ney.py) ou mle
+        self.modele_ngrammes = valeur_option("--ngram-model", "kneser-ney")
+        if self.modele_ngrammes not in MODELES:
+            print(f"⚠️ Modèle N-grams inconnu '{self.modele_ngrammes}', kneser-ney utilisé "
+                  f"(choix: {', '.join(MODELES)})")
+            self.modele_ngrammes = "kneser-ney"
+        self.modele_lisse = None
+        # --max-asset-bytes / --max-contexts : budget de l'asset de n-grammes,
+        # atteint en retirant les prédictions les moins utiles (cf. elagage_ngrammes.py)
+        self.max_octets_ngrams = valeur_option("--max-asset-bytes", None, int)
+        self.max_contextes_ngrams = valeur_option("--max-contexts", None, int)
+        self.rapport_elagage = None
+        # --compact-json / --compress : format des assets JSON (cf. ecriture_assets.py)
+        self.json_compact = option_presente("--compact-json")
+        self.compression = methode_compression(valeur_option("--compress"))
+        # Sans --full-rebuild, seuls les textes modifiés depuis la dernière
+        # exécution sont recomptés (cf. etat_corpus.py).
+        self.recomptage_complet = option_presente("--full-rebuild")
+        self.etat_precedent = None
+        self.etat_corpus = None
+        # --bounded-memory : comptage en deux passes à mémoire bornée, sans
+        # état incrémental (le flux tokenisé n'est pas conservé).
+        self.memoire_bornee = option_presente("--bounded-memory")
+        self.erreur_comptage = valeur_option("--lossy-epsilon", ERREUR_PAR_DEFAUT, float)
+        self.empreintes_textes = []  # Empreintes calculées pendant la tokenisation
+        # hf_token, dictionnaire_actuel et ngrams_actuels : lus au premier
+        # accès (cf. propriétés), la construction ne touche pas au disque
         self.nouveau_dictionnaire = {}
         self.nouveaux_ngrams = {}
-        
-        # Affichage d'en-tête
+        self.statistiques_lexique = None  # cf. _statistiques_lexique()
+    
+    def initialiser(self):
+        """En-tête et configuration (.env, token), affichés avant les étapes ;
+        les assets existants ne sont lus qu'à leur première utilisation"""
         self._afficher_entete()
-        
-        # Chargement automatique
-        self._charger_configuration()
-        self._charger_donnees_existantes()
-        
+        token = self.hf_token
         print("✅ Pipeline initialisé")
-    
+        return token
+
     def _afficher_entete(self):
         """Affiche l'en-tête du pipeline"""
         print("🇱🇺 LUXEMBURGISH KEYBOARD™ - PIPELINE UNIQUE ET AUTOMATIQUE 🇱🇺")
@@ -90,8 +165,9 @@ class LuxembourgishPipelineUnique:
         print("\n🔧 INITIALISATION")
         print("-" * 30)
     
-    def _charger_configuration(self):
-        """Charge la configuration depuis .env"""
+    @cached_property
+    def hf_token(self):
+        """Token Hugging Face du .env, lu au premier accès"""
         env_paths = [".env", "../.env", "../../.env"]
         env_found = False
         
@@ -106,16 +182,16 @@ class LuxembourgishPipelineUnique:
         if env_found:
             token = os.getenv('HF_TOKEN') or os.getenv('HF_TOKEN_read_write')
             if token:
-                self.hf_token = token
                 print("🔑 Token Hugging Face configuré")
-            else:
-                print("⚠️ Token Hugging Face non trouvé dans .env")
+                return token
+            print("⚠️ Token Hugging Face non trouvé dans .env")
         else:
             print("⚠️ Configuration .env non trouvée (optionnel)")
+        return None
     
-    def _charger_donnees_existantes(self):
-        """Charge les données existantes si disponibles"""
-        # Dictionnaire existant
+    @cached_property
+    def dictionnaire_actuel(self):
+        """Dictionnaire déjà livré, lu au premier accès ({} s'il est absent)"""
         if os.path.exists(self.chemin_dict):
             try:
                 with open(self.chemin_dict, 'r', encoding='utf-8') as f:
@@ -124,23 +200,28 @@ class LuxembourgishPipelineUnique:
                 # On accepte aussi l'ancien format objet {"wuert": 123} pour pouvoir
                 # relire un dictionnaire produit avant la migration 10.9.2.
                 if isinstance(donnees, list):
-                    self.dictionnaire_actuel = {paire[0]: paire[1] for paire in donnees
-                                                if isinstance(paire, list) and len(paire) >= 2}
-                else:
-                    self.dictionnaire_actuel = donnees
-                print(f"📚 Dictionnaire existant: {len(self.dictionnaire_actuel)} mots")
+                    donnees = {paire[0]: paire[1] for paire in donnees
+                               if isinstance(paire, list) and len(paire) >= 2}
+                print(f"📚 Dictionnaire existant: {len(donnees)} mots")
+                return donnees
             except Exception as e:
                 print(f"⚠️ Erreur lecture dictionnaire: {e}")
-        
-        # N-grams existants
+        return {}
+    
+    @cached_property
+    def ngrams_actuels(self):
+        """N-grams déjà livrés, lus au premier accès ({} s'ils sont absents) :
+        à consulter avant `sauvegarder_donnees`, qui remplace le fichier"""
         if os.path.exists(self.chemin_ngrams):
             try:
                 with open(self.chemin_ngrams, 'r', encoding='utf-8') as f:
-                    self.ngrams_actuels = json.load(f)
-                predictions = len([k for k, v in self.ngrams_actuels.items() if isinstance(v, list) and v])
+                    ngrams = json.load(f)
+                predictions = len([k for k, v in ngrams.items() if isinstance(v, list) and v])
                 print(f"🧠 N-grams existants: {predictions} prédictions")
+                return ngrams
             except Exception as e:
                 print(f"⚠️ Erreur lecture N-grams: {e}")
+        return {}
     
     def charger_textes_luxembourgeois(self):
         """Charge les textes luxembourgeois depuis Hugging Face"""
@@ -149,58 +230,69 @@ class LuxembourgishPipelineUnique:
         
         textes_charges = False
         
-        # Essayer Hugging Face d'abord
-        dataset = None  # Initialisation pour éviter l'erreur de variable non définie
-        if HAS_DATASETS:
+        # Cache local : une révision déjà téléchargée est relue depuis le
+        # disque, sans load_dataset. Hors ligne, on reprend le dernier
+        # instantané connu (ce n'est pas le corpus de secours : --strict l'accepte).
+        # Sans lui, le dernier fichier de secours importé est repris sans
+        # nouvelle tentative réseau, sauf en mode strict qui le refuse.
+        cache = CacheCorpus(DEPOT_HF)
+        revision = cache.revision_distante(self.hf_token)
+        # Hub injoignable : pas de sonde des colonnes avant load_dataset
+        hub_joignable = revision is not None
+        if revision:
+            instantane = cache.instantane(revision)
+        else:
+            revision, instantane = cache.dernier_instantane(secours=not self.strict)
+        if instantane:
+            self.textes_luxembourgeois = instantane
+            textes_charges = True
+            print(f"💾 Corpus en cache: {len(instantane)} textes (révision {revision[:12]})")
+
+        # Sinon, Hugging Face
+        if not textes_charges and HAS_DATASETS:
             try:
                 print("🔄 Téléchargement depuis Hugging Face...")
-                print(f"   📡 Connexion au dataset POTOMITAN/luxembourgish-corpus...")
+                print(f"   📡 Connexion au dataset {DEPOT_HF}...")
                 print("   📝 Dataset texte détecté - Mode optimisé pour corpus textuel")
                 
                 # Chargement optimisé - utilisation du streaming pour traiter les données par lots
                 try:
                     print("   🚀 Méthode streaming (rapide)...")
-                    ds = load_dataset("POTOMITAN/luxembourgish-corpus", streaming=True)
+                    ds, projetee = charger_colonnes(DEPOT_HF, COLONNES_HF, sonder=hub_joignable,
+                                                    streaming=True, revision=revision)
                     
                     print("   ✅ Streaming activé")
+                    print(f"   🎯 Colonne 'Texte' seule ({'à la lecture' if projetee else 'après ouverture'})")
                     # Afficher les splits disponibles
                     available_splits = list(ds.keys())
                     print(f"   📁 Splits disponibles: {available_splits}")
                     print("   📝 Extraction des textes en mode streaming depuis TOUS les splits...")
                     
-                    self.textes_luxembourgeois = []
                     textes_vides = 0
                     textes_avec_texte = 0
                     total_processed = 0
                     
-                    # Traitement en streaming - plus rapide, pour tous les splits
-                    for split_name in available_splits:
-                        print(f"   🔹 Traitement du split '{split_name}'...")
-                        split_data = ds[split_name]
-                        
-                        for i, item in enumerate(split_data):
-                            # Limiter pour éviter trop de données en streaming
-                            if total_processed >= 500:  # Limite raisonnable pour le clavier
-                                break
-                                
-                            if "Texte" in item and item["Texte"]:
-                                self.textes_luxembourgeois.append({
-                                    "Texte": item["Texte"],
-                                    "Source": f"POTOMITAN/luxembourgish-corpus ({split_name}, streaming)",
-                                    "metadata": {k: v for k, v in item.items() if k not in ["Texte", "Source"]}
-                                })
-                                textes_avec_texte += 1
-                            else:
-                                textes_vides += 1
-                            
-                            total_processed += 1
-                            
-                            # Affichage de progression
-                            if total_processed % 50 == 0:
+                    # Traitement en streaming, pour tous les splits : chaque
+                    # lot Arrow est écrit dans l'instantané du cache au fil de l'eau.
+                    with cache.ecrire(revision or "inconnue") as ecriture:
+                        for split_name in available_splits:
+                            print(f"   🔹 Traitement du split '{split_name}'...")
+                            split_data = ds[split_name]
+                            source = f"{DEPOT_HF} ({split_name}, streaming)"
+
+                            for nombre, colonnes in lots_de_colonnes(split_data, COLONNES_HF):
+                                textes = [texte for texte in colonnes["Texte"] or () if texte]
+                                ecriture.ajouter_lot(textes, source)
+                                textes_avec_texte += len(textes)
+                                textes_vides += nombre - len(textes)
+                                total_processed += nombre
+
+                                # Affichage de progression
                                 print(f"      📊 Traité {total_processed} textes...")
-                        
-                        if total_processed >= 500:
-                            break
+
+                    # Tout le dataset est retenu : au-delà de quelques centaines de
+                    # milliers de textes, le comptage passe en mémoire bornée.
+                    self.textes_luxembourgeois = ecriture.textes
                     
                     print(f"   📈 Statistiques d'extraction (streaming):")
                     print(f"      - Textes traités: {textes_avec_texte + textes_vides}")
@@ -232,53 +324,35 @@ class LuxembourgishPipelineUnique:
                 # Fallback: méthode standard si streaming échoue
                 if not textes_charges:
                     # Utilisation du code simplifié avec chargement complet
-                    ds = load_dataset("POTOMITAN/luxembourgish-corpus")
-                    dataset = ds
+                    dataset, _ = charger_colonnes(DEPOT_HF, COLONNES_HF, sonder=hub_joignable,
+                                                  revision=revision)
                     print("   ✅ Dataset récupéré avec succès")
                     
                     # Vérifier la structure du dataset
                     print(f"   📁 Structure du dataset: {list(dataset.keys())}")
                     
-                    # Combiner TOUS les splits disponibles
-                    print("   📝 Combinaison de TOUS les splits...")
-                    all_items = []
+                    # Parcourir TOUS les splits disponibles, directement vers le cache
+                    print("   📝 Extraction des textes de TOUS les splits...")
                     total_rows = 0
-                    for split_name in dataset.keys():
-                        split_data = dataset[split_name]
-                        all_items.extend(split_data)
-                        total_rows += len(split_data)
-                        print(f"      - Split '{split_name}': {len(split_data)} rows")
-                    
-                    print(f"   📊 Nombre total de rows (tous splits): {total_rows}")
-                    print("   🔍 Extraction des textes...")
-                
-                    # Échantillon des premières rows pour debug
-                    print("   🔬 Échantillon des premières rows:")
-                    for i in range(min(3, len(all_items))):
-                        item = all_items[i]
-                        print(f"      Row {i+1}: {list(item.keys())}")
-                        if 'Texte' in item:
-                            preview = str(item['Texte'])[:50] + "..." if len(str(item['Texte'])) > 50 else str(item['Texte'])
-                            print(f"         Texte: '{preview}'")
-                    
-                    self.textes_luxembourgeois = []
                     textes_vides = 0
                     textes_avec_texte = 0
-                    
-                    for i, item in enumerate(all_items):
-                        if "Texte" in item and item["Texte"]:
-                            # Déterminer le split d'origine si possible
-                            split_source = "POTOMITAN/luxembourgish-corpus"
-                            self.textes_luxembourgeois.append({
-                                "Texte": item["Texte"],
-                                "Source": split_source,
-                                "metadata": {k: v for k, v in item.items() if k != "Texte"}
-                            })
-                            textes_avec_texte += 1
-                        else:
-                            textes_vides += 1
-                            if textes_vides <= 3:  # Afficher seulement les 3 premiers exemples
-                                print(f"   ⚠️ Row {i+1} sans texte valide: {list(item.keys())}")
+                    with cache.ecrire(revision or "inconnue") as ecriture:
+                        for split_name in dataset.keys():
+                            split_data = dataset[split_name]
+                            print(f"      - Split '{split_name}': {len(split_data)} rows")
+                            print(f"      Colonnes lues: {split_data.column_names}")
+                            for nombre, colonnes in lots_de_colonnes(split_data, COLONNES_HF):
+                                textes = colonnes["Texte"] or [None] * nombre
+                                for i, texte in enumerate(textes):
+                                    if not texte:
+                                        textes_vides += 1
+                                        if textes_vides <= 3:  # Afficher seulement les 3 premiers exemples
+                                            print(f"   ⚠️ Row {total_rows + i + 1} sans texte valide")
+                                valides = [texte for texte in textes if texte]
+                                ecriture.ajouter_lot(valides, DEPOT_HF)
+                                textes_avec_texte += len(valides)
+                                total_rows += nombre
+                    self.textes_luxembourgeois = ecriture.textes
                     
                     print(f"   📈 Statistiques d'extraction:")
                     print(f"      - Rows totales: {total_rows}")
@@ -289,7 +363,7 @@ class LuxembourgishPipelineUnique:
                     if self.textes_luxembourgeois:
                         print(f"🎉 TÉLÉCHARGEMENT HUGGING FACE RÉUSSI !")
                         print(f"   ✅ {len(self.textes_luxembourgeois)} textes récupérés")
-                        print(f"   📊 Source: Dataset POTOMITAN/luxembourgish-corpus")
+                        print(f"   📊 Source: Dataset {DEPOT_HF}")
                         textes_charges = True
                     else:
                         print("❌ TÉLÉCHARGEMENT HUGGING FACE ÉCHOUÉ !")
@@ -299,7 +373,7 @@ class LuxembourgishPipelineUnique:
                 print("❌ TÉLÉCHARGEMENT HUGGING FACE ÉCHOUÉ !")
                 print(f"   💥 Erreur: {e}")
                 print("   🔄 Passage au mode fallback local...")
-        else:
+        elif not textes_charges:
             print("❌ TÉLÉCHARGEMENT HUGGING FACE IMPOSSIBLE !")
             print("   📦 Bibliothèque 'datasets' non installée")
             print("   🔄 Passage au mode fallback local...")
@@ -327,16 +401,11 @@ class LuxembourgishPipelineUnique:
                 if os.path.exists(chemin):
                     try:
                         print(f"   📁 Fichier trouvé, chargement...")
-                        with open(chemin, 'r', encoding='utf-8') as f:
-                            data = json.load(f)
-                        
-                        if isinstance(data, list):
-                            self.textes_luxembourgeois = data
-                        elif isinstance(data, dict) and "textes" in data:
-                            self.textes_luxembourgeois = data["textes"]
-                        else:
+                        textes = cache.importer_json(chemin)
+                        if textes is None:
                             print(f"   ⚠️ Format inattendu dans {chemin}")
                             continue
+                        self.textes_luxembourgeois = textes
                         
                         print(f"✅ FALLBACK RÉUSSI !")
                         print(f"   📊 {len(self.textes_luxembourgeois)} textes chargés depuis {chemin}")
@@ -366,46 +435,115 @@ class LuxembourgishPipelineUnique:
         print(f"   ✅ Prêt pour traitement")
         
         return True
-    
+
+    def tokeniser_textes(self):
+        """Tokenise le corpus une seule fois pour toutes les étapes suivantes"""
+        print("\n🔤 TOKENISATION DU CORPUS LUXEMBOURGEOIS")
+        print("-" * 45)
+
+        if not self.textes_luxembourgeois:
+            print("❌ Aucun texte disponible")
+            return False
+
+        if len(self.textes_luxembourgeois) > SEUIL_TEXTES_COMPTAGE_EXACT and not self.memoire_bornee:
+            print(f"ℹ️ {len(self.textes_luxembourgeois)} textes (> {SEUIL_TEXTES_COMPTAGE_EXACT}): "
+                  f"comptage en mémoire bornée")
+            self.memoire_bornee = True
+
+        if self.memoire_bornee:
+            return self._compter_en_memoire_bornee()
+
+        if not self.recomptage_complet:
+            self.etat_precedent = EtatCorpus.charger(self.chemin_etat, PATTERN_MOT)
+
+        if self.etat_precedent is not None:
+            self.etat_corpus, bilan = self.etat_precedent.mettre_a_jour(
+                self.textes_luxembourgeois, PATTERN_MOT, self.workers)
+            self.corpus_tokenise = self.etat_corpus.corpus
+            self.compteur_ngrammes = self.etat_corpus.compteur
+            print(f"♻️ Reconstruction incrémentale ({self.chemin_etat}):")
+            print(f"   - Textes inchangés: {bilan['conserves']}")
+            print(f"   - Textes nouveaux comptés: {bilan['nouveaux']}")
+            print(f"   - Textes retirés: {bilan['retires']}")
+        else:
+            # Les textes passent un à un du chargeur au comptage ; leur empreinte
+            # (pour la prochaine exécution incrémentale) est prise au passage.
+            self.empreintes_textes = []
+            flux = empreintes_au_passage(iterer_contenus(self.textes_luxembourgeois),
+                                         self.empreintes_textes)
+            if self.workers > 1:
+                print(f"⚙️ Tokenisation et comptage répartis sur {self.workers} processus")
+                self.corpus_tokenise, self.compteur_ngrammes = compter_en_parallele(
+                    flux, PATTERN_MOT, self.workers, nombre_textes=len(self.textes_luxembourgeois))
+            else:
+                self.corpus_tokenise = tokeniser_corpus(flux, PATTERN_MOT)
+                self.compteur_ngrammes = None
+
+        print(f"✅ Corpus tokenisé:")
+        print(f"   - Textes: {self.corpus_tokenise.nombre_textes}")
+        print(f"   - Tokens: {self.corpus_tokenise.total_tokens}")
+        print(f"   - Vocabulaire: {len(self.corpus_tokenise.vocabulaire)} mots")
+
+        return True
+
+    def _compter_en_memoire_bornee(self):
+        """Comptage du corpus complet en deux passes, à mémoire bornée"""
+        print(f"🪣 Comptage en mémoire bornée (ε = {self.erreur_comptage:g})")
+        # Le flux tokenisé n'est pas conservé : pas d'état à relire ni à écrire
+        print(f"ℹ️ Reconstruction incrémentale désactivée: le comptage en mémoire bornée "
+              f"ne garde pas le flux tokenisé, {self.chemin_etat} n'est ni lu ni mis à jour")
+        self.corpus_tokenise, self.compteur_ngrammes, bilan = compter_en_flux(
+            self.textes_luxembourgeois, PATTERN_MOT, self.erreur_comptage)
+
+        print(f"✅ Corpus compté en deux passes:")
+        print(f"   - Textes: {self.corpus_tokenise.nombre_textes}")
+        print(f"   - Tokens: {bilan['total_tokens']}")
+        print(f"   - Vocabulaire: {len(self.corpus_tokenise.vocabulaire)} mots")
+        print(f"   - Bigrammes retenus: {bilan['bigrammes_retenus']}")
+        print(f"   - Trigrammes retenus: {bilan['trigrammes_retenus']}")
+        if not bilan['exact']:
+            print(f"   ℹ️ N-grammes rares élagués (fréquence < ε·N), comptes des autres exacts")
+
+        return True
+
+    def _corpus(self):
+        """Flux tokenisé, produit à la demande si l'étape n'a pas encore tourné"""
+        if self.corpus_tokenise is None:
+            self.tokeniser_textes()
+        return self.corpus_tokenise
+
+    def _compteur(self):
+        """Comptes des n-grammes, calculés à la demande depuis le flux tokenisé"""
+        if self.compteur_ngrammes is None:
+            self.compteur_ngrammes = CompteurNgrammes.depuis_corpus(self._corpus())
+        return self.compteur_ngrammes
+
     def creer_dictionnaire(self):
         """Crée un dictionnaire enrichi à partir des textes luxembourgeois"""
         print("\n📚 CRÉATION DU DICTIONNAIRE LUXEMBOURGEOIS")
         print("-" * 45)
-        
+
         if not self.textes_luxembourgeois:
             print("❌ Aucun texte disponible")
             return False
-        
+
         print(f"🔍 Analyse de {len(self.textes_luxembourgeois)} textes...")
-        
-        compteur_mots = Counter()
-        # Pattern adapté pour le luxembourgeois (incluant les caractères spéciaux)
-        pattern_mot = re.compile(r'\b[a-zA-ZàáâäèéêëìíîïòóôöùúûüçñÀÁÂÄÈÉÊËÌÍÎÏÒÓÔÖÙÚÛÜÇÑäëéöü\-]{2,}\b')
-        
-        for transcription in self.textes_luxembourgeois:
-            if isinstance(transcription, dict):
-                contenu_texte = transcription.get("Texte", "")
-            else:
-                contenu_texte = str(transcription) if transcription is not None else ""
-            
-            if not contenu_texte:
-                continue
-                
-            mots = pattern_mot.findall(contenu_texte.lower())
-            for mot in mots:
-                mot = mot.strip('-')
-                if len(mot) >= 2:
-                    compteur_mots[mot] += 1
-        
-        # Fusionner avec le dictionnaire existant
-        for mot, freq_nouvelle in compteur_mots.items():
-            freq_existante = self.dictionnaire_actuel.get(mot, 0)
-            compteur_mots[mot] = freq_existante + freq_nouvelle
-        
-        # Ajouter les mots existants non trouvés
-        for mot, freq in self.dictionnaire_actuel.items():
-            if mot not in compteur_mots:
-                compteur_mots[mot] = freq
+
+        corpus = self._corpus()
+        if self.etat_precedent is not None:
+            # La fréquence stockée contient déjà les comptes du corpus précédent,
+            # connus par l'état : on leur substitue le comptage actuel.
+            comptes = {mot: compte for mot, compte
+                       in zip(corpus.vocabulaire, self._compteur().unigrammes.tolist()) if compte}
+            compteur_mots, _ = fusionner_frequences(
+                comptes, self.dictionnaire_actuel, self.etat_precedent.comptes_mots())
+        else:
+            # Sans état (première exécution, --full-rebuild) : le comptage
+            # remplace la fréquence stockée au lieu de s'y ajouter, comme le
+            # ferait une exécution incrémentale (cf. remplacer_frequences)
+            compteur_mots, _ = remplacer_frequences(
+                dict(zip(corpus.vocabulaire, self._compteur().unigrammes.tolist())),
+                self.dictionnaire_actuel)
         
         self.nouveau_dictionnaire = dict(compteur_mots.most_common())
         
@@ -428,38 +566,14 @@ class LuxembourgishPipelineUnique:
         
         print("🔄 Génération des N-grams...")
         
-        unigrammes = Counter()
-        bigrammes = Counter()
-        trigrammes = Counter()
-        
-        # Pattern adapté pour le luxembourgeois
-        pattern_mot = re.compile(r'\b[a-zA-ZàáâäèéêëìíîïòóôöùúûüçñÀÁÂÄÈÉÊËÌÍÎÏÒÓÔÖÙÚÛÜÇÑäëéöü\-]{2,}\b')
-        
-        for transcription in self.textes_luxembourgeois:
-            if isinstance(transcription, dict):
-                contenu_texte = transcription.get("Texte", "")
-            else:
-                contenu_texte = str(transcription) if transcription is not None else ""
-            
-            if not contenu_texte:
-                continue
-                
-            mots = [mot.lower().strip('-') for mot in pattern_mot.findall(contenu_texte.lower()) if len(mot.strip('-')) >= 2]
-            
-            # Unigrammes
-            for mot in mots:
-                unigrammes[mot] += 1
-            
-            # Bigrammes
-            for i in range(len(mots) - 1):
-                bigramme = (mots[i], mots[i + 1])
-                bigrammes[bigramme] += 1
-            
-            # Trigrammes
-            for i in range(len(mots) - 2):
-                trigramme = (mots[i], mots[i + 1], mots[i + 2])
-                trigrammes[trigramme] += 1
-        
+        SEUIL_PERTINENCE = 0.01
+        MAX_PREDICTIONS = 5
+
+        # Comptage sur identifiants entiers, bigrammes et trigrammes empaquetés
+        # en clés de 64 bits (cf. comptage_ngrammes).
+        corpus = self._corpus()
+        compteur = self._compteur()
+
         # Créer le modèle de prédictions.
         #
         # Le moteur (SuggestionEngine.resolveNgramContext) interroge d'abord une
@@ -467,54 +581,49 @@ class LuxembourgishPipelineUnique:
         # rabat sur le dernier mot seul, « der ». Les deux familles de clés
         # cohabitent donc dans le même objet plat, et n'émettre que la seconde
         # rendrait le contexte trigramme inopérant.
-        predictions = {}
-
-        def _classer(candidats_par_cle, contextes):
-            """Transforme {contexte: Counter(suivants)} en prédictions triées."""
-            for contexte, suivants in candidats_par_cle.items():
-                total = contextes[contexte]
-                if not total:
-                    continue
-                candidats = [
-                    {"word": suivant, "probability": round(freq / total, 3)}
-                    for suivant, freq in suivants.items()
-                    if freq / total > SEUIL_PERTINENCE
-                ]
-                if candidats:
-                    candidats.sort(key=lambda c: c["probability"], reverse=True)
-                    predictions[contexte] = candidats[:MAX_PREDICTIONS]
-
-        SEUIL_PERTINENCE = 0.01
-        MAX_PREDICTIONS = 5
+        #
+        # Avec Kneser-Ney, chaque clé porte déjà les suites interpolées avec le
+        # niveau inférieur : le seuil de pertinence s'applique au score lissé.
+        if self.modele_ngrammes == "mle":
+            modele = compteur
+        else:
+            modele = self.modele_lisse = ModeleKneserNey(compteur)
+        predictions, _ = modele.predictions(corpus.vocabulaire, SEUIL_PERTINENCE, MAX_PREDICTIONS)
 
-        # Clés à un mot, depuis les bigrammes. Le regroupement préalable évite
-        # le balayage de tous les bigrammes pour chaque unigramme (quadratique).
-        suivants_par_mot = defaultdict(Counter)
-        for (premier, suivant), freq in bigrammes.items():
-            suivants_par_mot[premier][suivant] += freq
-        _classer(suivants_par_mot, unigrammes)
-
-        # Clés à deux mots, depuis les trigrammes.
-        suivants_par_paire = defaultdict(Counter)
-        for (premier, deuxieme, suivant), freq in trigrammes.items():
-            suivants_par_paire[f"{premier} {deuxieme}"][suivant] += freq
-        contextes_paires = Counter()
-        for (premier, deuxieme), freq in bigrammes.items():
-            contextes_paires[f"{premier} {deuxieme}"] += freq
-        _classer(suivants_par_paire, contextes_paires)
+        if self.max_octets_ngrams is not None or self.max_contextes_ngrams is not None:
+            predictions, self.rapport_elagage = elaguer_predictions(
+                predictions, compteur, corpus.index,
+                self.max_octets_ngrams, self.max_contextes_ngrams, self.json_compact)
+            if self.modele_lisse is not None:
+                # Poids de repli des seules clés restantes
+                self.modele_lisse.poids_repli = {cle: poids for cle, poids
+                                                 in self.modele_lisse.poids_repli.items()
+                                                 if cle in predictions}
 
         self.nouveaux_ngrams = predictions
 
         cles_deux_mots = sum(1 for cle in predictions if " " in cle)
         print(f"✅ N-grams luxembourgeois créés:")
-        print(f"   - Unigrammes: {len(unigrammes)}")
-        print(f"   - Bigrammes: {len(bigrammes)}")
-        print(f"   - Trigrammes: {len(trigrammes)}")
+        print(f"   - Unigrammes: {compteur.nombre_unigrammes}")
+        print(f"   - Bigrammes: {compteur.nombre_bigrammes}")
+        print(f"   - Trigrammes: {compteur.nombre_trigrammes}")
         print(f"   - Prédictions: {len(predictions)} "
               f"({len(predictions) - cles_deux_mots} à un mot, {cles_deux_mots} à deux mots)")
+        if self.modele_lisse is not None:
+            print(f"   - Modèle: Kneser-Ney interpolé ({self.modele_lisse.cles_redondantes} clés à deux mots "
+                  f"identiques à leur repli non exportées)")
+        if self.rapport_elagage is not None:
+            afficher_elagage(self.rapport_elagage)
 
         return True
     
+    def _statistiques_lexique(self):
+        """Statistiques vectorisées du nouveau dictionnaire (calculées une fois)"""
+        if self.statistiques_lexique is None or \
+                self.statistiques_lexique.dictionnaire is not self.nouveau_dictionnaire:
+            self.statistiques_lexique = StatistiquesLexique(self.nouveau_dictionnaire)
+        return self.statistiques_lexique
+
     def analyser_statistiques(self):
         """Analyse statistique complète du dictionnaire et des N-grams luxembourgeois"""
         print("\n📊 ANALYSE STATISTIQUE COMPLÈTE LUXEMBOURGEOISE")
@@ -525,25 +634,26 @@ class LuxembourgishPipelineUnique:
             return False
         
         # Statistiques du dictionnaire
-        mots = list(self.nouveau_dictionnaire.keys())
-        frequences = list(self.nouveau_dictionnaire.values())
+        stats = self._statistiques_lexique()
+        frequences = stats.frequences
+        nombre_mots = len(stats)
         
         print(f"\n📚 ANALYSE DICTIONNAIRE LUXEMBOURGEOIS:")
-        print(f"   - Total mots: {len(mots)}")
-        print(f"   - Fréquence min: {min(frequences)}")
-        print(f"   - Fréquence max: {max(frequences)}")
-        print(f"   - Fréquence moyenne: {sum(frequences) / len(frequences):.1f}")
+        print(f"   - Total mots: {nombre_mots}")
+        print(f"   - Fréquence min: {frequences.min()}")
+        print(f"   - Fréquence max: {frequences.max()}")
+        print(f"   - Fréquence moyenne: {stats.total / nombre_mots:.1f}")
         
         # Catégories de fréquence
-        tres_rares = sum(1 for f in frequences if f == 1)
-        rares = sum(1 for f in frequences if 2 <= f <= 5)
-        frequents = sum(1 for f in frequences if 6 <= f <= 20)
-        tres_frequents = sum(1 for f in frequences if f > 20)
+        tres_rares = stats.effectif(1, 1)
+        rares = stats.effectif(2, 5)
+        frequents = stats.effectif(6, 20)
+        tres_frequents = stats.effectif(21)
         
-        print(f"   - Très rares (freq=1): {tres_rares} ({tres_rares/len(mots)*100:.1f}%)")
-        print(f"   - Rares (freq 2-5): {rares} ({rares/len(mots)*100:.1f}%)")
-        print(f"   - Fréquents (freq 6-20): {frequents} ({frequents/len(mots)*100:.1f}%)")
-        print(f"   - Très fréquents (freq>20): {tres_frequents} ({tres_frequents/len(mots)*100:.1f}%)")
+        print(f"   - Très rares (freq=1): {tres_rares} ({tres_rares/nombre_mots*100:.1f}%)")
+        print(f"   - Rares (freq 2-5): {rares} ({rares/nombre_mots*100:.1f}%)")
+        print(f"   - Fréquents (freq 6-20): {frequents} ({frequents/nombre_mots*100:.1f}%)")
+        print(f"   - Très fréquents (freq>20): {tres_frequents} ({tres_frequents/nombre_mots*100:.1f}%)")
         
         # Top 15 des mots
         print(f"\n   🏆 TOP 15 MOTS LUXEMBOURGEOIS:")
@@ -551,16 +661,14 @@ class LuxembourgishPipelineUnique:
             print(f"        {i+1:2d}. {mot:<15} (freq: {freq})")
         
         # Analyse des mots longs
-        mots_longs = [(mot, len(mot)) for mot in mots if len(mot) >= 10]
-        mots_longs.sort(key=lambda x: x[1], reverse=True)
+        mots_longs = stats.mots_longs(10, limite=5)
         
         print(f"\n   📏 ANALYSE MOTS LONGS LUXEMBOURGEOIS:")
-        print(f"   - Mots ≥10 caractères: {len(mots_longs)}")
+        print(f"   - Mots ≥10 caractères: {stats.nombre_mots_longs(10)}")
         if mots_longs:
             print(f"   - Mot le plus long: '{mots_longs[0][0]}' ({mots_longs[0][1]} caractères)")
             print(f"   - Top 5 mots longs:")
-            for i, (mot, longueur) in enumerate(mots_longs[:5]):
-                freq = self.nouveau_dictionnaire[mot]
+            for i, (mot, longueur, freq) in enumerate(mots_longs[:5]):
                 print(f"     {i+1}. {mot} ({longueur} char, freq: {freq})")
         
         # Statistiques N-grams
@@ -621,6 +729,11 @@ class LuxembourgishPipelineUnique:
         
         return True
     
+    def _ecrire_asset(self, donnees, chemins, bilan):
+        """Écrit un asset JSON au format choisi (--compact-json, --compress),
+        sérialisé une fois pour toutes ses cibles"""
+        return ecrire_json(donnees, chemins, self.json_compact, self.compression, bilan)
+
     def sauvegarder_donnees(self):
         """Sauvegarde les nouvelles données luxembourgeoises"""
         print("\n💾 SAUVEGARDE DES DONNÉES LUXEMBOURGEOISES")
@@ -639,6 +752,9 @@ class LuxembourgishPipelineUnique:
             shutil.copy2(self.chemin_ngrams, backup_ngrams)
             print(f"📁 Backup N-grams luxembourgeois: {backup_ngrams}")
         
+        # Format des assets JSON (indenté ou compact) et bilan de leurs tailles
+        bilan = BilanTailles(self.json_compact, self.compression)
+
         # Sauvegarder le nouveau dictionnaire.
         #
         # Le moteur attend une liste de paires [["wuert", 123], ...] triée par
@@ -647,22 +763,52 @@ class LuxembourgishPipelineUnique:
         # non vide) tout en désactivant silencieusement les suggestions — c'est
         # exactement ce qui est arrivé en amont sur la v10.2.6.
         if self.nouveau_dictionnaire:
-            os.makedirs(os.path.dirname(self.chemin_dict), exist_ok=True)
             paires = sorted(self.nouveau_dictionnaire.items(),
                             key=lambda item: (-item[1], item[0]))
-            with open(self.chemin_dict, 'w', encoding='utf-8') as f:
-                json.dump([[mot, freq] for mot, freq in paires], f,
-                          ensure_ascii=False, indent=2)
+            ecrire_paires_json(paires, self.chemin_dict, self.json_compact, self.compression, bilan)
             print(f"✅ Dictionnaire luxembourgeois sauvegardé: {len(paires)} mots")
+
+            # Index de préfixes (complétion sans parcours du dictionnaire)
+            taille_idx = ecrire_index_prefixes(paires, chemin_index(self.chemin_dict))
+            print(f"✅ Index de préfixes sauvegardé: {taille_idx:,} octets")
+
+            # Index de corrections (suppressions symétriques, distance ≤ 2)
+            taille_corr = ecrire_index_corrections(paires, chemin_index_corrections(self.chemin_dict))
+            print(f"✅ Index de corrections sauvegardé: {taille_corr:,} octets")
         
         # Sauvegarder les nouveaux N-grams
         if self.nouveaux_ngrams:
-            os.makedirs(os.path.dirname(self.chemin_ngrams), exist_ok=True)
-            with open(self.chemin_ngrams, 'w', encoding='utf-8') as f:
-                json.dump(self.nouveaux_ngrams, f, ensure_ascii=False, indent=2)
+            self._ecrire_asset(self.nouveaux_ngrams, self.chemin_ngrams, bilan)
             print(f"✅ N-grams luxembourgeois sauvegardés: {len(self.nouveaux_ngrams)} prédictions")
+
+            # Format binaire compact (mmap), en évaluation hors de l'APK
+            taille_bin = ecrire_ngrams_binaires(self.nouveaux_ngrams, chemin_binaire(self.chemin_ngrams))
+            taille_json = os.path.getsize(self.chemin_ngrams)
+            print(f"✅ N-grams binaires sauvegardés: {taille_bin:,} octets "
+                  f"(JSON: {taille_json:,}, {taille_bin / taille_json:.0%})")
+
+            if self.modele_lisse is not None:
+                chemin_repli = chemin_poids_repli(self.chemin_ngrams)
+                self.modele_lisse.ecrire_poids_repli(chemin_repli, self.json_compact,
+                                                     self.compression, bilan)
+                print(f"✅ Poids de repli sauvegardés: {chemin_repli}")
+
+        bilan.afficher()
+        self._sauvegarder_etat()
         
         return True
+
+    def _sauvegarder_etat(self):
+        """Écrit l'état du corpus pour la prochaine reconstruction incrémentale"""
+        if self.corpus_tokenise is None or not self.nouveau_dictionnaire or self.memoire_bornee:
+            return
+        etat = self.etat_corpus or EtatCorpus(
+            self.empreintes_textes, self._corpus(), self._compteur())
+        try:
+            etat.sauvegarder(self.chemin_etat, PATTERN_MOT)
+            print(f"✅ État du corpus luxembourgeois sauvegardé: {self.chemin_etat}")
+        except OSError as e:
+            print(f"⚠️ État du corpus non sauvegardé: {e}")
     
     def valider_donnees(self):
         """Validation complète des données luxembourgeoises"""
@@ -700,6 +846,54 @@ class LuxembourgishPipelineUnique:
             print("   ❌ Fichier N-grams luxembourgeois manquant")
             succes_total = False
         
+        # Test index de préfixes
+        chemin_idx = chemin_index(self.chemin_dict)
+        if os.path.exists(chemin_idx) and os.path.exists(self.chemin_dict):
+            print("\n🔤 Test index de préfixes...")
+            try:
+                with open(self.chemin_dict, 'r', encoding='utf-8') as f:
+                    ecarts = valider_index_prefixes(chemin_idx, json.load(f))
+                if ecarts:
+                    print(f"   ❌ {len(ecarts)} préfixes différents du parcours linéaire (ex.: {ecarts[:3]})")
+                    succes_total = False
+                else:
+                    print("   ✅ Complétions identiques au parcours linéaire")
+            except Exception as e:
+                print(f"   ❌ Erreur: {e}")
+                succes_total = False
+
+        # Test index de corrections
+        chemin_corr = chemin_index_corrections(self.chemin_dict)
+        if os.path.exists(chemin_corr) and os.path.exists(self.chemin_dict):
+            print("\n🔧 Test index de corrections...")
+            try:
+                with open(self.chemin_dict, 'r', encoding='utf-8') as f:
+                    ecarts = valider_index_corrections(chemin_corr, json.load(f))
+                if ecarts:
+                    print(f"   ❌ {len(ecarts)} saisies corrigées autrement que par le parcours linéaire "
+                          f"(ex.: {ecarts[:3]})")
+                    succes_total = False
+                else:
+                    print("   ✅ Corrections identiques au parcours linéaire")
+            except Exception as e:
+                print(f"   ❌ Erreur: {e}")
+                succes_total = False
+
+        # Test format binaire, face aux N-grams de cette exécution (sans relire le JSON)
+        chemin_bin = chemin_binaire(self.chemin_ngrams)
+        if os.path.exists(chemin_bin) and self.nouveaux_ngrams:
+            print("\n📦 Test N-grams binaires...")
+            try:
+                ecarts = valider_ngrams_binaires(chemin_bin, self.nouveaux_ngrams)
+                if ecarts:
+                    print(f"   ❌ {len(ecarts)} contextes différents du JSON (ex.: {ecarts[:3]})")
+                    succes_total = False
+                else:
+                    print("   ✅ Relecture identique au JSON")
+            except Exception as e:
+                print(f"   ❌ Erreur: {e}")
+                succes_total = False
+
         # Test prédictions avec des mots luxembourgeois
         print("\n🎯 Test prédictions luxembourgeoises...")
         exemples = ["den", "ech", "dat", "mir"]
@@ -758,13 +952,39 @@ class LuxembourgishPipelineUnique:
         
         return score >= 3
     
+    def _ecrire_rapport_execution(self):
+        """Rapport JSON des étapes, à côté du rapport linguistique"""
+        self.mesures.afficher_resume()
+        if self.mesures.ecrire(self.chemin_rapport_execution, version=self.version,
+                               workers=self.workers, volumes=self._volumes()):
+            print(f"📈 Rapport d'exécution : {self.chemin_rapport_execution}")
+
+    def _volumes(self):
+        """Volumes traités jusqu'ici, relevés après chaque étape"""
+        volumes = {"textes": len(self.textes_luxembourgeois)}
+        if self.corpus_tokenise is not None:
+            volumes["tokens"] = self.corpus_tokenise.total_tokens
+            volumes["vocabulaire"] = len(self.corpus_tokenise.vocabulaire)
+        if self.compteur_ngrammes is not None:
+            compteur = self.compteur_ngrammes
+            volumes["tokens"] = compteur.total_tokens
+            volumes["bigrammes"] = compteur.nombre_bigrammes
+            volumes["trigrammes"] = compteur.nombre_trigrammes
+        volumes["mots_dictionnaire"] = len(self.nouveau_dictionnaire)
+        volumes["contextes_ngrams"] = len(self.nouveaux_ngrams)
+        if self.rapport_elagage is not None:
+            volumes["octets_ngrams_elagues"] = self.rapport_elagage["octets_apres"]
+        return volumes
+
     def executer_pipeline(self):
         """Exécute le pipeline complet automatiquement"""
+        self.initialiser()
         print("\n🚀 PIPELINE AUTOMATIQUE COMPLET LUXEMBOURGEOIS")
         print("=" * 50)
         
         etapes = [
             ("Chargement textes", self.charger_textes_luxembourgeois),
+            ("Tokenisation", self.tokeniser_textes),
             ("Création dictionnaire", self.creer_dictionnaire),
             ("Génération N-grams", self.creer_ngrams),
             ("Analyse statistiques", self.analyser_statistiques),
@@ -774,11 +994,13 @@ class LuxembourgishPipelineUnique:
         ]
         
         succes_total = True
-
+        self.mesures = MesureEtapes("luxembourgish", self._volumes, valeur_option("--profile"),
+                                    trace_memoire=option_presente("--tracemalloc"))
+        
         for i, (nom, fonction) in enumerate(etapes, 1):
             print(f"\n⏳ Étape {i}/{len(etapes)}: {nom}")
             try:
-                succes = fonction()
+                succes = self.mesures.executer(nom, fonction)
                 if succes:
                     print(f"✅ {nom} - Terminé")
                 else:
@@ -792,11 +1014,13 @@ class LuxembourgishPipelineUnique:
                     # accès à une méthode liée crée un nouvel objet.
                     if self.strict and nom == "Chargement textes":
                         print("\n🛑 Mode strict : pipeline interrompu, aucun fichier réécrit.")
+                        self._ecrire_rapport_execution()
                         return False
             except Exception as e:
                 print(f"❌ {nom} - Erreur: {e}")
                 succes_total = False
-        
+
+        self._ecrire_rapport_execution()
         return succes_total
 
 def main():
@@ -12,30 +12,39 @@ Pipeline optimisé pour créer le dictionnaire et les n-grammes luxembourgeois
 pour l'intégration dans le clavier Android, en ignorant complètement les données audio.
 
 OPTIMISATIONS:
-- Chargement direct sans streaming
-- Ignore complètement l'audio
+- Chargement direct sans streaming (Arrow projeté en mémoire, non copié)
+- Ignore complètement l'audio (seule la colonne Texte est lue)
 - Traitement rapide des textes uniquement
-- Limite à 500 textes pour la performance
+- Corpus complet lu en deux passes : mots du dictionnaire et n-grammes comptés
+  ensemble, en mémoire bornée
+- Tokenisation et comptages vectorisés sur les lots Arrow (cf. comptage_arrow)
+- N-grammes au format du clavier {contexte: [{word, probability}]}, comme le
+  pipeline complet (clés à un et à deux mots)
+
+OPTIONS:
+  --time-budget S  Modèle construit sur un échantillon aléatoire du corpus,
+                   compté en S secondes, avec estimation de sa couverture
+  --compact-json   Fichiers JSON sans indentation ni espaces (même contenu)
+  --compress M     Variante précompressée de chaque asset : gzip ou zstd
 ======================================================================
 """
 
+import math
 import os
 import sys
-import json
-import re
 import time
 from datetime import datetime
-from collections import Counter, defaultdict
 
-# Gestion des dépendances optionnelles
-try:
-    from datasets import load_dataset
-    HAS_DATASETS = True
-    print("✅ Bibliothèque 'datasets' disponible")
-except ImportError:
-    HAS_DATASETS = False
-    print("❌ Bibliothèque 'datasets' non disponible - mode fallback uniquement")
+from comptage_arrow import (ComptageApproximatifArrow, ComptesArrow, compteur_ngrammes,
+                            mots_luxembourgeois, mots_par_texte, ngrammes_par_ordre, parmi,
+                            textes_retenus)
+from echantillonnage import (MAX_POINTS_COURBE, PART_COMPTAGE, TAILLE_BLOC, EchantillonneurAdaptatif,
+                             extrapoler_precision, precision_top5)
+from ecriture_assets import BilanTailles, ecrire_json, ecrire_paires_json, methode_compression
+from options import option_presente, valeur_option
+from projection_colonnes import HAS_DATASETS, charger_colonnes, lots_arrow
 
+# Gestion des dépendances optionnelles (datasets : cf. projection_colonnes)
 try:
     from dotenv import load_dotenv
     HAS_DOTENV = True
@@ -44,6 +53,10 @@ except ImportError:
     def load_dotenv():
         pass
 
+# Modèle de prédictions : mêmes réglages que le pipeline complet
+SEUIL_PERTINENCE = 0.01
+MAX_PREDICTIONS = 5
+
 class LuxembourgishKeyboardPipelineRapide:
     """
     Pipeline optimisé pour créer le dictionnaire et les n-grammes luxembourgeois
@@ -53,20 +66,36 @@ class LuxembourgishKeyboardPipelineRapide:
     def __init__(self):
         self.version = "1.0-RAPIDE"
         self.langue = "Luxembourgish"
-        self.textes_luxembourgeois = []
+        self.textes_luxembourgeois = []  # Textes du fallback local
+        self.dataset = None  # Split Hugging Face, relu à chaque passe
+        self.nombre_textes = 0
         self.mots_luxembourgeois = set()
         self.dictionnaire_luxembourgeois = {}
-        self.ngrams_luxembourgeois = defaultdict(int)
-        
-        # Configuration des caractères luxembourgeois
-        self.caracteres_luxembourgeois = set('äëéöüABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz')
-        
+        self.ngrams_luxembourgeois = {}
+        # Comptes déjà faits par l'échantillonnage (--time-budget), sinon None
+        self.mots_comptes = None
+        self.comptes_ngrammes = None
+        # --time-budget : secondes accordées au comptage d'un échantillon
+        self.budget_temps = valeur_option("--time-budget", None, float)
+        self.instantanes = []  # [(tokens, comptes figés)] pour la courbe de précision
+        self.textes_test = None
+        self.rapport_echantillon = None
+        # --compact-json / --compress : format des fichiers JSON (cf. ecriture_assets.py)
+        self.json_compact = option_presente("--compact-json")
+        self.compression = methode_compression(valeur_option("--compress"))
+
+    def _afficher_entete(self):
+        """Affiche l'en-tête du pipeline"""
         print(f"🇱🇺 LUXEMBURGISH KEYBOARD™ - PIPELINE ULTRA-RAPIDE 🇱🇺")
         print("=" * 70)
         print(f"Version: {self.version} - Pipeline Luxembourgeois Optimisé")
         print(f"Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
         print("🎯 TRAITEMENT RAPIDE - AUDIO IGNORÉ")
         print("=" * 70)
+        if HAS_DATASETS:
+            print("✅ Bibliothèque 'datasets' disponible")
+        else:
+            print("❌ Bibliothèque 'datasets' non disponible - mode fallback uniquement")
         
     def charger_textes_luxembourgeois(self):
         """
@@ -84,46 +113,45 @@ class LuxembourgishKeyboardPipelineRapide:
                 print("🚀 Mode ultra-rapide: Hugging Face...")
                 print("   📡 Connexion dataset POTOMITAN/luxembourgish-corpus")
                 
-                # Chargement direct avec limite pour la performance
-                print("   ⚡ Chargement optimisé (limite 500 textes)...")
-                ds = load_dataset("POTOMITAN/luxembourgish-corpus", split="train[:500]")
+                # Split complet : le dataset Arrow reste sur disque, les textes
+                # sont relus à chaque passe au lieu d'être copiés en mémoire.
+                # Seule la colonne "Texte" est lue : l'audio n'est ni
+                # téléchargé ni décodé (cf. projection_colonnes).
+                print("   ⚡ Chargement optimisé (split complet, colonne Texte)...")
+                ds, _ = charger_colonnes("POTOMITAN/luxembourgish-corpus", ("Texte",), split="train")
                 
                 print(f"   ✅ Dataset chargé: {len(ds)} entrées")
                 print("   📝 Extraction textes uniquement...")
                 
-                self.textes_luxembourgeois = []
+                self.dataset = ds
                 textes_valides = 0
+                echantillon = []
                 
-                for i, item in enumerate(ds):
-                    if "Texte" in item and item["Texte"] and item["Texte"].strip():
-                        texte = item["Texte"].strip()
-                        if len(texte) > 10:  # Filtrer les textes trop courts
-                            self.textes_luxembourgeois.append({
-                                "Texte": texte,
-                                "Source": "POTOMITAN/luxembourgish-corpus (optimisé)",
-                                "index": i
-                            })
-                            textes_valides += 1
-                    
-                    # Affichage de progression
-                    if (i + 1) % 100 == 0:
-                        print(f"      📊 Traité {i + 1}/{len(ds)} entrées...")
+                # Aperçu des premiers lots seulement, jusqu'au seuil minimum :
+                # le corpus n'est parcouru qu'au comptage, qui donne le nombre
+                # exact de textes retenus
+                for textes in self._lots_textes():
+                    textes_valides += len(textes)
+                    if len(echantillon) < 3:
+                        echantillon += textes.slice(0, 3 - len(echantillon)).to_pylist()
+                    if textes_valides >= 50:
+                        break
                 
+                self.nombre_textes = len(ds)
                 print(f"   📈 Résultats:")
-                print(f"      - Entrées traitées: {len(ds)}")
-                print(f"      - Textes valides: {textes_valides}")
-                print(f"      - Textes retenus: {len(self.textes_luxembourgeois)}")
+                print(f"      - Entrées: {len(ds)}")
+                print(f"      - Textes valides dans l'aperçu: {textes_valides}")
                 
                 # Échantillon
-                if self.textes_luxembourgeois:
+                if echantillon:
                     print("   🔬 Échantillon des textes:")
-                    for i, texte in enumerate(self.textes_luxembourgeois[:3]):
-                        preview = texte["Texte"][:60] + "..." if len(texte["Texte"]) > 60 else texte["Texte"]
+                    for i, texte in enumerate(echantillon):
+                        preview = texte[:60] + "..." if len(texte) > 60 else texte
                         print(f"      {i+1}: '{preview}'")
                 
-                if len(self.textes_luxembourgeois) >= 50:  # Seuil minimum
+                if textes_valides >= 50:  # Seuil minimum
                     print(f"🎉 CHARGEMENT RAPIDE RÉUSSI !")
-                    print(f"   ✅ {len(self.textes_luxembourgeois)} textes récupérés")
+                    print(f"   ✅ {self.nombre_textes} entrées disponibles")
                     print("   ⚡ Mode ultra-rapide")
                     textes_charges = True
                 else:
@@ -138,6 +166,7 @@ class LuxembourgishKeyboardPipelineRapide:
         
         # Fallback local si nécessaire
         if not textes_charges:
+            self.dataset = None
             print("\n🔄 FALLBACK LOCAL RAPIDE")
             print("-" * 40)
             
@@ -177,53 +206,166 @@ class LuxembourgishKeyboardPipelineRapide:
                     "index": i
                 })
             
+            self.nombre_textes = len(self.textes_luxembourgeois)
             print(f"✅ Fallback activé: {len(self.textes_luxembourgeois)} textes")
             print(f"   🇱🇺 Hymne national: {len(textes_fallback)} lignes")
             textes_charges = True
         
         if textes_charges:
             print(f"\n🎯 CHARGEMENT TERMINÉ")
-            print(f"   📊 Total textes: {len(self.textes_luxembourgeois)}")
+            print(f"   📊 Total textes: {self.nombre_textes}")
             return True
         else:
             print("❌ ÉCHEC COMPLET DU CHARGEMENT")
             return False
+
+    def _lots_textes(self):
+        """Textes retenus, par lots Arrow : split Hugging Face ou fallback local"""
+        if self.dataset is None:
+            yield textes_retenus([texte_obj["Texte"] for texte_obj in self.textes_luxembourgeois])
+            return
+        for lot in lots_arrow(self.dataset):
+            # Filtrer les textes vides ou trop courts
+            yield textes_retenus(lot["Texte"] if isinstance(lot, dict) else lot.column("Texte"))
+
+    def _compter_textes(self, textes):
+        """Ajoute un lot de textes aux comptes des mots et des n-grammes"""
+        self.mots_comptes.ajouter(mots_luxembourgeois(textes))
+        for comptes, valeurs in zip(self.comptes_ngrammes, ngrammes_par_ordre(textes)):
+            comptes.ajouter(valeurs)
+
+    def echantillonner_corpus(self):
+        """Compte un échantillon aléatoire du corpus dans le budget de temps
+        (--time-budget), par blocs de textes de taille adaptée au débit."""
+        print("\n🎲 ÉCHANTILLONNAGE SOUS BUDGET DE TEMPS")
+        print("-" * 45)
+        
+        if self.dataset is None:
+            source = [texte_obj["Texte"] for texte_obj in self.textes_luxembourgeois]
+        else:
+            source = self.dataset.with_format("arrow")
+        
+        def bloc_textes(bloc):
+            lot = source[bloc * TAILLE_BLOC:(bloc + 1) * TAILLE_BLOC]
+            return textes_retenus(lot if isinstance(lot, list) else lot.column("Texte"))
+        
+        nombre_blocs = math.ceil(len(source) / TAILLE_BLOC)
+        echantillonneur = EchantillonneurAdaptatif(nombre_blocs, self.budget_temps * PART_COMPTAGE)
+        self.mots_comptes = ComptesArrow()
+        self.comptes_ngrammes = (ComptesArrow(), ComptesArrow(), ComptesArrow())
+        print(f"   ⏱️ Budget: {self.budget_temps:.1f}s ({PART_COMPTAGE:.0%} pour le comptage)")
+        print(f"   📦 {nombre_blocs} blocs de {TAILLE_BLOC} textes, tirés au hasard")
+        
+        textes_comptes = 0
+        while True:
+            blocs = echantillonneur.prochains_blocs()
+            if not blocs:
+                break
+            debut = time.perf_counter()
+            for bloc in blocs:
+                textes = bloc_textes(bloc)
+                textes_comptes += len(textes)
+                self._compter_textes(textes)
+            echantillonneur.noter(len(blocs), time.perf_counter() - debut)
+            
+            # Comptes figés à chaque doublement de l'échantillon
+            tokens = self.comptes_ngrammes[0].total()
+            if not self.instantanes or tokens >= 2 * self.instantanes[-1][0]:
+                self.instantanes.append((tokens, [comptes.copie() for comptes in self.comptes_ngrammes]))
+            print(f"      📊 {echantillonneur.blocs_tires}/{nombre_blocs} blocs, {tokens:,} tokens "
+                  f"({echantillonneur.ecoule():.1f}s)")
+        
+        tokens = self.comptes_ngrammes[0].total()
+        if echantillonneur.bloc_test is not None:
+            textes_test = bloc_textes(echantillonneur.bloc_test)
+            if echantillonneur.complet:
+                # Tout le corpus tient dans le budget : c'est un build complet
+                textes_comptes += len(textes_test)
+                self._compter_textes(textes_test)
+                tokens = self.comptes_ngrammes[0].total()
+                self.instantanes = []
+            else:
+                self.textes_test = mots_par_texte(textes_test)
+                if self.instantanes[-1][0] != tokens:
+                    self.instantanes.append((tokens, [comptes.copie() for comptes in self.comptes_ngrammes]))
+        else:
+            self.instantanes = []
+        
+        blocs_apprentissage = nombre_blocs - (echantillonneur.bloc_test is not None)
+        blocs_comptes = nombre_blocs if echantillonneur.complet else echantillonneur.blocs_tires
+        self.nombre_textes = textes_comptes
+        self.rapport_echantillon = {
+            "budget_secondes": self.budget_temps,
+            "duree_comptage": round(echantillonneur.ecoule(), 2),
+            "blocs_comptes": blocs_comptes,
+            "blocs_total": nombre_blocs,
+            "textes": textes_comptes,
+            "tokens": tokens,
+            "tokens_corpus_estimes": (tokens if echantillonneur.complet
+                                      else round(tokens * blocs_apprentissage / max(blocs_comptes, 1))),
+        }
+        print(f"   ✅ Échantillon: {blocs_comptes}/{nombre_blocs} blocs, {textes_comptes:,} textes, "
+              f"{tokens:,} tokens en {echantillonneur.ecoule():.1f}s")
+        if echantillonneur.complet:
+            print("   ℹ️ Corpus entier compté dans le budget : mêmes comptes qu'un build complet")
+            self.rapport_echantillon["couverture_relative"] = 1.0
+        return textes_comptes > 0
+
+    def _estimer_couverture(self):
+        """Précision top-5 du modèle échantillonné sur le bloc de test, et celle
+        estimée d'un build complet (courbe prolongée jusqu'au corpus entier)"""
+        points = []
+        for tokens, comptes in self.instantanes[-MAX_POINTS_COURBE:]:
+            if tokens == self.rapport_echantillon["tokens"]:
+                predictions = self.ngrams_luxembourgeois
+            else:
+                vocabulaire, compteur = compteur_ngrammes(*comptes)
+                predictions, _ = compteur.predictions(vocabulaire, SEUIL_PERTINENCE, MAX_PREDICTIONS)
+            points.append((tokens, precision_top5(predictions, self.textes_test)))
+        mesuree = points[-1][1]
+        estimee = extrapoler_precision(points, self.rapport_echantillon["tokens_corpus_estimes"])
+        self.rapport_echantillon.update({
+            "courbe_top5": [[tokens, round(precision, 4)] for tokens, precision in points],
+            "top5_test": round(mesuree, 4),
+            "top5_complet_estime": round(estimee, 4) if estimee is not None else None,
+            "couverture_relative": round(mesuree / estimee, 4) if estimee else None,
+        })
+        print(f"   🎯 Précision top-5 sur le bloc de test: {mesuree:.1%}")
+        for tokens, precision in points:
+            print(f"      · {tokens:>12,} tokens → {precision:.1%}")
+        if estimee:
+            print(f"   📈 Build complet estimé: {estimee:.1%} "
+                  f"(couverture relative {mesuree / estimee:.0%})")
+        else:
+            print("   ⚠️ Échantillon trop petit pour extrapoler la précision d'un build complet")
     
     def extraire_mots_luxembourgeois(self):
         """Extrait et nettoie les mots luxembourgeois des textes."""
         print("\n🔤 EXTRACTION DES MOTS LUXEMBOURGEOIS")
         print("-" * 45)
         
-        if not self.textes_luxembourgeois:
+        if not self.nombre_textes:
             print("❌ Aucun texte disponible")
             return False
         
-        mots_bruts = []
-        
-        for texte_obj in self.textes_luxembourgeois:
-            texte = texte_obj["Texte"]
-            
-            # Nettoyage et extraction des mots
-            texte_nettoye = re.sub(r'[^\w\säëéöüÄËÉÖÜ]', ' ', texte)
-            mots = texte_nettoye.split()
-            
-            for mot in mots:
-                mot_propre = mot.strip().lower()
-                if len(mot_propre) >= 2 and any(c in self.caracteres_luxembourgeois for c in mot_propre):
-                    mots_bruts.append(mot_propre)
-        
-        # Compter les fréquences
-        compteur_mots = Counter(mots_bruts)
+        # Fréquences comptées lot par lot (noyaux Arrow), sans objet Python
+        # par mot ; déjà faites si le corpus a été échantillonné, sinon
+        # comptées avec les n-grammes, dans les mêmes passes
+        if self.mots_comptes is None:
+            self.mots_comptes, self.comptes_ngrammes = self._compter_corpus()
+            if not self.nombre_textes:
+                print("❌ Aucun texte retenu")
+                return False
+        compteur_mots = self.mots_comptes
+        nombre_mots_bruts = compteur_mots.total()
         
         # Filtrer les mots par fréquence (minimum 2 occurrences)
         seuil_frequence = 1 if len(compteur_mots) < 1000 else 2
         
-        for mot, freq in compteur_mots.items():
-            if freq >= seuil_frequence:
-                self.mots_luxembourgeois.add(mot)
-                self.dictionnaire_luxembourgeois[mot] = freq
+        self.dictionnaire_luxembourgeois = compteur_mots.en_dict(seuil_frequence)
+        self.mots_luxembourgeois = set(self.dictionnaire_luxembourgeois)
         
-        print(f"   📊 Mots bruts extraits: {len(mots_bruts)}")
+        print(f"   📊 Mots bruts extraits: {nombre_mots_bruts}")
         print(f"   📊 Mots uniques trouvés: {len(compteur_mots)}")
         print(f"   📊 Mots retenus (fréq >= {seuil_frequence}): {len(self.mots_luxembourgeois)}")
         
@@ -240,41 +382,62 @@ class LuxembourgishKeyboardPipelineRapide:
         print("\n🔗 GÉNÉRATION DES N-GRAMMES LUXEMBOURGEOIS")
         print("-" * 47)
         
-        if not self.textes_luxembourgeois:
+        if not self.nombre_textes:
             print("❌ Aucun texte disponible")
             return False
         
-        # Génération de bigrammes et trigrammes
-        for texte_obj in self.textes_luxembourgeois:
-            texte = texte_obj["Texte"].lower()
-            mots = re.findall(r'\b\w+\b', texte)
-            
-            # Bigrammes
-            for i in range(len(mots) - 1):
-                if len(mots[i]) >= 2 and len(mots[i+1]) >= 2:
-                    bigram = f"{mots[i]} {mots[i+1]}"
-                    self.ngrams_luxembourgeois[bigram] += 1
-            
-            # Trigrammes
-            for i in range(len(mots) - 2):
-                if all(len(mots[i+j]) >= 2 for j in range(3)):
-                    trigram = f"{mots[i]} {mots[i+1]} {mots[i+2]}"
-                    self.ngrams_luxembourgeois[trigram] += 1
+        if self.comptes_ngrammes is None:
+            self.mots_comptes, self.comptes_ngrammes = self._compter_corpus()
         
-        # Filtrer par fréquence
-        seuil_ngram = 1 if len(self.ngrams_luxembourgeois) < 500 else 2
-        ngrams_filtres = {ng: freq for ng, freq in self.ngrams_luxembourgeois.items() if freq >= seuil_ngram}
-        self.ngrams_luxembourgeois = ngrams_filtres
+        # Modèle de prédictions au format du clavier : clés à un mot (depuis
+        # les bigrammes) et à deux mots (depuis les trigrammes), cf.
+        # SuggestionEngine.resolveNgramContext
+        vocabulaire, compteur = compteur_ngrammes(*self.comptes_ngrammes)
+        self.ngrams_luxembourgeois, _ = compteur.predictions(vocabulaire, SEUIL_PERTINENCE, MAX_PREDICTIONS)
         
-        print(f"   📊 N-grammes générés (fréq >= {seuil_ngram}): {len(self.ngrams_luxembourgeois)}")
+        cles_deux_mots = sum(1 for cle in self.ngrams_luxembourgeois if " " in cle)
+        print(f"   📊 Bigrammes: {compteur.nombre_bigrammes}, trigrammes: {compteur.nombre_trigrammes}")
+        print(f"   📊 Prédictions: {len(self.ngrams_luxembourgeois)} "
+              f"({len(self.ngrams_luxembourgeois) - cles_deux_mots} à un mot, {cles_deux_mots} à deux mots)")
         
         # Échantillon des n-grammes les plus fréquents
-        ngrams_frequents = sorted(self.ngrams_luxembourgeois.items(), key=lambda x: x[1], reverse=True)[:5]
         print("   🔬 N-grammes les plus fréquents:")
-        for ngram, freq in ngrams_frequents:
-            print(f"      '{ngram}' ({freq}x)")
+        for (mot1, mot2), freq in compteur.bigrammes_plus_frequents(5):
+            print(f"      '{vocabulaire[mot1]} {vocabulaire[mot2]}' ({freq}x)")
+        
+        if self.textes_test:
+            self._estimer_couverture()
         
         return len(self.ngrams_luxembourgeois) > 0
+
+    def _compter_corpus(self):
+        """Mots du dictionnaire et (unigrammes, bigrammes, trigrammes) de tout
+        le corpus, en mémoire bornée et en deux passes ; compte au passage les
+        textes retenus"""
+        # Passe 1 : comptage approximatif à mémoire bornée (lossy counting) ;
+        # seuls les n-grammes qui peuvent encore être fréquents sont gardés.
+        approximatif = ComptageApproximatifArrow()
+        for textes in self._lots_textes():
+            _, bigrammes, trigrammes = ngrammes_par_ordre(textes)
+            approximatif.ajouter(bigrammes)
+            approximatif.ajouter(trigrammes)
+        survivants = approximatif.survivants()
+        
+        # Passe 2 : comptes exacts des mots et des n-grammes survivants
+        mots_dictionnaire = ComptesArrow()
+        comptes = (ComptesArrow(), ComptesArrow(), ComptesArrow())
+        self.nombre_textes = 0
+        for textes in self._lots_textes():
+            self.nombre_textes += len(textes)
+            mots_dictionnaire.ajouter(mots_luxembourgeois(textes))
+            mots, bigrammes, trigrammes = ngrammes_par_ordre(textes)
+            comptes[0].ajouter(mots)
+            comptes[1].ajouter(parmi(bigrammes, survivants))
+            comptes[2].ajouter(parmi(trigrammes, survivants))
+        
+        if not approximatif.exact:
+            print(f"   ℹ️ N-grammes rares élagués en cours de comptage (ε·N = {approximatif.total // approximatif.largeur})")
+        return mots_dictionnaire, comptes
     
     def sauvegarder_donnees(self):
         """Sauvegarde le dictionnaire et les n-grammes en JSON dans le dossier Android assets."""
@@ -292,35 +455,44 @@ class LuxembourgishKeyboardPipelineRapide:
             else:
                 print(f"   📁 Dossier assets trouvé: {assets_dir}")
             
-            # Sauvegarde du dictionnaire dans assets
+            # Format des fichiers JSON et bilan des tailles des assets
+            bilan = BilanTailles(self.json_compact, self.compression)
+
+            # Assets et backup locale : une sérialisation par contenu, écrite
+            # dans les deux cibles (remplacées ensemble, cf. ecriture_assets)
             dict_file = os.path.join(assets_dir, "luxemburgish_dict.json")
-            with open(dict_file, 'w', encoding='utf-8') as f:
-                json.dump(self.dictionnaire_luxembourgeois, f, ensure_ascii=False, indent=2)
-            print(f"   ✅ Dictionnaire sauvé: {dict_file}")
-            
-            # Sauvegarde des n-grammes dans assets
             ngrams_file = os.path.join(assets_dir, "luxemburgish_ngrams.json")
-            with open(ngrams_file, 'w', encoding='utf-8') as f:
-                json.dump(self.ngrams_luxembourgeois, f, ensure_ascii=False, indent=2)
-            print(f"   ✅ N-grammes sauvés: {ngrams_file}")
-            
-            # Sauvegarde de backup locale également
             backup_dict = "luxemburgish_dict_backup.json"
             backup_ngrams = "luxemburgish_ngrams_backup.json"
-            
-            with open(backup_dict, 'w', encoding='utf-8') as f:
-                json.dump(self.dictionnaire_luxembourgeois, f, ensure_ascii=False, indent=2)
+
+            # Tableau [[mot, freq], ...] lu par loadDictionary, comme
+            # LuxembourgishComplet.py
+            paires = sorted(self.dictionnaire_luxembourgeois.items(),
+                            key=lambda item: (-item[1], item[0]))
+            ecrire_paires_json(paires, [dict_file, backup_dict],
+                               self.json_compact, self.compression, bilan)
+            print(f"   ✅ Dictionnaire sauvé: {dict_file}")
             print(f"   📋 Backup dictionnaire: {backup_dict}")
             
-            with open(backup_ngrams, 'w', encoding='utf-8') as f:
-                json.dump(self.ngrams_luxembourgeois, f, ensure_ascii=False, indent=2)
+            ecrire_json(self.ngrams_luxembourgeois, [ngrams_file, backup_ngrams],
+                        self.json_compact, self.compression, bilan)
+            print(f"   ✅ N-grammes sauvés: {ngrams_file}")
             print(f"   📋 Backup n-grammes: {backup_ngrams}")
+
+            bilan.afficher()
             
             # Rapport final
             print(f"\n📈 RAPPORT FINAL")
-            print(f"   - Transcriptions traitées: {len(self.textes_luxembourgeois)}")
+            print(f"   - Transcriptions traitées: {self.nombre_textes}")
             print(f"   - Mots dans le dictionnaire: {len(self.dictionnaire_luxembourgeois)}")
-            print(f"   - N-grammes générés: {len(self.ngrams_luxembourgeois)}")
+            print(f"   - Contextes de prédiction: {len(self.ngrams_luxembourgeois)}")
+            if self.rapport_echantillon is not None:
+                rapport = self.rapport_echantillon
+                print(f"   - Échantillon: {rapport['blocs_comptes']}/{rapport['blocs_total']} blocs "
+                      f"({rapport['tokens']:,} tokens sur ~{rapport['tokens_corpus_estimes']:,})")
+                if rapport.get("couverture_relative") is not None:
+                    print(f"   - Couverture estimée par rapport à un build complet: "
+                          f"{rapport['couverture_relative']:.0%}")
             print(f"   - Fichiers Android: {assets_dir}")
             print(f"   - Fichiers backup: répertoire courant")
             
@@ -332,11 +504,16 @@ class LuxembourgishKeyboardPipelineRapide:
     
     def executer_pipeline_rapide(self):
         """Exécute le pipeline complet en mode ultra-rapide."""
+        self._afficher_entete()
         print("\n🚀 PIPELINE ULTRA-RAPIDE LUXEMBOURGEOIS")
         print("=" * 50)
         
         etapes = [
             ("Chargement textes", self.charger_textes_luxembourgeois),
+        ]
+        if self.budget_temps is not None:
+            etapes.append(("Échantillonnage", self.echantillonner_corpus))
+        etapes += [
             ("Extraction mots", self.extraire_mots_luxembourgeois),
             ("Génération n-grammes", self.generer_ngrams_luxembourgeois),
             ("Sauvegarde", self.sauvegarder_donnees)
@@ -387,8 +564,9 @@ def main():
         print("🎊 SUCCÈS COMPLET DU PIPELINE ULTRA-RAPIDE!")
         print(f"⏱️ Temps total d'exécution: {elapsed_total:.2f} secondes")
         print("🎯 Fichiers générés:")
-        print("   - luxemburgish_dict_rapide.json")
-        print("   - luxemburgish_ngrams_rapide.json")
+        print("   - android_keyboard/app/src/main/assets/luxemburgish_dict.json")
+        print("   - android_keyboard/app/src/main/assets/luxemburgish_ngrams.json")
+        print("   - luxemburgish_dict_backup.json, luxemburgish_ngrams_backup.json")
     else:
         print("❌ ÉCHEC DU PIPELINE")
         print("Vérifiez les logs ci-dessus pour plus de détails")
@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Banc d'essai des étapes de construction (dictionnaire, n-grams, rapport).
+
+Chaque pipeline tourne sur un corpus fixe (par défaut
+`PawolKreyol/Textes_kreyol.json`) puis sur des corpus synthétiques de 10× et
+100× sa taille : les textes d'origine, complétés de textes tirés d'une chaîne
+de Markov sur leurs bigrammes (graine fixe, donc corpus reproductibles).
+
+Chaque mesure s'exécute dans un processus neuf, dans une copie temporaire
+des assets : les fichiers du dépôt ne sont jamais réécrits et le pic de
+mémoire (RSS) d'une mesure n'hérite pas des précédentes. Pour chaque étape :
+temps réel, temps CPU, pic RSS du processus à la fin de l'étape et débit
+(tokens du corpus par seconde). Le résultat est écrit en JSON, avec le mode
+de comptage : au-delà de 200 000 textes, le pipeline luxembourgeois compte en
+mémoire bornée, et ses temps ne se comparent pas à ceux du comptage exact.
+
+Usage:
+  python banc_essai.py [--languages creole,luxembourgish] [--scales 1,10,100]
+                       [--corpus FICHIER] [--workers N] [--output FICHIER]
+                       [--baseline FICHIER] [--tolerance 0.5]
+
+Avec --baseline, chaque étape est comparée à un résultat précédent ; le code
+de sortie vaut 1 si l'une d'elles est plus lente de plus de --tolerance
+(50 % par défaut), ce qui permet à la CI de signaler une régression.
+"""
+
+import json
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+from datetime import datetime
+from multiprocessing import get_context
+
+from instrumentation import rss_max_mo
+from options import valeur_option
+
+RACINE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CORPUS_PAR_DEFAUT = os.path.join(RACINE, "PawolKreyol", "Textes_kreyol.json")
+DOSSIERS_ASSETS = ["clavier_creole/assets", "android_keyboard/app/src/main/assets"]
+GRAINE = 20240101
+
+# (module, classe, attribut recevant les textes)
+PIPELINES = {
+    "creole": ("KreyolComplet", "KreyolPipelineUnique", "textes_kreyol"),
+    "luxembourgish": ("LuxembourgishComplet", "LuxembourgishPipelineUnique", "textes_luxembourgeois"),
+}
+
+# Étapes mesurées, dans l'ordre de executer_pipeline (sans chargement ni
+# validation). Les analyses préparent les données du rapport.
+ETAPES = [
+    "tokeniser_textes",
+    "creer_dictionnaire",
+    "creer_ngrams",
+    "analyser_statistiques",
+    "analyser_delta",
+    "generer_rapport_linguistique",
+    "sauvegarder_donnees",
+]
+
+# En deçà, un écart de temps relève du bruit de mesure
+SEUIL_BRUIT_SECONDES = 0.05
+
+
+def charger_corpus(chemin):
+    """Textes {"Texte", "Source"} d'un fichier JSON (liste ou {"textes": [...]})"""
+    with open(chemin, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if isinstance(data, dict) and "textes" in data:
+        data = data["textes"]
+    textes = []
+    for element in data:
+        if isinstance(element, dict):
+            texte = element.get("Texte") or element.get("texte") or ""
+        else:
+            texte = str(element)
+        if texte.strip():
+            textes.append({"Texte": texte, "Source": "Banc d'essai"})
+    return textes
+
+
+def corpus_synthetique(textes, echelle, graine=GRAINE):
+    """Textes d'origine + (echelle - 1) copies tirées d'une chaîne de Markov.
+
+    Chaque texte synthétique a la longueur (en mots) d'un texte d'origine ;
+    ses mots suivent les bigrammes observés, ce qui garde une distribution
+    réaliste des unigrammes et des contextes.
+    """
+    if echelle <= 1:
+        return list(textes)
+    generateur = random.Random(graine)
+    suivants = {}
+    debuts = []
+    decoupes = [t["Texte"].split() for t in textes]
+    for mots in decoupes:
+        if mots:
+            debuts.append(mots[0])
+        for a, b in zip(mots, mots[1:]):
+            suivants.setdefault(a, []).append(b)
+
+    resultat = list(textes)
+    for _ in range(echelle - 1):
+        for mots in decoupes:
+            if not mots:
+                continue
+            mot = generateur.choice(debuts)
+            phrase = [mot]
+            while len(phrase) < len(mots):
+                options = suivants.get(mot)
+                mot = generateur.choice(options) if options else generateur.choice(debuts)
+                phrase.append(mot)
+            resultat.append({"Texte": " ".join(phrase), "Source": "Synthétique"})
+    return resultat
+
+
+def _preparer_arbre(dossier):
+    """Copie les assets actuels : le pipeline enrichit les fichiers existants"""
+    for relatif in DOSSIERS_ASSETS:
+        source = os.path.join(RACINE, relatif)
+        cible = os.path.join(dossier, relatif)
+        os.makedirs(cible, exist_ok=True)
+        if os.path.isdir(source):
+            for nom in os.listdir(source):
+                if nom.endswith(".json"):
+                    shutil.copy2(os.path.join(source, nom), cible)
+    travail = os.path.join(dossier, "Dictionnaires")
+    os.makedirs(travail, exist_ok=True)
+    return travail
+
+
+def _tokens(pipeline):
+    """Tokens du corpus tokenisé ; en mémoire bornée, le flux n'est pas
+    conservé et le total vient des comptes"""
+    if pipeline.corpus_tokenise is not None and pipeline.corpus_tokenise.total_tokens:
+        return pipeline.corpus_tokenise.total_tokens
+    if pipeline.compteur_ngrammes is not None:
+        return pipeline.compteur_ngrammes.total_tokens
+    return 0
+
+
+def mesurer(langue, echelle, chemin_corpus, workers=1):
+    """Exécute les étapes d'un pipeline et renvoie leurs mesures.
+
+    Appelé dans un processus dédié : change de répertoire courant, de
+    sys.argv et de sys.path.
+    """
+    nom_module, nom_classe, attribut = PIPELINES[langue]
+    textes = corpus_synthetique(charger_corpus(chemin_corpus), echelle)
+    repertoire_code = os.path.dirname(os.path.abspath(__file__))
+    if repertoire_code not in sys.path:
+        sys.path.insert(0, repertoire_code)
+    sys.argv = [nom_module, "--full-rebuild", "--workers", str(workers)]
+
+    with tempfile.TemporaryDirectory() as dossier:
+        os.chdir(_preparer_arbre(dossier))
+        with open(os.devnull, 'w', encoding='utf-8') as silence, redirect_stdout(silence):
+            module = __import__(nom_module)
+            pipeline = getattr(module, nom_classe)()
+            setattr(pipeline, attribut, textes)
+
+            etapes = {}
+            tokens = 0
+            mode = "exact"
+            for nom in ETAPES:
+                fonction = getattr(pipeline, nom, None)
+                if fonction is None:
+                    continue
+                debut, debut_cpu = time.perf_counter(), time.process_time()
+                succes = fonction()
+                secondes = time.perf_counter() - debut
+                cpu = time.process_time() - debut_cpu
+                if nom == "tokeniser_textes":
+                    tokens = _tokens(pipeline)
+                etapes[nom] = {
+                    "succes": bool(succes),
+                    "secondes": round(secondes, 4),
+                    "cpu_secondes": round(cpu, 4),
+                    "rss_max_mo": rss_max_mo(),
+                    "tokens_par_seconde": round(tokens / secondes) if secondes > 0 else None,
+                }
+            if getattr(pipeline, "memoire_bornee", False):
+                mode = "memoire_bornee"
+
+    total = sum(e["secondes"] for e in etapes.values())
+    return {
+        "langue": langue,
+        "echelle": echelle,
+        "textes": len(textes),
+        "tokens": tokens,
+        "workers": workers,
+        "mode_comptage": mode,
+        "etapes": etapes,
+        "total_secondes": round(total, 4),
+        "tokens_par_seconde": round(tokens / total) if total > 0 else None,
+        "rss_max_mo": rss_max_mo(),
+    }
+
+
+def comparer(resultats, reference, tolerance):
+    """Étapes plus lentes que la référence au-delà de la tolérance.
+
+    Une mesure n'est comparée qu'à une référence de même mode de comptage.
+    """
+    anciens = {(r["langue"], r["echelle"]): r for r in reference.get("resultats", [])}
+    regressions = []
+    for resultat in resultats:
+        ancien = anciens.get((resultat["langue"], resultat["echelle"]))
+        if ancien is None or ancien.get("mode_comptage", "exact") != resultat["mode_comptage"]:
+            continue
+        for nom, mesure in resultat["etapes"].items():
+            avant = ancien["etapes"].get(nom)
+            if avant is None:
+                continue
+            apres = mesure["secondes"]
+            if apres > avant["secondes"] * (1 + tolerance) and \
+                    apres - avant["secondes"] > SEUIL_BRUIT_SECONDES:
+                regressions.append({
+                    "langue": resultat["langue"],
+                    "echelle": resultat["echelle"],
+                    "etape": nom,
+                    "avant_secondes": avant["secondes"],
+                    "apres_secondes": apres,
+                })
+    return regressions
+
+
+def main():
+    langues = valeur_option("--languages", "creole,luxembourgish").split(",")
+    echelles = [int(e) for e in valeur_option("--scales", "1,10,100").split(",")]
+    chemin_corpus = os.path.abspath(valeur_option("--corpus", CORPUS_PAR_DEFAUT))
+    workers = max(1, valeur_option("--workers", 1, int))
+    sortie = valeur_option("--output", "benchmarks/banc_essai.json")
+    chemin_reference = valeur_option("--baseline")
+    tolerance = valeur_option("--tolerance", 0.5, float)
+
+    inconnues = [l for l in langues if l not in PIPELINES]
+    if inconnues:
+        print(f"❌ Langues inconnues: {', '.join(inconnues)} (choix: {', '.join(PIPELINES)})")
+        return 1
+
+    print("⏱️ BANC D'ESSAI DES PIPELINES")
+    print("=" * 40)
+    print(f"📖 Corpus: {chemin_corpus}")
+
+    resultats = []
+    for langue in langues:
+        for echelle in echelles:
+            # Un processus neuf par mesure : pic RSS et imports indépendants
+            with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as executeur:
+                resultat = executeur.submit(mesurer, langue, echelle, chemin_corpus, workers).result()
+            resultats.append(resultat)
+            print(f"\n🔹 {langue} ×{echelle}: {resultat['textes']:,} textes, {resultat['tokens']:,} tokens")
+            if resultat["mode_comptage"] != "exact":
+                print("   ⚠️ Comptage en mémoire bornée : temps non comparables au comptage exact")
+            for nom, mesure in resultat["etapes"].items():
+                debit = mesure["tokens_par_seconde"]
+                print(f"   {nom:<30} {mesure['secondes']:>8.3f} s  "
+                      f"{(debit or 0):>12,} tokens/s  RSS {mesure['rss_max_mo']} Mo")
+
+    rapport = {
+        "date": datetime.now().isoformat(timespec='seconds'),
+        "python": platform.python_version(),
+        "plateforme": platform.platform(),
+        "corpus": os.path.relpath(chemin_corpus, RACINE),
+        "resultats": resultats,
+    }
+
+    code = 0
+    if chemin_reference:
+        with open(chemin_reference, 'r', encoding='utf-8') as f:
+            reference = json.load(f)
+        rapport["regressions"] = comparer(resultats, reference, tolerance)
+        if rapport["regressions"]:
+            code = 1
+            print(f"\n❌ {len(rapport['regressions'])} régressions (tolérance {tolerance:.0%}):")
+            for r in rapport["regressions"]:
+                print(f"   {r['langue']} ×{r['echelle']} {r['etape']}: "
+                      f"{r['avant_secondes']:.3f} s → {r['apres_secondes']:.3f} s")
+        else:
+            print(f"\n✅ Aucune régression par rapport à {chemin_reference}")
+
+    os.makedirs(os.path.dirname(sortie) or '.', exist_ok=True)
+    with open(sortie, 'w', encoding='utf-8') as f:
+        json.dump(rapport, f, ensure_ascii=False, indent=2)
+    print(f"\n💾 Résultats: {sortie}")
+    return code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
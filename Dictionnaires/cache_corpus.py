@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Cache local du corpus : instantanés adressés par leur contenu.
+
+Chaque chargement réussi d'un dataset Hugging Face est écrit une seule fois en
+JSONL compressé (une ligne {"Texte": ..., "Source": ...} par texte) sous
+`cache/<dépôt>/objets/<sha256>.jsonl.gz`, le nom étant l'empreinte du contenu.
+Un index (`cache/<dépôt>/index.json`) associe chaque révision du dataset à son
+instantané : deux révisions au contenu identique partagent le même fichier.
+
+Aux exécutions suivantes, si la révision distante est déjà en cache (ou si le
+Hub est injoignable), les textes sont relus depuis le disque, paresseusement et
+sans `load_dataset`. Le fichier local de secours (ex. Textes_kreyol.json)
+s'importe dans le même format, sous une révision `local-<empreinte>`, et
+l'index retient le dernier importé : hors ligne, sans instantané distant, il
+est repris directement, sans nouvelle tentative réseau.
+
+Les instantanés se parcourent (boucles, tranches `textes[:3]`) ; il n'y a pas
+d'accès par indice, qui décompresserait le fichier depuis le début à chaque
+appel.
+
+`HfApi` n'est importé qu'à la première demande de révision distante.
+"""
+
+import gzip
+import hashlib
+import importlib.util
+import json
+import os
+from datetime import datetime
+from itertools import islice, repeat
+
+from tokenisation import contenu_texte
+
+HAS_HUB = importlib.util.find_spec("huggingface_hub") is not None
+
+REPERTOIRE_CACHE = "cache"
+
+
+class TextesEnCache:
+    """Textes d'un instantané, relus depuis le disque à chaque parcours"""
+
+    def __init__(self, chemin, nombre):
+        self.chemin = chemin
+        self.nombre = nombre
+
+    def __iter__(self):
+        with gzip.open(self.chemin, 'rt', encoding='utf-8') as f:
+            for ligne in islice(f, self.nombre):
+                yield json.loads(ligne)
+
+    def __len__(self):
+        return self.nombre
+
+    def __bool__(self):
+        return self.nombre > 0
+
+    def __getitem__(self, cle):
+        """Tranche lue depuis le début du fichier (aperçus `textes[:3]`)"""
+        if not isinstance(cle, slice):
+            raise TypeError("TextesEnCache se parcourt (boucle ou tranche), sans accès par indice")
+        return list(islice(self, *cle.indices(self.nombre)))
+
+
+class EcritureInstantane:
+    """Écrit un instantané ligne à ligne ; enregistré seulement s'il est complet.
+
+    S'utilise comme contexte : en cas d'exception, le fichier temporaire est
+    supprimé et l'index n'est pas modifié.
+    """
+
+    def __init__(self, cache, revision):
+        self.cache = cache
+        self.revision = revision
+        self.nombre = 0
+        self.textes = None
+        self._empreinte = hashlib.sha256()
+        self._temporaire = os.path.join(cache.dossier_objets, f".{os.getpid()}.jsonl.gz.tmp")
+
+    def __enter__(self):
+        os.makedirs(self.cache.dossier_objets, exist_ok=True)
+        self._brut = open(self._temporaire, 'wb')
+        # mtime=0 : deux écritures du même contenu donnent le même fichier
+        self._fichier = gzip.GzipFile(fileobj=self._brut, mode='wb', mtime=0)
+        return self
+
+    def ajouter(self, texte, source):
+        ligne = json.dumps({"Texte": texte, "Source": source}, ensure_ascii=False) + "\n"
+        donnees = ligne.encode('utf-8')
+        self._empreinte.update(donnees)
+        self._fichier.write(donnees)
+        self.nombre += 1
+
+    def ajouter_lot(self, textes, sources):
+        """Comme `ajouter` pour une liste de textes, en une seule écriture ;
+        `sources` est une source commune ou une liste alignée sur `textes`"""
+        if isinstance(sources, str):
+            sources = repeat(sources)
+        lignes = "".join(json.dumps({"Texte": texte, "Source": source}, ensure_ascii=False) + "\n"
+                         for texte, source in zip(textes, sources))
+        donnees = lignes.encode('utf-8')
+        self._empreinte.update(donnees)
+        self._fichier.write(donnees)
+        self.nombre += len(textes)
+
+    def __exit__(self, type_exc, exc, trace):
+        self._fichier.close()
+        self._brut.close()
+        if type_exc is not None:
+            os.remove(self._temporaire)
+            return False
+        empreinte = self._empreinte.hexdigest()
+        chemin = self.cache.chemin_objet(empreinte)
+        if os.path.exists(chemin):
+            os.remove(self._temporaire)
+        else:
+            os.replace(self._temporaire, chemin)
+        self.cache.enregistrer(self.revision, empreinte, self.nombre)
+        self.textes = TextesEnCache(chemin, self.nombre)
+        return False
+
+
+class CacheCorpus:
+    """Instantanés locaux d'un dataset, indexés par révision"""
+
+    def __init__(self, depot, repertoire=REPERTOIRE_CACHE):
+        self.depot = depot
+        self.dossier = os.path.join(repertoire, depot.replace('/', '__'))
+        self.dossier_objets = os.path.join(self.dossier, 'objets')
+        self.chemin_index = os.path.join(self.dossier, 'index.json')
+        self.index = {"revisions": {}, "derniere": None}
+        if os.path.exists(self.chemin_index):
+            try:
+                with open(self.chemin_index, 'r', encoding='utf-8') as f:
+                    self.index = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"⚠️ Index du cache illisible ({self.chemin_index}): {e}")
+
+    def chemin_objet(self, empreinte):
+        return os.path.join(self.dossier_objets, f"{empreinte}.jsonl.gz")
+
+    def revision_distante(self, token=None):
+        """Révision (sha du commit) du dataset sur le Hub ; None hors ligne"""
+        if not HAS_HUB:
+            return None
+        try:
+            from huggingface_hub import HfApi
+            return HfApi().dataset_info(self.depot, token=token).sha
+        except Exception:
+            return None
+
+    def instantane(self, revision):
+        """Textes en cache pour `revision`, ou None"""
+        entree = self.index["revisions"].get(revision) if revision else None
+        if not entree:
+            return None
+        chemin = self.chemin_objet(entree["empreinte"])
+        if not os.path.exists(chemin):
+            return None
+        return TextesEnCache(chemin, entree["lignes"])
+
+    def dernier_instantane(self, secours=True):
+        """(révision, textes) du dernier instantané distant enregistré.
+
+        À défaut, avec `secours`, le dernier fichier local importé : relu s'il
+        existe encore (une modification est prise en compte), sinon son
+        instantané.
+        """
+        revision = self.index.get("derniere")
+        textes = self.instantane(revision)
+        if textes is not None:
+            return revision, textes
+
+        dernier_secours = self.index.get("secours") if secours else None
+        if dernier_secours:
+            chemin = dernier_secours["chemin"]
+            try:
+                textes = (self.importer_json(chemin) if os.path.exists(chemin)
+                          else self.instantane(dernier_secours["revision"]))
+            except (OSError, ValueError) as e:
+                print(f"⚠️ Fichier de secours illisible ({chemin}): {e}")
+                textes = None
+            if textes is not None:
+                return self.index["secours"]["revision"], textes
+        return None, None
+
+    def ecrire(self, revision):
+        """Contexte d'écriture d'un nouvel instantané pour `revision`"""
+        return EcritureInstantane(self, revision)
+
+    def enregistrer(self, revision, empreinte, lignes):
+        """Associe `revision` à l'instantané `empreinte` dans l'index"""
+        self.index["revisions"][revision] = {
+            "empreinte": empreinte,
+            "lignes": lignes,
+            "date": datetime.now().isoformat(timespec='seconds'),
+        }
+        if not revision.startswith("local-"):
+            self.index["derniere"] = revision
+        self._sauver_index()
+
+    def _sauver_index(self):
+        os.makedirs(self.dossier, exist_ok=True)
+        temporaire = self.chemin_index + ".tmp"
+        with open(temporaire, 'w', encoding='utf-8') as f:
+            json.dump(self.index, f, ensure_ascii=False, indent=2)
+        os.replace(temporaire, self.chemin_index)
+
+    def importer_json(self, chemin, source="Local"):
+        """Importe un fichier JSON local (liste de textes ou {"textes": [...]}),
+        noté comme dernier fichier de secours"""
+        with open(chemin, 'rb') as f:
+            brut = f.read()
+        revision = "local-" + hashlib.sha256(brut).hexdigest()[:16]
+        textes = self.instantane(revision)
+        if textes is None:
+            data = json.loads(brut.decode('utf-8'))
+            if isinstance(data, dict) and "textes" in data:
+                data = data["textes"]
+            if not isinstance(data, list):
+                return None
+
+            with self.ecrire(revision) as ecriture:
+                for element in data:
+                    origine = element.get("Source", source) if isinstance(element, dict) else source
+                    ecriture.ajouter(contenu_texte(element), origine)
+            textes = ecriture.textes
+
+        # Repris hors ligne par dernier_instantane, sans passer par le réseau
+        secours = {"revision": revision, "chemin": os.path.abspath(chemin)}
+        if self.index.get("secours") != secours:
+            self.index["secours"] = secours
+            self._sauver_index()
+        return textes
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tokenisation et comptage vectorisés sur des colonnes de texte Arrow.
+
+Le pipeline rapide reçoit ses textes en tables Arrow (lots du dataset Hugging
+Face). Plutôt que de créer une chaîne Python par token, chaque lot passe par
+les noyaux `pyarrow.compute` :
+
+- nettoyage (`replace_substring_regex`), minuscules (`utf8_lower`) et
+  découpage (`split_pattern`) donnent une liste de mots par texte ;
+- les bigrammes et trigrammes sont les mots voisins d'un même texte, joints
+  par `binary_join_element_wise` ;
+- `value_counts` compte chaque lot, et les comptes des lots sont fusionnés
+  par `group_by(...).aggregate(...)`.
+
+Les classes de mots reprennent celles de `re` en Python (`\\w` Unicode =
+lettres, chiffres et `_`). Seuls les mots et n-grammes distincts retenus
+deviennent des objets Python, pour l'écriture du JSON.
+
+`compteur_ngrammes` convertit les comptes d'uni/bi/trigrammes en
+`CompteurNgrammes` (identifiants entiers, clés de 64 bits) : le modèle de
+prédictions est alors construit exactement comme dans le pipeline complet.
+
+La fusion ne conserve pas l'ordre des clés : chaque clé garde sa première
+position (numéro du lot, rang dans le lot), et les comptes sont rendus dans
+l'ordre de première apparition, comme ceux d'un `Counter` rempli texte par
+texte.
+"""
+
+import math
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from comptage_borne import ERREUR_PAR_DEFAUT
+from comptage_ngrammes import DECALAGE_32, CompteurNgrammes
+
+# Tout ce qui n'est pas un caractère de mot (`\w` Unicode de Python)
+PATTERN_NON_MOT = r"[^\p{L}\p{N}_]"
+# Mot luxembourgeois : au moins une lettre latine (après minuscules)
+PATTERN_LETTRE_LUXEMBOURGEOISE = r"[a-zäëéöü]"
+LONGUEUR_MIN_MOT = 2
+LONGUEUR_MIN_TEXTE = 11
+
+SCHEMA_COMPTES = pa.schema([("cle", pa.string()), ("compte", pa.int64())])
+DECALAGE_LOT = 32
+
+
+def textes_retenus(colonne):
+    """Textes non vides d'au moins `LONGUEUR_MIN_TEXTE` caractères hors blancs"""
+    colonne = pa.array(colonne, pa.string()) if not isinstance(colonne, (pa.Array, pa.ChunkedArray)) else colonne
+    longueurs = pc.utf8_length(pc.utf8_trim_whitespace(colonne))
+    return pc.filter(colonne, pc.fill_null(pc.greater_equal(longueurs, LONGUEUR_MIN_TEXTE), False))
+
+
+def _decouper(textes):
+    """Mots non vides de textes déjà nettoyés, et indice du texte de chacun.
+
+    Tout caractère hors mot est devenu une espace : découper sur l'espace
+    suffit. (`utf8_split_whitespace` a donné des mots tronqués de travers
+    après de gros volumes : il n'est pas utilisé.)
+    """
+    listes = pc.split_pattern(textes, " ")
+    if isinstance(listes, pa.ChunkedArray):
+        listes = listes.combine_chunks()
+    mots = pc.list_flatten(listes)
+    non_vides = pc.greater(pc.utf8_length(mots), 0)
+    return pc.filter(mots, non_vides), pc.filter(pc.list_parent_indices(listes), non_vides)
+
+
+def mots_luxembourgeois(textes):
+    """Mots retenus pour le dictionnaire, à plat : ponctuation remplacée par
+    des blancs, minuscules, au moins deux caractères dont une lettre latine"""
+    nettoyes = pc.replace_substring_regex(textes, PATTERN_NON_MOT, " ")
+    mots, _ = _decouper(pc.utf8_lower(nettoyes))
+    retenus = pc.and_(pc.greater_equal(pc.utf8_length(mots), LONGUEUR_MIN_MOT),
+                      pc.match_substring_regex(mots, PATTERN_LETTRE_LUXEMBOURGEOISE))
+    return pc.filter(mots, retenus)
+
+
+def ngrammes_par_ordre(textes):
+    """(mots, bigrammes, trigrammes) des textes, chacun dans l'ordre des
+    textes ; un n-gramme ne relie que des mots d'au moins deux caractères"""
+    mots, textes_des_mots = _decouper(
+        pc.replace_substring_regex(pc.utf8_lower(textes), PATTERN_NON_MOT, " "))
+    longs = pc.greater_equal(pc.utf8_length(mots), LONGUEUR_MIN_MOT)
+
+    resultat = [mots]
+    for ordre in (2, 3):
+        nombre = max(len(mots) - ordre + 1, 0)
+        valides = longs.slice(0, nombre)
+        for decalage in range(1, ordre):
+            valides = pc.and_(valides, pc.and_(
+                longs.slice(decalage, nombre),
+                pc.equal(textes_des_mots.slice(0, nombre), textes_des_mots.slice(decalage, nombre))))
+        voisins = [pc.filter(mots.slice(decalage, nombre), valides) for decalage in range(ordre)]
+        resultat.append(pc.binary_join_element_wise(*voisins, " "))
+    return tuple(resultat)
+
+
+def mots_par_texte(textes):
+    """Listes Python des mots de chaque texte (découpage des n-grammes), pour
+    rejouer un petit échantillon de textes"""
+    listes = pc.split_pattern(
+        pc.replace_substring_regex(pc.utf8_lower(textes), PATTERN_NON_MOT, " "), " ")
+    return [[mot for mot in liste if mot] for liste in listes.to_pylist()]
+
+
+def parmi(cles, survivants):
+    """Clés présentes dans `survivants`"""
+    return pc.filter(cles, pc.is_in(cles, value_set=survivants))
+
+
+def compter(valeurs):
+    """Table (cle, compte) des valeurs distinctes, par ordre d'apparition"""
+    comptes = pc.value_counts(valeurs)
+    return pa.table([comptes.field("values").cast(pa.string()), comptes.field("counts").cast(pa.int64())],
+                    schema=SCHEMA_COMPTES)
+
+
+def _fusionner(tables, agregations):
+    """Agrège par clé les tables mises bout à bout (ordre des clés quelconque)"""
+    fusion = pa.concat_tables(tables).group_by("cle").aggregate(agregations)
+    return pa.table([fusion.column("cle")] + [fusion.column(f"{colonne}_{fonction}")
+                                              for colonne, fonction in agregations],
+                    names=["cle"] + [colonne for colonne, _ in agregations])
+
+
+class ComptesArrow:
+    """Comptes exacts cumulés lot par lot"""
+
+    def __init__(self):
+        self.table = SCHEMA_COMPTES.append(pa.field("premier", pa.int64())).empty_table()
+        self.lots = 0
+
+    def ajouter(self, valeurs):
+        if not len(valeurs):
+            return
+        lot = compter(valeurs)
+        # Première position : numéro du lot, puis rang de première apparition
+        premiers = (np.int64(self.lots) << DECALAGE_LOT) + np.arange(lot.num_rows, dtype=np.int64)
+        lot = lot.append_column("premier", pa.array(premiers))
+        self.table = _fusionner([self.table, lot], [("compte", "sum"), ("premier", "min")])
+        self.lots += 1
+
+    def __len__(self):
+        return self.table.num_rows
+
+    def copie(self):
+        """Comptes figés à cet instant (les tables Arrow ne sont jamais modifiées)"""
+        copie = ComptesArrow()
+        copie.table, copie.lots = self.table, self.lots
+        return copie
+
+    def total(self):
+        return pc.sum(self.table.column("compte")).as_py() or 0
+
+    def en_dict(self, seuil=1):
+        """{clé: compte} des clés vues au moins `seuil` fois, par ordre de
+        première apparition"""
+        retenus = self.table.filter(pc.greater_equal(self.table.column("compte"), seuil))
+        retenus = retenus.sort_by("premier")
+        return dict(zip(retenus.column("cle").to_pylist(), retenus.column("compte").to_pylist()))
+
+
+class ComptageApproximatifArrow:
+    """Lossy counting (cf. `comptage_borne.ComptageApproximatif`) par lots Arrow.
+
+    Chaque lot est compté d'un bloc et les seaux sont fermés entre deux lots,
+    comme ils le sont entre deux textes dans la version Python.
+    """
+
+    def __init__(self, erreur=ERREUR_PAR_DEFAUT):
+        self.largeur = max(1, math.ceil(1 / erreur))
+        self.table = pa.schema([("cle", pa.string()), ("compte", pa.int64()),
+                                ("delta", pa.int64())]).empty_table()
+        self.total = 0
+        self.seau = 1
+        self.elagages = 0
+
+    def ajouter(self, cles):
+        if not len(cles):
+            return
+        # Erreur d'une nouvelle clé : seaux écoulés avant sa dernière position
+        # possible dans le lot (majorant, donc aucun oubli abusif)
+        delta = (self.total + len(cles) - 1) // self.largeur
+        lot = compter(cles)
+        lot = lot.append_column("delta", pa.repeat(pa.scalar(delta, pa.int64()), lot.num_rows))
+        # Une clé déjà suivie garde son erreur d'origine (la plus petite)
+        self.table = _fusionner([self.table, lot], [("compte", "sum"), ("delta", "min")])
+        self.total += len(cles)
+        if self.total >= self.seau * self.largeur:
+            seau = self.total // self.largeur
+            gardes = pc.greater(pc.add(self.table.column("compte"), self.table.column("delta")), seau)
+            if not pc.all(gardes).as_py():
+                self.table = self.table.filter(gardes)
+                self.elagages += 1
+            self.seau = seau + 1
+
+    def survivants(self):
+        """Clés encore présentes (sur-ensemble des n-grammes fréquents)"""
+        return self.table.column("cle").combine_chunks()
+
+    @property
+    def exact(self):
+        """Vrai si aucune entrée n'a jamais été oubliée"""
+        return self.elagages == 0
+
+
+def _identifiants(cles, ordre, valeurs):
+    """Identifiants (uint64) des `ordre` mots de chaque clé « m1 m2 ... »"""
+    parties = pc.split_pattern(cles, " ")
+    return [pc.index_in(pc.list_element(parties, i), value_set=valeurs)
+            .to_numpy(zero_copy_only=False).astype(np.uint64) for i in range(ordre)]
+
+
+def compteur_ngrammes(unigrammes, bigrammes, trigrammes):
+    """(vocabulaire, CompteurNgrammes) des comptes Arrow d'uni/bi/trigrammes,
+    pour construire le modèle de prédictions du clavier.
+
+    Les identifiants suivent l'ordre de première apparition des mots ; les
+    trigrammes dont le bigramme de contexte n'a pas été retenu sont ignorés.
+    """
+    mots = unigrammes.table.sort_by("premier")
+    vocabulaire = mots.column("cle").to_pylist()
+    valeurs = mots.column("cle").combine_chunks()
+    comptes_mots = mots.column("compte").to_numpy().astype(np.int64)
+
+    table_b = bigrammes.table
+    premier_b, second_b = _identifiants(table_b.column("cle"), 2, valeurs)
+    cles_b = (premier_b << DECALAGE_32) | second_b
+    ordre_b = np.argsort(cles_b, kind="stable")
+    cles_b = cles_b[ordre_b]
+
+    table_t = trigrammes.table
+    premier_t, second_t, troisieme_t = _identifiants(table_t.column("cle"), 3, valeurs)
+    contextes = (premier_t << DECALAGE_32) | second_t
+    indices = np.searchsorted(cles_b, contextes)
+    connus = indices < len(cles_b)
+    connus[connus] = cles_b[indices[connus]] == contextes[connus]
+    cles_t = (indices[connus].astype(np.uint64) << DECALAGE_32) | troisieme_t[connus]
+    ordre_t = np.argsort(cles_t, kind="stable")
+
+    def colonne(table, nom, ordre, garde=None):
+        valeurs_colonne = table.column(nom).to_numpy().astype(np.int64)
+        return (valeurs_colonne if garde is None else valeurs_colonne[garde])[ordre]
+
+    compteur = CompteurNgrammes(
+        comptes_mots,
+        cles_b, colonne(table_b, "compte", ordre_b), colonne(table_b, "premier", ordre_b),
+        cles_t[ordre_t], colonne(table_t, "compte", ordre_t, connus),
+        colonne(table_t, "premier", ordre_t, connus))
+    return vocabulaire, compteur
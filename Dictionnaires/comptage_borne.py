@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Comptage des n-grammes en mémoire bornée, pour les corpus complets.
+
+Le comptage exact (`comptage_ngrammes`) garde tout le flux tokenisé et toutes
+les clés distinctes : c'est ce qui obligeait à limiter le corpus luxembourgeois
+à quelques centaines de textes. Ici le corpus est lu deux fois :
+
+1. « Lossy counting » (Manku & Motwani, 2002) : les n-grammes sont comptés par
+   seaux de 1/ε occurrences ; à la fin de chaque seau, les entrées dont le
+   compte (majoré de l'erreur possible) ne dépasse pas le numéro du seau sont
+   oubliées. La table reste de taille O(1/ε · log(εN)) et tout n-gramme de
+   fréquence supérieure à εN est garanti d'y survivre.
+2. Seconde passe exacte, restreinte aux survivants : leurs comptes (et leur
+   première position) sont exacts, aucune estimation n'atteint les fichiers.
+
+Tant que le corpus tient dans un seul seau, rien n'est oublié et le résultat
+est celui du comptage exact.
+"""
+
+import math
+from collections import Counter
+
+import numpy as np
+
+from comptage_ngrammes import CompteurNgrammes, DECALAGE_32
+from tokenisation import CorpusTokenise, decouper_mots, iterer_contenus
+
+# ε par défaut : tout n-gramme présent plus d'une fois pour 100 000 n-grammes
+# du corpus est conservé.
+ERREUR_PAR_DEFAUT = 1e-5
+
+
+class ComptageApproximatif:
+    """Lossy counting sur des clés hachables quelconques"""
+
+    def __init__(self, erreur=ERREUR_PAR_DEFAUT):
+        self.largeur = max(1, math.ceil(1 / erreur))
+        self.comptes = Counter()
+        # Erreur maximale de chaque entrée : seaux écoulés avant son insertion
+        self.deltas = {}
+        self.total = 0
+        self.seau = 1
+        self.elagages = 0
+
+    def ajouter(self, cles):
+        """Compte une suite de clés (typiquement les n-grammes d'un texte)"""
+        if not cles:
+            return
+        comptes = self.comptes
+        deltas = self.deltas
+        delta = self.seau - 1
+        for cle in set(cles):
+            if cle not in comptes:
+                deltas[cle] = delta
+        comptes.update(cles)
+        self.total += len(cles)
+        if self.total >= self.seau * self.largeur:
+            self._elaguer()
+            self.seau = self.total // self.largeur + 1
+
+    def _elaguer(self):
+        """Oublie les entrées qui ne peuvent plus dépasser le seuil d'erreur"""
+        seau = self.total // self.largeur
+        comptes = self.comptes
+        deltas = self.deltas
+        oublies = [cle for cle, compte in comptes.items() if compte + deltas[cle] <= seau]
+        for cle in oublies:
+            del comptes[cle]
+            del deltas[cle]
+        if oublies:
+            self.elagages += 1
+
+    def survivants(self):
+        """Clés encore présentes (sur-ensemble des n-grammes fréquents)"""
+        return set(self.comptes)
+
+    @property
+    def exact(self):
+        """Vrai si aucune entrée n'a jamais été oubliée"""
+        return self.elagages == 0
+
+
+def _cles_texte(ids):
+    """Clés des bigrammes (id1 << 32 | id2) et trigrammes d'un texte"""
+    bigrammes = [(a << 32) | b for a, b in zip(ids, ids[1:])]
+    trigrammes = [(a << 64) | (b << 32) | c for a, b, c in zip(ids, ids[1:], ids[2:])]
+    return bigrammes, trigrammes
+
+
+def compter_en_flux(textes, pattern_mot, erreur=ERREUR_PAR_DEFAUT):
+    """Compte les n-grammes d'un corpus en mémoire bornée (deux passes).
+
+    `textes` doit pouvoir être parcouru deux fois (liste, instantané du cache).
+    Renvoie (corpus, compteur, bilan) : le corpus ne contient que le
+    vocabulaire (le flux d'identifiants n'est pas conservé), le compteur a
+    les mêmes champs qu'un `CompteurNgrammes` ordinaire. Les unigrammes sont
+    toujours exacts.
+    """
+    corpus = CorpusTokenise()
+    index = corpus.index
+    vocabulaire = corpus.vocabulaire
+    unigrammes = []
+    approx_b = ComptageApproximatif(erreur)
+    approx_t = ComptageApproximatif(erreur)
+
+    # Passe 1 : vocabulaire et unigrammes exacts, n-grammes approximatifs
+    for contenu in iterer_contenus(textes):
+        ids = []
+        for mot in decouper_mots(contenu, pattern_mot):
+            ident = index.get(mot)
+            if ident is None:
+                ident = index[mot] = len(vocabulaire)
+                vocabulaire.append(mot)
+                unigrammes.append(0)
+            unigrammes[ident] += 1
+            ids.append(ident)
+        corpus.nombre_textes += 1
+        bigrammes, trigrammes = _cles_texte(ids)
+        approx_b.ajouter(bigrammes)
+        approx_t.ajouter(trigrammes)
+
+    survivants_b = approx_b.survivants()
+    # Un trigramme n'est utile que si son contexte a survécu
+    survivants_t = {cle for cle in approx_t.survivants() if cle >> 32 in survivants_b}
+    exact = approx_b.exact and approx_t.exact
+    del approx_b, approx_t
+
+    # Passe 2 : comptes exacts et premières positions des survivants
+    comptes_b, premiers_b = Counter(), {}
+    comptes_t, premiers_t = Counter(), {}
+    position = 0
+    for contenu in iterer_contenus(textes):
+        ids = [index[mot] for mot in decouper_mots(contenu, pattern_mot)]
+        bigrammes, trigrammes = _cles_texte(ids)
+        for i, cle in enumerate(bigrammes):
+            if cle in survivants_b:
+                comptes_b[cle] += 1
+                premiers_b.setdefault(cle, position + i)
+        for i, cle in enumerate(trigrammes):
+            if cle in survivants_t:
+                comptes_t[cle] += 1
+                premiers_t.setdefault(cle, position + i)
+        position += len(ids)
+
+    compteur = _compteur_depuis_tables(unigrammes, comptes_b, premiers_b, comptes_t, premiers_t)
+    bilan = {
+        'total_tokens': position,
+        'bigrammes_retenus': len(comptes_b),
+        'trigrammes_retenus': len(comptes_t),
+        'exact': exact,
+    }
+    return corpus, compteur, bilan
+
+
+def _compteur_depuis_tables(unigrammes, comptes_b, premiers_b, comptes_t, premiers_t):
+    """Construit un `CompteurNgrammes` à partir de tables {clé: compte}"""
+    cles_b = np.array(sorted(comptes_b), dtype=np.uint64)
+    liste_b = cles_b.tolist()
+    bigrammes_comptes = np.array([comptes_b[c] for c in liste_b], dtype=np.int64)
+    bigrammes_premiers = np.array([premiers_b[c] for c in liste_b], dtype=np.int64)
+
+    # Contexte d'un trigramme : indice de son bigramme dans les clés triées
+    liste_t = list(comptes_t)
+    contextes = np.array([c >> 32 for c in liste_t], dtype=np.uint64)
+    suivants = np.array([c & 0xFFFFFFFF for c in liste_t], dtype=np.uint64)
+    indices = np.searchsorted(cles_b, contextes).astype(np.uint64)
+    cles_t = (indices << DECALAGE_32) | suivants
+    ordre = np.argsort(cles_t, kind="stable")
+    trigrammes_comptes = np.array([comptes_t[c] for c in liste_t], dtype=np.int64)[ordre]
+    trigrammes_premiers = np.array([premiers_t[c] for c in liste_t], dtype=np.int64)[ordre]
+
+    return CompteurNgrammes(np.array(unigrammes, dtype=np.int64),
+                            cles_b, bigrammes_comptes, bigrammes_premiers,
+                            cles_t[ordre], trigrammes_comptes, trigrammes_premiers)
@@ -0,0 +1,421 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Comptage des n-grammes sur identifiants entiers, adossé à NumPy.
+
+Les anciens compteurs (`Counter` indexés par tuples de chaînes, plus les
+`defaultdict(Counter)` de suites par contexte) coûtaient plusieurs centaines
+d'octets par entrée. Ici, chaque bigramme est une clé de 64 bits
+(mot1 << 32 | mot2) et chaque trigramme une clé (indice du bigramme de
+contexte << 32 | mot3). Les clés sont comptées en bloc par `np.unique`, qui
+renvoie aussi la première position de chaque n-gramme dans le flux : c'est ce
+qui permet de reproduire à l'identique l'ordre d'insertion des anciens
+`Counter`, donc des fichiers JSON octet pour octet identiques.
+
+Le comptage peut aussi être réparti sur plusieurs processus
+(`compter_en_parallele`) : chaque tranche de textes est tokenisée et comptée
+à part, puis les comptes partiels sont fusionnés dans l'ordre des tranches.
+Le résultat est identique à celui d'un comptage en un seul morceau.
+"""
+
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from tokenisation import CorpusTokenise, iterer_contenus, tokeniser_corpus
+
+MASQUE_32 = np.uint64(0xFFFFFFFF)
+DECALAGE_32 = np.uint64(32)
+
+
+def _identifiants(corpus):
+    """Vue NumPy (sans copie) sur le flux d'identifiants du corpus"""
+    if not len(corpus.ids):
+        return np.zeros(0, dtype=np.uint32)
+    return np.frombuffer(corpus.ids, dtype=np.dtype(f"u{corpus.ids.itemsize}"))
+
+
+def _positions_internes(corpus, nombre_tokens):
+    """Masque des positions i telles que i et i+1 appartiennent au même texte"""
+    if nombre_tokens < 2:
+        return np.zeros(0, dtype=bool)
+    interne = np.ones(nombre_tokens - 1, dtype=bool)
+    fins = np.frombuffer(corpus.bornes, dtype=np.uint64).astype(np.int64)[1:] - 1
+    fins = fins[(fins >= 0) & (fins < nombre_tokens - 1)]
+    interne[fins] = False
+    return interne
+
+
+def _compter(cles, positions):
+    """Clés distinctes triées, leur nombre d'occurrences et première position"""
+    uniques, premiers, inverse, comptes = np.unique(
+        cles, return_index=True, return_inverse=True, return_counts=True)
+    return uniques, comptes.astype(np.int64), positions[premiers], inverse
+
+
+def _agreger(cles, comptes, premiers):
+    """Additionne les comptes de clés répétées, garde la plus petite position"""
+    uniques, inverse = np.unique(cles, return_inverse=True)
+    total = np.zeros(len(uniques), dtype=np.int64)
+    np.add.at(total, inverse, comptes)
+    premier = np.full(len(uniques), np.iinfo(np.int64).max, dtype=np.int64)
+    np.minimum.at(premier, inverse, premiers)
+    return uniques, total, premier
+
+
+class CompteurNgrammes:
+    """Uni/bi/trigrammes d'un `CorpusTokenise`, en tableaux NumPy"""
+
+    def __init__(self, unigrammes, bigrammes_cles, bigrammes_comptes, bigrammes_premiers,
+                 trigrammes_cles, trigrammes_comptes, trigrammes_premiers):
+        self.unigrammes = unigrammes
+        self.bigrammes_cles = bigrammes_cles
+        self.bigrammes_comptes = bigrammes_comptes
+        self.bigrammes_premiers = bigrammes_premiers
+        self.trigrammes_cles = trigrammes_cles
+        self.trigrammes_comptes = trigrammes_comptes
+        self.trigrammes_premiers = trigrammes_premiers
+
+    @classmethod
+    def depuis_corpus(cls, corpus):
+        """Compte les n-grammes d'un corpus tokenisé"""
+        ids = _identifiants(corpus)
+        nombre_tokens = len(ids)
+        taille_vocabulaire = len(corpus.vocabulaire)
+
+        unigrammes = np.bincount(ids, minlength=taille_vocabulaire).astype(np.int64)
+
+        # Bigrammes : positions i où (i, i+1) ne franchit pas une borne de texte
+        interne = _positions_internes(corpus, nombre_tokens)
+        positions_b = np.flatnonzero(interne)
+        cles_b = (ids[positions_b].astype(np.uint64) << DECALAGE_32) | ids[positions_b + 1]
+        bigrammes_cles, bigrammes_comptes, bigrammes_premiers, inverse_b = _compter(cles_b, positions_b)
+
+        # Trigrammes : le contexte (mot1, mot2) est remplacé par l'indice de
+        # son bigramme, ce qui tient sur 32 bits quelle que soit la taille du
+        # vocabulaire.
+        positions_t = np.flatnonzero(interne[:-1] & interne[1:])
+        indice_b = np.empty(len(interne), dtype=np.int64)
+        indice_b[positions_b] = inverse_b
+        cles_t = ((indice_b[positions_t].astype(np.uint64) << DECALAGE_32)
+                  | ids[positions_t + 2])
+        trigrammes_cles, trigrammes_comptes, trigrammes_premiers, _ = _compter(cles_t, positions_t)
+
+        return cls(unigrammes, bigrammes_cles, bigrammes_comptes, bigrammes_premiers,
+                   trigrammes_cles, trigrammes_comptes, trigrammes_premiers)
+
+    @classmethod
+    def fusionner(cls, partiels, taille_vocabulaire):
+        """Fusionne des comptes partiels [(compteur, correspondance, décalage)].
+
+        `correspondance` traduit les identifiants locaux de la tranche en
+        identifiants globaux, `décalage` est la position de son premier token
+        dans le flux complet. Les comptes s'additionnent et chaque n-gramme
+        garde sa première position globale : l'ordre de sortie ne dépend donc
+        pas du découpage en tranches.
+        """
+        unigrammes = np.zeros(taille_vocabulaire, dtype=np.int64)
+        cles_b, comptes_b, premiers_b = [], [], []
+        for compteur, correspondance, decalage in partiels:
+            unigrammes[correspondance] += compteur.unigrammes
+            mot1 = correspondance[(compteur.bigrammes_cles >> DECALAGE_32).astype(np.int64)]
+            mot2 = correspondance[(compteur.bigrammes_cles & MASQUE_32).astype(np.int64)]
+            cles_b.append((mot1.astype(np.uint64) << DECALAGE_32) | mot2.astype(np.uint64))
+            comptes_b.append(compteur.bigrammes_comptes)
+            premiers_b.append(compteur.bigrammes_premiers + decalage)
+        bigrammes = _agreger(np.concatenate(cles_b), np.concatenate(comptes_b),
+                             np.concatenate(premiers_b))
+
+        # Les contextes des trigrammes sont des indices de bigrammes locaux :
+        # on les repasse en paires de mots globales, puis on retrouve leur
+        # indice dans les bigrammes fusionnés (tout contexte y figure).
+        cles_t, comptes_t, premiers_t = [], [], []
+        for (compteur, correspondance, decalage), cles_globales in zip(partiels, cles_b):
+            contextes = cles_globales[(compteur.trigrammes_cles >> DECALAGE_32).astype(np.int64)]
+            indices = np.searchsorted(bigrammes[0], contextes).astype(np.uint64)
+            suivants = correspondance[(compteur.trigrammes_cles & MASQUE_32).astype(np.int64)]
+            cles_t.append((indices << DECALAGE_32) | suivants.astype(np.uint64))
+            comptes_t.append(compteur.trigrammes_comptes)
+            premiers_t.append(compteur.trigrammes_premiers + decalage)
+        trigrammes = _agreger(np.concatenate(cles_t), np.concatenate(comptes_t),
+                              np.concatenate(premiers_t))
+
+        return cls(unigrammes, *bigrammes, *trigrammes)
+
+    # ------------------------------------------------------------------
+    # Accès
+    # ------------------------------------------------------------------
+    @property
+    def total_tokens(self):
+        return int(self.unigrammes.sum())
+
+    @property
+    def nombre_unigrammes(self):
+        return int(np.count_nonzero(self.unigrammes))
+
+    @property
+    def nombre_bigrammes(self):
+        return len(self.bigrammes_cles)
+
+    @property
+    def nombre_trigrammes(self):
+        return len(self.trigrammes_cles)
+
+    def bigramme(self, indice):
+        """Paire d'identifiants du bigramme d'indice donné"""
+        cle = int(self.bigrammes_cles[indice])
+        return cle >> 32, cle & 0xFFFFFFFF
+
+    def bigrammes_plus_frequents(self, n):
+        """Équivalent de `Counter.most_common(n)` : [((id1, id2), fréquence)].
+
+        À fréquence égale, l'ordre est celui de première apparition, comme
+        pour un `Counter` rempli en parcourant le corpus.
+        """
+        ordre = np.lexsort((self.bigrammes_premiers, -self.bigrammes_comptes))[:n]
+        return [(self.bigramme(i), int(self.bigrammes_comptes[i])) for i in ordre]
+
+    # ------------------------------------------------------------------
+    # Modèle de prédictions
+    # ------------------------------------------------------------------
+    def predictions(self, vocabulaire, seuil, max_candidats, min_occurrences_contexte=1):
+        """Construit {contexte: [{"word", "probability"}]} et le nombre de
+        contextes à deux mots écartés faute d'occurrences.
+
+        Clés à un mot d'abord, puis clés « mot1 mot2 », chacune dans l'ordre
+        de première apparition de son contexte ; candidats triés par
+        probabilité arrondie décroissante, à égalité dans l'ordre de
+        première apparition.
+        """
+        predictions = {}
+
+        # Contextes à un mot, depuis les bigrammes
+        contextes_b = (self.bigrammes_cles >> DECALAGE_32).astype(np.int64)
+        suivants_b = (self.bigrammes_cles & MASQUE_32).astype(np.int64)
+        self._classer(predictions, contextes_b, suivants_b,
+                      self.bigrammes_comptes, self.unigrammes[contextes_b],
+                      self.bigrammes_premiers, seuil, max_candidats,
+                      vocabulaire, lambda mot: vocabulaire[mot])
+
+        # Contextes à deux mots, depuis les trigrammes
+        contextes_t = (self.trigrammes_cles >> DECALAGE_32).astype(np.int64)
+        suivants_t = (self.trigrammes_cles & MASQUE_32).astype(np.int64)
+        totaux_t = self.bigrammes_comptes[contextes_t]
+        ignores = totaux_t < min_occurrences_contexte
+        contextes_ignores = len(np.unique(contextes_t[ignores]))
+
+        def cle_paire(indice):
+            mot1, mot2 = self.bigramme(indice)
+            return f"{vocabulaire[mot1]} {vocabulaire[mot2]}"
+
+        self._classer(predictions, contextes_t, suivants_t,
+                      self.trigrammes_comptes, totaux_t,
+                      self.trigrammes_premiers, seuil, max_candidats,
+                      vocabulaire, cle_paire, ~ignores)
+
+        return predictions, contextes_ignores
+
+    @staticmethod
+    def _classer(predictions, contextes, suivants, comptes, totaux, premiers,
+                 seuil, max_candidats, vocabulaire, cle, retenus=None):
+        """Ajoute aux prédictions les meilleurs candidats de chaque contexte.
+
+        `contextes` est trié (les clés empaquetées le sont), chaque contexte
+        occupe donc un bloc contigu.
+        """
+        if not len(contextes):
+            return
+
+        # Rang de chaque contexte : ordre de sa première apparition, toutes
+        # suites confondues (y compris celles sous le seuil).
+        debuts = np.flatnonzero(np.r_[True, contextes[1:] != contextes[:-1]])
+        premiere_apparition = np.minimum.reduceat(premiers, debuts)
+        rang_contexte = np.empty(len(debuts), dtype=np.int64)
+        rang_contexte[np.argsort(premiere_apparition, kind="stable")] = np.arange(len(debuts))
+        rangs = np.repeat(rang_contexte, np.diff(np.r_[debuts, len(contextes)]))
+
+        garde = comptes / totaux > seuil
+        if retenus is not None:
+            garde &= retenus
+        if not garde.any():
+            return
+        garde[garde] = _parmi_les_meilleurs(contextes[garde], comptes[garde], totaux[garde],
+                                            max_candidats)
+
+        contextes = contextes[garde].tolist()
+        suivants = suivants[garde].tolist()
+        comptes_g = comptes[garde].tolist()
+        totaux_g = totaux[garde].tolist()
+        # Arrondi Python (et non np.round) : seuls les survivants du seuil sont
+        # concernés, et l'égalité des arrondis décide de l'ordre final.
+        probabilites = [round(c / t, 3) for c, t in zip(comptes_g, totaux_g)]
+        ordre = np.lexsort((premiers[garde], -np.asarray(probabilites), rangs[garde]))
+
+        contexte_courant = None
+        candidats = None
+        for i in ordre.tolist():
+            if contextes[i] != contexte_courant:
+                contexte_courant = contextes[i]
+                candidats = predictions[cle(contexte_courant)] = []
+            if len(candidats) < max_candidats:
+                candidats.append({"word": vocabulaire[suivants[i]],
+                                  "probability": probabilites[i]})
+
+
+def _kiemes_comptes(valeurs, tailles, k):
+    """k-ième plus grand compte (avec répétitions) de chaque bloc contigu de
+    `valeurs`, blocs de plus de k éléments, sans tri.
+
+    À chaque passe, le maximum restant de chaque bloc et son nombre
+    d'occurrences : le k-ième est atteint quand leur cumul atteint k. Les
+    occurrences comptées et les blocs résolus sont retirés avant la passe
+    suivante ; chaque passe retire au moins un élément par bloc, il y en a
+    donc k au plus.
+    """
+    kiemes = np.zeros(len(tailles), dtype=np.int64)
+    blocs = np.arange(len(tailles))
+    restants = np.full(len(tailles), k, dtype=np.int64)
+    while len(blocs):
+        debuts = np.r_[0, np.cumsum(tailles)[:-1]]
+        maxima = np.maximum.reduceat(valeurs, debuts)
+        egaux = valeurs == np.repeat(maxima, tailles)
+        nombres = np.add.reduceat(egaux, debuts)
+        atteints = nombres >= restants
+        kiemes[blocs[atteints]] = maxima[atteints]
+
+        ouverts = ~atteints
+        valeurs = valeurs[~egaux & np.repeat(ouverts, tailles)]
+        tailles = (tailles - nombres)[ouverts]
+        restants = (restants - nombres)[ouverts]
+        blocs = blocs[ouverts]
+    return kiemes
+
+
+def _parmi_les_meilleurs(contextes, comptes, totaux, k):
+    """Masque des suites pouvant figurer parmi les k premières de leur contexte.
+
+    Le classement final se fait sur la probabilité arrondie au millième, puis
+    sur la première apparition : une suite moins fréquente que la k-ième peut
+    donc encore passer devant elle si leurs arrondis sont égaux. Seules sont
+    écartées celles dont la probabilité est inférieure de plus d'un millième
+    à celle de la k-ième (c - c_k < -t/1000), dont l'arrondi est forcément
+    strictement plus petit. Les contextes à fort éventail (« ka », « an der »)
+    ne gardent ainsi qu'une poignée de suites à arrondir et à convertir.
+
+    `contextes` est trié : chaque contexte occupe un bloc contigu.
+    """
+    debuts = np.flatnonzero(np.r_[True, contextes[1:] != contextes[:-1]])
+    tailles = np.diff(np.r_[debuts, len(contextes)])
+    if tailles.max() <= k:
+        return np.ones(len(contextes), dtype=bool)
+
+    larges = tailles > k
+    kieme = np.zeros(len(debuts), dtype=np.int64)
+    kieme[larges] = _kiemes_comptes(comptes[np.repeat(larges, tailles)].astype(np.int64),
+                                    tailles[larges], k)
+    seuils = np.repeat(kieme, tailles)
+    return (seuils - comptes.astype(np.int64, copy=False)) * 1000 <= totaux
+
+
+# ----------------------------------------------------------------------
+# Comptage réparti sur plusieurs processus
+# ----------------------------------------------------------------------
+
+# Tranches par processus : assez pour lisser les écarts de durée entre
+# tranches, assez peu pour que la fusion reste négligeable.
+TRANCHES_PAR_PROCESSUS = 4
+# Taille des tranches quand le nombre de textes n'est pas connu d'avance
+TEXTES_PAR_TRANCHE = 2000
+# Tranches soumises en avance par processus : borne la mémoire des textes
+# en attente quand le corpus arrive d'un générateur.
+EN_VOL_PAR_PROCESSUS = 2
+
+
+def fusionner_corpus(tranches):
+    """Recolle des corpus tokenisés séparément, dans l'ordre des tranches.
+
+    Les mots nouveaux de chaque tranche sont ajoutés dans leur ordre local de
+    première apparition : le vocabulaire fusionné est exactement celui d'une
+    tokenisation en un seul morceau. Renvoie le corpus, et pour chaque tranche
+    la table identifiant local -> global et la position de son premier token.
+    """
+    corpus = CorpusTokenise()
+    type_ids = np.dtype(f"u{corpus.ids.itemsize}")
+    correspondances, decalages = [], []
+    for tranche in tranches:
+        index = corpus.index
+        vocabulaire = corpus.vocabulaire
+        correspondance = np.empty(len(tranche.vocabulaire), dtype=np.int64)
+        for i, mot in enumerate(tranche.vocabulaire):
+            ident = index.get(mot)
+            if ident is None:
+                ident = index[mot] = len(vocabulaire)
+                vocabulaire.append(mot)
+            correspondance[i] = ident
+
+        decalage = len(corpus.ids)
+        corpus.ids.frombytes(correspondance[_identifiants(tranche)].astype(type_ids).tobytes())
+        bornes = np.frombuffer(tranche.bornes, dtype=np.uint64)[1:] + np.uint64(decalage)
+        corpus.bornes.frombytes(bornes.tobytes())
+        corpus.nombre_textes += tranche.nombre_textes
+
+        correspondances.append(correspondance)
+        decalages.append(decalage)
+    return corpus, correspondances, decalages
+
+
+def _compter_tranche(contenus, pattern_mot):
+    """Travail d'un processus : tokenise et compte une tranche de textes"""
+    corpus = tokeniser_corpus(contenus, pattern_mot)
+    return corpus, CompteurNgrammes.depuis_corpus(corpus)
+
+
+def _tranches(contenus, taille):
+    """Découpe un flux de contenus en listes de `taille` textes consécutifs"""
+    tranche = []
+    for contenu in contenus:
+        tranche.append(contenu)
+        if len(tranche) == taille:
+            yield tranche
+            tranche = []
+    if tranche:
+        yield tranche
+
+
+def compter_en_parallele(textes, pattern_mot, workers, nombre_textes=None):
+    """Tokenise et compte le corpus sur `workers` processus.
+
+    Renvoie (corpus tokenisé, compteur), identiques à ceux d'une exécution
+    en série : les tranches sont des suites de textes consécutifs et sont
+    fusionnées dans leur ordre d'origine.
+
+    `textes` est consommé au fil de l'eau : seules les tranches en cours de
+    traitement sont en mémoire sous forme de chaînes. `nombre_textes`, s'il
+    est connu, sert à dimensionner les tranches.
+    """
+    if nombre_textes is None and hasattr(textes, '__len__'):
+        nombre_textes = len(textes)
+    if nombre_textes:
+        taille = max(1, -(-nombre_textes // (workers * TRANCHES_PAR_PROCESSUS)))
+    else:
+        taille = TEXTES_PAR_TRANCHE
+
+    resultats = []
+    en_cours = deque()
+    with ProcessPoolExecutor(max_workers=workers) as executeur:
+        for tranche in _tranches(iterer_contenus(textes), taille):
+            en_cours.append(executeur.submit(_compter_tranche, tranche, pattern_mot))
+            if len(en_cours) >= workers * EN_VOL_PAR_PROCESSUS:
+                resultats.append(en_cours.popleft().result())
+        resultats.extend(future.result() for future in en_cours)
+
+    if not resultats:
+        corpus = CorpusTokenise()
+        return corpus, CompteurNgrammes.depuis_corpus(corpus)
+
+    corpus, correspondances, decalages = fusionner_corpus([corpus for corpus, _ in resultats])
+    partiels = [(compteur, correspondance, decalage)
+                for (_, compteur), correspondance, decalage
+                in zip(resultats, correspondances, decalages)]
+    return corpus, CompteurNgrammes.fusionner(partiels, len(corpus.vocabulaire))
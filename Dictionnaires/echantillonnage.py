@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Échantillonnage du corpus sous budget de temps (`--time-budget`).
+
+Le corpus est découpé en blocs de `TAILLE_BLOC` textes, parcourus dans un
+ordre aléatoire reproductible : l'échantillon couvre tout le corpus, même trié
+par source ou par date. Le premier bloc tiré est mis de côté pour le test.
+
+La taille de chaque tirage s'adapte au débit mesuré : un bloc pour commencer,
+puis autant de blocs que le temps restant le permet, jusqu'à `MAX_BLOCS_TIRAGE`.
+L'échantillonnage s'arrête quand le prochain bloc ne tient plus dans le budget.
+
+Couverture estimée : des comptes figés à chaque doublement de l'échantillon
+donnent des modèles de plus en plus grands, rejoués sur le bloc de test
+(précision top-5, avec le repli du clavier). Le gain de précision par
+doublement mesuré en fin d'échantillon est prolongé jusqu'à la taille du
+corpus complet : c'est une estimation, qui suppose ce gain constant.
+"""
+
+import math
+import random
+import time
+
+TAILLE_BLOC = 1000
+MAX_BLOCS_TIRAGE = 10
+GRAINE = 0
+# Part du budget consacrée au comptage ; le reste construit et évalue le modèle
+PART_COMPTAGE = 0.8
+MAX_POINTS_COURBE = 3
+# Écart minimal de taille entre les deux mesures qui donnent la pente
+RAPPORT_MIN_PENTE = 1.5
+
+
+class EchantillonneurAdaptatif:
+    """Tire des blocs du corpus tant que le budget de temps le permet"""
+
+    def __init__(self, nombre_blocs, budget_secondes, graine=GRAINE):
+        ordre = list(range(nombre_blocs))
+        random.Random(graine).shuffle(ordre)
+        # Un bloc de test seulement si l'apprentissage garde au moins un bloc
+        self.bloc_test = ordre.pop(0) if nombre_blocs > 1 else None
+        self.restants = ordre
+        self.nombre_blocs = nombre_blocs
+        self.budget = budget_secondes
+        self.debut = time.perf_counter()
+        self.blocs_tires = 0
+        self.duree_comptage = 0.0
+
+    def ecoule(self):
+        return time.perf_counter() - self.debut
+
+    def prochains_blocs(self):
+        """Blocs du prochain tirage ; liste vide quand le budget est épuisé"""
+        if not self.restants:
+            return []
+        if not self.blocs_tires:
+            nombre = 1
+        else:
+            duree_bloc = self.duree_comptage / self.blocs_tires
+            nombre = min(int((self.budget - self.ecoule()) / duree_bloc), MAX_BLOCS_TIRAGE)
+            if nombre < 1:
+                return []
+        tirage, self.restants = self.restants[:nombre], self.restants[nombre:]
+        return tirage
+
+    def noter(self, nombre_blocs, duree):
+        """Durée de traitement d'un tirage, pour dimensionner le suivant"""
+        self.blocs_tires += nombre_blocs
+        self.duree_comptage += duree
+
+    @property
+    def complet(self):
+        """Vrai si tous les blocs d'apprentissage ont été tirés"""
+        return not self.restants
+
+
+def precision_top5(predictions, textes_tokenises):
+    """Part des mots (après le premier de chaque texte) prédits dans le top 5
+    du contexte : clé à deux mots, sinon dernier mot"""
+    positions = trouves = 0
+    for mots in textes_tokenises:
+        for i in range(1, len(mots)):
+            candidats = predictions.get(f"{mots[i - 2]} {mots[i - 1]}") if i > 1 else None
+            if candidats is None:
+                candidats = predictions.get(mots[i - 1], ())
+            positions += 1
+            trouves += any(candidat["word"] == mots[i] for candidat in candidats[:5])
+    return trouves / positions if positions else 0.0
+
+
+def extrapoler_precision(points, tokens_corpus):
+    """Précision estimée d'un modèle construit sur `tokens_corpus` tokens.
+
+    `points` : [(tokens, précision)] mesurés sur le bloc de test, par taille
+    croissante. Pente en log(tokens) entre la dernière mesure et la précédente
+    au moins `RAPPORT_MIN_PENTE` fois plus petite, bornée entre la dernière
+    mesure et 1 ; None sans telle mesure précédente.
+    """
+    tokens, precision = points[-1]
+    precedents = [point for point in points[:-1] if 0 < point[0] * RAPPORT_MIN_PENTE <= tokens]
+    if not precedents:
+        return None
+    tokens_avant, precision_avant = precedents[-1]
+    pente = (precision - precision_avant) / math.log(tokens / tokens_avant)
+    estimee = precision + pente * math.log(max(tokens_corpus, tokens) / tokens)
+    return min(max(estimee, precision), 1.0)
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Écriture des assets JSON (dictionnaires, n-grammes) et bilan de leurs tailles.
+
+Deux formats produisent le même contenu pour le clavier :
+
+- indenté (défaut) : `indent=2`, lisible et diffable dans git ;
+- compact (`--compact-json`) : sans indentation ni espaces après `,` et `:`,
+  soit 30 à 50 % d'octets en moins sur les n-grammes.
+
+`--compress gzip|zstd` écrit en plus une variante précompressée à côté de
+chaque asset (`.json.gz` / `.json.zst`, même format JSON). zstd demande le
+module `zstandard` ; sans lui, gzip est utilisé.
+
+Chaque contenu est sérialisé une seule fois, puis écrit dans toutes ses
+cibles (assets Flutter et Android, sauvegardes) : fichiers temporaires d'abord,
+remplacés ensuite par `os.replace`. Un arrêt en cours d'écriture laisse donc
+les anciens fichiers intacts, jamais un asset tronqué ni deux cibles qui
+divergent.
+
+Chaque écriture est notée dans un `BilanTailles`, qui affiche en fin de
+sauvegarde les octets indentés / compacts / compressés de chaque asset.
+
+Les formats en évaluation (`.bin`, poids de repli Kneser-Ney), que
+l'application ne lit pas encore, sont écrits dans `DOSSIER_EVALUATION`
+(cf. `chemin_evaluation`) et non dans les assets : ils n'alourdissent pas l'APK.
+"""
+
+import gzip
+import io
+import json
+import os
+
+try:
+    import zstandard
+    HAS_ZSTANDARD = True
+except ImportError:
+    HAS_ZSTANDARD = False
+
+FORMATS_JSON = {
+    "indente": {"ensure_ascii": False, "indent": 2},
+    "compact": {"ensure_ascii": False, "separators": (",", ":")},
+}
+COMPRESSIONS = ("gzip", "zstd")
+EXTENSIONS_COMPRESSION = {"gzip": ".gz", "zstd": ".zst"}
+NIVEAU_GZIP = 9
+NIVEAU_ZSTD = 19
+# Formats dérivés des assets mais pas encore lus par l'app (hors de l'APK)
+DOSSIER_EVALUATION = "assets_evaluation"
+
+
+def chemin_evaluation(chemin_asset, suffixe):
+    """Chemin d'un format en évaluation dérivé d'un asset : nom de l'asset sans
+    extension, suivi de `suffixe`, dans `DOSSIER_EVALUATION`"""
+    base = os.path.splitext(os.path.basename(chemin_asset))[0]
+    return os.path.join(DOSSIER_EVALUATION, base + suffixe)
+
+
+def format_json(compact=False):
+    """Arguments de `json.dumps` du format choisi"""
+    return FORMATS_JSON["compact" if compact else "indente"]
+
+
+def serialiser(donnees, compact=False):
+    """Contenu JSON encodé en UTF-8, tel qu'écrit dans les assets"""
+    return json.dumps(donnees, **format_json(compact)).encode('utf-8')
+
+
+def serialiser_paires(paires, compact=False):
+    """Tableau [[mot, fréquence], ...] sérialisé au fil des paires, sans liste
+    intermédiaire ; octets identiques à `serialiser([[mot, freq], ...])`"""
+    if compact:
+        ouverture, separateur, fermeture, modele = "[", ",", "]", "[{},{}]"
+    else:
+        ouverture, separateur, fermeture, modele = "[\n", ",\n", "\n]", "  [\n    {},\n    {}\n  ]"
+    texte = io.StringIO()
+    for i, (mot, frequence) in enumerate(paires):
+        texte.write(separateur if i else ouverture)
+        texte.write(modele.format(json.dumps(mot, ensure_ascii=False), json.dumps(frequence)))
+    if not texte.tell():
+        return b"[]"
+    texte.write(fermeture)
+    return texte.getvalue().encode('utf-8')
+
+
+def octets_json(objet, compact=False):
+    """Taille en octets d'un objet sérialisé au format des assets"""
+    return len(serialiser(objet, compact))
+
+
+def methode_compression(demandee):
+    """Méthode de compression utilisable : zstd se replie sur gzip sans zstandard"""
+    if demandee is None:
+        return None
+    if demandee not in COMPRESSIONS:
+        print(f"⚠️ Compression inconnue '{demandee}', gzip utilisé (choix: {', '.join(COMPRESSIONS)})")
+        return "gzip"
+    if demandee == "zstd" and not HAS_ZSTANDARD:
+        print("⚠️ Module 'zstandard' absent, compression gzip utilisée")
+        return "gzip"
+    return demandee
+
+
+def compresser(contenu, methode="gzip"):
+    """Contenu compressé (gzip sans date d'écriture : sortie reproductible)"""
+    if methode == "zstd":
+        return zstandard.ZstdCompressor(level=NIVEAU_ZSTD).compress(contenu)
+    return gzip.compress(contenu, compresslevel=NIVEAU_GZIP, mtime=0)
+
+
+class BilanTailles:
+    """Tailles indentée / compacte / compressée de chaque asset écrit"""
+
+    def __init__(self, compact=False, compression=None):
+        self.compact = compact
+        self.compression = compression
+        self.lignes = []
+
+    def noter(self, chemins, contenu, reserialiser):
+        """Relève les trois tailles ; `contenu` est ce qui a été écrit, et
+        `reserialiser(compact)` produit l'autre format"""
+        compact = contenu if self.compact else reserialiser(True)
+        indente = reserialiser(False) if self.compact else contenu
+        compresse = len(compresser(compact, self.compression or "gzip"))
+        for chemin in chemins:
+            self.lignes.append({
+                "asset": os.path.normpath(chemin),
+                "indente": len(indente),
+                "compact": len(compact),
+                "compresse": compresse,
+            })
+
+    def afficher(self):
+        if not self.lignes:
+            return
+        methode = self.compression or "gzip"
+        largeur = max(len(ligne["asset"]) for ligne in self.lignes)
+        print(f"\n📏 TAILLE DES ASSETS ({'compact' if self.compact else 'indenté'} écrit, "
+              f"compressé = {methode} du compact)")
+        print(f"   {'Asset':<{largeur}} {'Indenté':>12} {'Compact':>12} {'Compressé':>12}")
+        for ligne in self.lignes:
+            print(f"   {ligne['asset']:<{largeur}} {ligne['indente']:>12,} {ligne['compact']:>12,} "
+                  f"{ligne['compresse']:>12,}")
+        totaux = {cle: sum(ligne[cle] for ligne in self.lignes) for cle in ("indente", "compact", "compresse")}
+        print(f"   {'Total':<{largeur}} {totaux['indente']:>12,} {totaux['compact']:>12,} "
+              f"{totaux['compresse']:>12,}")
+
+
+def _cibles(chemins):
+    return [chemins] if isinstance(chemins, str) else list(chemins)
+
+
+def ecrire_contenu(contenu, chemins, compression=None):
+    """Écrit les mêmes octets dans chaque cible (et leur variante compressée) :
+    tous les fichiers temporaires sont écrits et synchronisés sur disque avant
+    le premier `os.replace`"""
+    fichiers = [(chemin, contenu) for chemin in _cibles(chemins)]
+    if compression is not None:
+        compresse = compresser(contenu, compression)
+        extension = EXTENSIONS_COMPRESSION[compression]
+        fichiers += [(chemin + extension, compresse) for chemin, _ in fichiers]
+
+    temporaires = []
+    try:
+        for chemin, octets in fichiers:
+            os.makedirs(os.path.dirname(chemin) or '.', exist_ok=True)
+            temporaire = chemin + '.tmp'
+            with open(temporaire, 'wb') as f:
+                temporaires.append((temporaire, chemin))
+                f.write(octets)
+                f.flush()
+                os.fsync(f.fileno())
+    except BaseException:
+        for temporaire, _ in temporaires:
+            os.remove(temporaire)
+        raise
+    for temporaire, chemin in temporaires:
+        os.replace(temporaire, chemin)
+    return len(contenu)
+
+
+def ecrire_json(donnees, chemins, compact=False, compression=None, bilan=None):
+    """Sérialise `donnees` une fois et l'écrit dans une ou plusieurs cibles ;
+    renvoie la taille écrite"""
+    contenu = serialiser(donnees, compact)
+    ecrire_contenu(contenu, chemins, compression)
+    if bilan is not None:
+        bilan.noter(_cibles(chemins), contenu, lambda format_compact: serialiser(donnees, format_compact))
+    return len(contenu)
+
+
+def ecrire_paires_json(paires, chemins, compact=False, compression=None, bilan=None):
+    """Comme `ecrire_json`, pour le tableau [[mot, fréquence], ...] d'un
+    itérable de paires, sans le construire. Le bilan relit les paires : une
+    vue `dictionnaire.items()` ou une liste, pas un générateur."""
+    contenu = serialiser_paires(paires, compact)
+    ecrire_contenu(contenu, chemins, compression)
+    if bilan is not None:
+        bilan.noter(_cibles(chemins), contenu,
+                    lambda format_compact: serialiser_paires(paires, format_compact))
+    return len(contenu)
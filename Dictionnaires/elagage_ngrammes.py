@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Élagage des prédictions n-grammes sous un budget de taille d'asset.
+
+Le fichier de n-grammes grossit avec le corpus ; `--max-asset-bytes` et
+`--max-contexts` le ramènent sous un budget en retirant d'abord ce qui
+contribue le moins aux prédictions, à la manière de l'élagage par entropie
+de Stolcke (perte estimée en une passe sur le modèle complet, puis retrait
+par ordre de perte croissante).
+
+Le critère suit l'usage réel du clavier : `SuggestionEngine` ne combine pas
+les probabilités, il affiche la liste de la clé à deux mots si elle existe,
+sinon celle du dernier mot. La perte d'un retrait est donc le nombre de
+positions du corpus où le mot suivant cesse d'être proposé :
+
+- retirer la suite w de la clé « a b » coûte c(a b w) ;
+- retirer la suite w de la clé « b » coûte c(b w) moins les occurrences déjà
+  servies par une clé « a b » exportée ;
+- retirer la clé « a b » renvoie ses positions sur la liste de « b » et coûte
+  Σ c(a b w) sur sa liste moins Σ c(a b w) sur la liste de « b » (négatif
+  quand le repli fait mieux, ce que le lissage rend possible).
+
+Le coût en octets de chaque retrait est exact pour le format d'écriture de
+l'asset (indenté ou compact, cf. ecriture_assets.py) ; la taille finale est
+vérifiée par sérialisation.
+"""
+
+import json
+
+import numpy as np
+
+from ecriture_assets import octets_json
+
+OCTETS_PAR_MO = 1024 * 1024
+
+
+def _octets_scalaire(valeur):
+    return len(json.dumps(valeur, ensure_ascii=False).encode('utf-8'))
+
+
+def _surcouts_format(compact=False):
+    """(surcoût d'une suite, surcoût d'une clé) hors texte du mot, de la
+    probabilité et de la clé, mesurés sur un objet de référence.
+
+    Retirer une suite d'une liste qui en garde d'autres économise exactement
+    son surcoût plus son texte, quelle que soit sa place (le séparateur passe
+    à la suivante) ; de même pour une clé du dictionnaire.
+    """
+    suite = {"word": "w", "probability": 0.5}
+    textes_suite = _octets_scalaire("w") + _octets_scalaire(0.5)
+    surcout_suite = (octets_json({"k": [suite, suite]}, compact) - octets_json({"k": [suite]}, compact)
+                     - textes_suite)
+    surcout_cle = (octets_json({"a": [suite], "b": [suite]}, compact) - octets_json({"a": [suite]}, compact)
+                   - _octets_scalaire("b") - surcout_suite - textes_suite)
+    return surcout_suite, surcout_cle
+
+
+class ElagueurNgrammes:
+    """Estime la contribution de chaque clé et de chaque suite d'un modèle
+    {contexte: [{word, probability}]} à partir des comptes du corpus"""
+
+    def __init__(self, predictions, compteur, index_mots, compact=False):
+        self.predictions = predictions
+        self.compact = compact
+        self.cles = list(predictions)
+        surcout_suite, self.surcout_cle = _surcouts_format(compact)
+        nombre = len(self.cles)
+
+        # Une ligne par suite : contexte (rang de la clé), mot, octets
+        contextes, mots, octets = [], [], []
+        for rang, candidats in enumerate(predictions.values()):
+            for candidat in candidats:
+                contextes.append(rang)
+                mots.append(index_mots[candidat["word"]])
+                octets.append(surcout_suite + _octets_scalaire(candidat["word"])
+                              + _octets_scalaire(candidat["probability"]))
+        self.contextes = np.asarray(contextes, dtype=np.int64)
+        mots = np.asarray(mots, dtype=np.uint64)
+        self.octets_suites = np.asarray(octets, dtype=np.int64)
+        self.octets_cles = np.asarray([self.surcout_cle + _octets_scalaire(cle) for cle in self.cles],
+                                      dtype=np.int64)
+        debuts = np.searchsorted(self.contextes, np.arange(nombre + 1))
+
+        # Clés à deux mots : bigramme (a, b) et rang de la clé « b » de repli
+        rang_cle = {cle: rang for rang, cle in enumerate(self.cles)}
+        paires, bigrammes_paires, replis = [], [], []
+        mots_contexte = np.zeros(nombre, dtype=np.uint64)
+        for rang, cle in enumerate(self.cles):
+            mot1, espace, mot2 = cle.partition(' ')
+            if espace:
+                paires.append(rang)
+                bigrammes_paires.append((index_mots[mot1] << 32) | index_mots[mot2])
+                replis.append(rang_cle.get(mot2, -1))
+            else:
+                mots_contexte[rang] = index_mots[cle]
+        self.paires = np.asarray(paires, dtype=np.int64)
+        self.replis = np.asarray(replis, dtype=np.int64)
+        est_paire = np.zeros(nombre, dtype=bool)
+        est_paire[self.paires] = True
+        self.suites_paires = est_paire[self.contextes]
+        indices_paires = np.zeros(nombre, dtype=np.uint64)
+        indices_paires[self.paires] = _indices(compteur.bigrammes_cles,
+                                               np.asarray(bigrammes_paires, dtype=np.uint64))
+
+        # Occurrences servies par chaque suite : trigramme pour une clé à deux
+        # mots, bigramme pour une clé à un mot.
+        self.comptes = np.zeros(len(self.contextes), dtype=np.int64)
+        contextes_p = self.contextes[self.suites_paires]
+        self.comptes[self.suites_paires] = _comptes(
+            compteur.trigrammes_cles, compteur.trigrammes_comptes,
+            (indices_paires[contextes_p] << np.uint64(32)) | mots[self.suites_paires])
+        contextes_m = self.contextes[~self.suites_paires]
+        self.comptes[~self.suites_paires] = _comptes(
+            compteur.bigrammes_cles, compteur.bigrammes_comptes,
+            (mots_contexte[contextes_m] << np.uint64(32)) | mots[~self.suites_paires])
+
+        # Repli : chaque clé « a b » face à chaque suite w de la liste de « b »,
+        # avec c(a b w) — les positions que cette suite sert (ou servirait).
+        avec_repli = self.replis >= 0
+        paires_r, replis_r = self.paires[avec_repli], self.replis[avec_repli]
+        longueurs = debuts[replis_r + 1] - debuts[replis_r]
+        self.repli_paires = np.repeat(paires_r, longueurs)
+        decalages = np.arange(longueurs.sum()) - np.repeat(np.cumsum(longueurs) - longueurs, longueurs)
+        self.repli_suites = np.repeat(debuts[replis_r], longueurs) + decalages
+        self.repli_comptes = _comptes(
+            compteur.trigrammes_cles, compteur.trigrammes_comptes,
+            (indices_paires[self.repli_paires] << np.uint64(32)) | mots[self.repli_suites])
+
+        self.positions = max(1, int(compteur.bigrammes_comptes.sum()))
+
+    # ------------------------------------------------------------------
+    # Couverture et pertes
+    # ------------------------------------------------------------------
+    def _comptes_effectifs(self, cles_gardees):
+        """Occurrences servies par chaque suite quand seules `cles_gardees`
+        sont exportées : une clé « b » ne sert pas les positions reprises par
+        une clé « a b » gardée"""
+        reprises = cles_gardees[self.repli_paires]
+        servies = np.bincount(self.repli_suites[reprises], weights=self.repli_comptes[reprises],
+                              minlength=len(self.contextes)).astype(np.int64)
+        return self.comptes - np.where(self.suites_paires, 0, servies)
+
+    def couverture(self, cles_gardees, suites_gardees):
+        """Part des positions du corpus où le mot suivant est proposé (top-5)"""
+        gardees = suites_gardees & cles_gardees[self.contextes]
+        return float(self._comptes_effectifs(cles_gardees)[gardees].sum()) / self.positions
+
+    def pertes(self):
+        """(perte de chaque suite, perte de chaque clé) sur le modèle complet"""
+        nombre = len(self.cles)
+        pertes_suites = self._comptes_effectifs(np.ones(nombre, dtype=bool))
+        pertes_cles = np.bincount(self.contextes, weights=pertes_suites, minlength=nombre)
+        repli = np.bincount(self.repli_paires, weights=self.repli_comptes, minlength=nombre)
+        pertes_cles[self.paires] -= repli[self.paires]
+        return pertes_suites, pertes_cles
+
+    # ------------------------------------------------------------------
+    # Élagage
+    # ------------------------------------------------------------------
+    def elaguer(self, max_octets=None, max_contextes=None):
+        """Prédictions élaguées sous le budget, et rapport de l'élagage"""
+        octets_avant = octets_json(self.predictions, self.compact)
+        nombre_cles = len(self.cles)
+        cles_gardees = np.ones(nombre_cles, dtype=bool)
+        suites_gardees = np.ones(len(self.contextes), dtype=bool)
+        restantes = np.bincount(self.contextes, minlength=nombre_cles)
+        octets_listes = np.bincount(self.contextes, weights=self.octets_suites,
+                                    minlength=nombre_cles).astype(np.int64)
+        pertes_suites, pertes_cles = self.pertes()
+
+        # Nombre de clés : retrait des clés de moindre perte
+        if max_contextes is not None and nombre_cles > max_contextes:
+            ordre = np.lexsort((-(self.octets_cles + octets_listes), pertes_cles))
+            cles_gardees[ordre[:nombre_cles - max_contextes]] = False
+
+        # Octets : retrait par perte par octet croissante, suites et clés à
+        # deux mots mêlées, en tenant compte de ce qui est déjà retiré.
+        taille = octets_json(self._resultat(cles_gardees, suites_gardees), self.compact)
+        if max_octets is not None and taille > max_octets:
+            ratios = np.concatenate([pertes_suites / self.octets_suites,
+                                     pertes_cles[self.paires] / (self.octets_cles[self.paires]
+                                                                 + octets_listes[self.paires])])
+            nombre_suites = len(self.contextes)
+            for element in np.argsort(ratios, kind="stable").tolist():
+                if taille <= max_octets:
+                    break
+                if element < nombre_suites:
+                    rang = self.contextes[element]
+                    if not cles_gardees[rang] or not suites_gardees[element]:
+                        continue
+                    suites_gardees[element] = False
+                    restantes[rang] -= 1
+                    octets_listes[rang] -= self.octets_suites[element]
+                    taille -= self.octets_suites[element]
+                    if restantes[rang] == 0:
+                        # Liste vide : la clé disparaît, avec son séparateur
+                        cles_gardees[rang] = False
+                        taille -= self.octets_cles[rang]
+                else:
+                    rang = self.paires[element - nombre_suites]
+                    if not cles_gardees[rang]:
+                        continue
+                    cles_gardees[rang] = False
+                    taille -= self.octets_cles[rang] + octets_listes[rang]
+
+        elaguees = self._resultat(cles_gardees, suites_gardees)
+        octets_apres = octets_json(elaguees, self.compact)
+        toutes_cles = np.ones(nombre_cles, dtype=bool)
+        toutes_suites = np.ones(len(self.contextes), dtype=bool)
+        couverture_avant = self.couverture(toutes_cles, toutes_suites)
+        couverture_apres = self.couverture(cles_gardees, suites_gardees)
+        economise = octets_avant - octets_apres
+        rapport = {
+            "octets_avant": octets_avant,
+            "octets_apres": octets_apres,
+            "contextes_avant": nombre_cles,
+            "contextes_apres": len(elaguees),
+            "suites_avant": len(self.contextes),
+            "suites_apres": sum(len(candidats) for candidats in elaguees.values()),
+            "couverture_avant": round(couverture_avant, 4),
+            "couverture_apres": round(couverture_apres, 4),
+            # Points de couverture perdus par Mo économisé
+            "perte_par_mo": round((couverture_avant - couverture_apres) * OCTETS_PAR_MO / economise, 4)
+                            if economise > 0 else 0.0,
+            "budget_respecte": max_octets is None or octets_apres <= max_octets,
+        }
+        return elaguees, rapport
+
+    def _resultat(self, cles_gardees, suites_gardees):
+        """Prédictions restantes, dans l'ordre d'origine des clés et des suites"""
+        resultat = {}
+        debut = 0
+        for rang, (cle, candidats) in enumerate(self.predictions.items()):
+            fin = debut + len(candidats)
+            if cles_gardees[rang]:
+                gardes = [candidat for candidat, garde in zip(candidats, suites_gardees[debut:fin]) if garde]
+                if gardes:
+                    resultat[cle] = gardes
+            debut = fin
+        return resultat
+
+
+def _indices(cles_triees, cles):
+    """Position de chaque clé dans un tableau trié (les clés y figurent)"""
+    return np.searchsorted(cles_triees, cles).astype(np.uint64)
+
+
+def _comptes(cles_triees, comptes, cles):
+    """Compte de chaque clé, 0 si elle est absente du tableau trié"""
+    if not len(cles) or not len(cles_triees):
+        return np.zeros(len(cles), dtype=np.int64)
+    positions = np.minimum(np.searchsorted(cles_triees, cles), len(cles_triees) - 1)
+    return np.where(cles_triees[positions] == cles, comptes[positions], 0)
+
+
+def elaguer_predictions(predictions, compteur, index_mots, max_octets=None, max_contextes=None,
+                        compact=False):
+    """Raccourci : (prédictions élaguées, rapport)"""
+    return ElagueurNgrammes(predictions, compteur, index_mots, compact).elaguer(max_octets, max_contextes)
+
+
+def afficher_elagage(rapport):
+    print(f"   - Élagage: {rapport['octets_avant']:,} → {rapport['octets_apres']:,} octets, "
+          f"{rapport['contextes_avant']:,} → {rapport['contextes_apres']:,} clés, "
+          f"{rapport['suites_avant']:,} → {rapport['suites_apres']:,} suites")
+    print(f"   - Couverture du corpus: {rapport['couverture_avant']:.1%} → {rapport['couverture_apres']:.1%} "
+          f"({rapport['perte_par_mo']:.2%} perdus par Mo économisé)")
+    if not rapport['budget_respecte']:
+        print("   ⚠️ Budget d'octets non atteint")
@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+État persistant du corpus, pour les reconstructions incrémentales.
+
+À chaque sauvegarde, le pipeline écrit à côté de ses fichiers un état
+(`etat/<langue>_corpus.npz`) qui contient l'empreinte de chaque texte, le flux
+tokenisé et les comptes uni/bi/trigrammes. À l'exécution suivante, seuls les
+textes dont l'empreinte est inconnue sont tokenisés. Si les textes déjà vus
+sont tous là, dans le même ordre, les nouveaux comptes s'ajoutent aux anciens ;
+sinon (textes retirés ou déplacés), le flux est recomposé dans l'ordre des
+textes à partir du flux stocké, sans retokenisation, puis recompté. Les
+comptes, et les premières apparitions qui départagent les égalités, sont
+exactement ceux d'un recomptage complet.
+
+L'état est écrit avec `np.savez_compressed` (aucun pickle) et n'est relu que
+si sa version et le motif de tokenisation n'ont pas changé.
+"""
+
+import hashlib
+import os
+from array import array
+from collections import Counter, defaultdict
+
+import numpy as np
+
+from comptage_ngrammes import (CompteurNgrammes, _identifiants, compter_en_parallele,
+                               fusionner_corpus)
+from tokenisation import CorpusTokenise, iterer_contenus, tokeniser_corpus
+
+# 2 : premières positions recalculées après un retrait (celles des états 1
+# peuvent être obsolètes, ils sont ignorés)
+VERSION_ETAT = 2
+TAILLE_EMPREINTE = 16
+
+
+def empreinte_texte(contenu):
+    """Empreinte BLAKE2b (16 octets) du contenu d'un texte"""
+    return hashlib.blake2b(contenu.encode('utf-8'), digest_size=TAILLE_EMPREINTE).digest()
+
+
+def empreintes_au_passage(contenus, empreintes):
+    """Relaie un flux de contenus en ajoutant l'empreinte de chacun à `empreintes`.
+
+    Permet de calculer les empreintes pendant la tokenisation, sans second
+    parcours du corpus.
+    """
+    for contenu in contenus:
+        empreintes.append(empreinte_texte(contenu))
+        yield contenu
+
+
+def _reordonner(corpus, textes):
+    """Corpus formé des textes d'indices `textes` de `corpus`, dans cet ordre.
+
+    Le vocabulaire est réduit aux mots présents et renuméroté dans l'ordre de
+    première apparition : le résultat est celui d'une tokenisation de ces
+    textes, sans les retokeniser.
+    """
+    bornes = np.frombuffer(corpus.bornes, dtype=np.uint64).astype(np.int64)
+    longueurs = np.diff(bornes)[textes]
+    fins = np.cumsum(longueurs)
+    # Position dans le flux d'origine de chaque token retenu
+    positions = (np.arange(int(fins[-1]) if len(fins) else 0)
+                 + np.repeat(bornes[textes] - (fins - longueurs), longueurs))
+    ids = _identifiants(corpus)[positions]
+
+    presents, premiers = np.unique(ids, return_index=True)
+    ordre = presents[np.argsort(premiers, kind='stable')]
+    nouvel_id = np.zeros(len(corpus.vocabulaire), dtype=np.int64)
+    nouvel_id[ordre] = np.arange(len(ordre))
+
+    reordonne = CorpusTokenise()
+    type_ids = np.dtype(f"u{reordonne.ids.itemsize}")
+    reordonne.vocabulaire = [corpus.vocabulaire[ident] for ident in ordre.tolist()]
+    reordonne.index = {mot: ident for ident, mot in enumerate(reordonne.vocabulaire)}
+    reordonne.ids.frombytes(nouvel_id[ids].astype(type_ids).tobytes())
+    reordonne.bornes.frombytes(fins.astype(np.uint64).tobytes())
+    reordonne.nombre_textes = len(textes)
+    return reordonne
+
+
+class EtatCorpus:
+    """Empreintes des textes, flux tokenisé et comptes d'une exécution"""
+
+    def __init__(self, empreintes, corpus, compteur, positions_integrees=None):
+        # empreintes[k] : empreinte du k-ième texte du flux
+        self.empreintes = empreintes
+        self.corpus = corpus
+        self.compteur = compteur
+        # Nombre total de tokens intégrés depuis la première construction. Les
+        # nouveaux textes reçoivent des positions au-delà, si bien que l'ordre
+        # de première apparition des n-grammes reste celui de leur intégration.
+        if positions_integrees is None:
+            positions_integrees = corpus.total_tokens
+        self.positions_integrees = positions_integrees
+
+    def comptes_mots(self):
+        """Occurrences de chaque mot dans le corpus de cet état"""
+        return {mot: compte
+                for mot, compte in zip(self.corpus.vocabulaire, self.compteur.unigrammes.tolist())
+                if compte}
+
+    # ------------------------------------------------------------------
+    # Mise à jour incrémentale
+    # ------------------------------------------------------------------
+
+    def mettre_a_jour(self, textes, pattern_mot, workers=1):
+        """Nouvel état pour `textes` : ne compte que les textes nouveaux.
+
+        Les textes sont appariés par empreinte (en multi-ensemble : un texte
+        présent deux fois doit l'être deux fois). Renvoie le nouvel état et le
+        nombre de textes conservés, ajoutés et retirés.
+        """
+        disponibles = defaultdict(list)
+        for k in range(len(self.empreintes) - 1, -1, -1):
+            disponibles[self.empreintes[k]].append(k)
+
+        # Pour chaque texte, dans l'ordre : indice dans cet état, ou -1 s'il est nouveau
+        sources, empreintes, nouveaux = [], [], []
+        for contenu in iterer_contenus(textes):
+            empreinte = empreinte_texte(contenu)
+            empreintes.append(empreinte)
+            pile = disponibles.get(empreinte)
+            if pile:
+                sources.append(pile.pop())
+            else:
+                sources.append(-1)
+                nouveaux.append(contenu)
+
+        sources = np.array(sources, dtype=np.int64)
+        anciens = len(self.empreintes)
+        conserves = int(np.count_nonzero(sources >= 0))
+        bilan = {
+            'conserves': conserves,
+            'nouveaux': len(nouveaux),
+            'retires': anciens - conserves,
+        }
+        # Tous les anciens textes, dans le même ordre, puis les nouveaux
+        ajout_en_fin = np.array_equal(sources[:anciens], np.arange(anciens))
+        if ajout_en_fin and not nouveaux:
+            return self, bilan
+
+        if workers > 1 and len(nouveaux) > workers:
+            corpus_nouveau, compteur_nouveau = compter_en_parallele(nouveaux, pattern_mot, workers)
+        else:
+            corpus_nouveau = tokeniser_corpus(nouveaux, pattern_mot)
+            compteur_nouveau = CompteurNgrammes.depuis_corpus(corpus_nouveau)
+
+        corpus, correspondances, _ = fusionner_corpus([self.corpus, corpus_nouveau])
+        if ajout_en_fin:
+            # Les anciens comptes restent valides : les nouveaux s'y ajoutent,
+            # leurs premières positions décalées après celles déjà intégrées.
+            compteur = CompteurNgrammes.fusionner(
+                [(self.compteur, correspondances[0], 0),
+                 (compteur_nouveau, correspondances[1], self.positions_integrees)],
+                len(corpus.vocabulaire))
+            etat = EtatCorpus(empreintes, corpus, compteur,
+                              self.positions_integrees + corpus_nouveau.total_tokens)
+        else:
+            # Textes retirés ou déplacés : les premières apparitions, qui
+            # départagent les égalités, ne sont plus les mêmes. Le flux est
+            # recomposé dans l'ordre des textes (les conservés depuis le flux
+            # stocké, sans retokenisation) puis recompté.
+            sources[sources < 0] = anciens + np.arange(len(nouveaux))
+            corpus = _reordonner(corpus, sources)
+            etat = EtatCorpus(empreintes, corpus, CompteurNgrammes.depuis_corpus(corpus))
+        return etat, bilan
+
+    # ------------------------------------------------------------------
+    # Persistance
+    # ------------------------------------------------------------------
+
+    def sauvegarder(self, chemin, pattern_mot):
+        """Écrit l'état (format .npz compressé, sans pickle)"""
+        os.makedirs(os.path.dirname(chemin) or '.', exist_ok=True)
+        corpus, compteur = self.corpus, self.compteur
+        vocabulaire = '\n'.join(corpus.vocabulaire).encode('utf-8')
+        empreintes = b''.join(self.empreintes)
+        temporaire = chemin + '.tmp'
+        with open(temporaire, 'wb') as f:
+            np.savez_compressed(
+                f,
+                version=np.array(VERSION_ETAT),
+                motif=np.array(pattern_mot.pattern),
+                positions_integrees=np.array(self.positions_integrees, dtype=np.int64),
+                empreintes=np.frombuffer(empreintes, dtype=np.uint8),
+                vocabulaire=np.frombuffer(vocabulaire, dtype=np.uint8),
+                ids=_identifiants(corpus),
+                bornes=np.frombuffer(corpus.bornes, dtype=np.uint64),
+                unigrammes=compteur.unigrammes,
+                bigrammes_cles=compteur.bigrammes_cles,
+                bigrammes_comptes=compteur.bigrammes_comptes,
+                bigrammes_premiers=compteur.bigrammes_premiers,
+                trigrammes_cles=compteur.trigrammes_cles,
+                trigrammes_comptes=compteur.trigrammes_comptes,
+                trigrammes_premiers=compteur.trigrammes_premiers,
+            )
+        os.replace(temporaire, chemin)
+
+    @classmethod
+    def charger(cls, chemin, pattern_mot):
+        """Relit un état ; None s'il est absent, illisible ou obsolète"""
+        if not os.path.exists(chemin):
+            return None
+        try:
+            with np.load(chemin, allow_pickle=False) as donnees:
+                if int(donnees['version']) != VERSION_ETAT or str(donnees['motif']) != pattern_mot.pattern:
+                    return None
+
+                corpus = CorpusTokenise()
+                vocabulaire = donnees['vocabulaire'].tobytes().decode('utf-8')
+                corpus.vocabulaire = vocabulaire.split('\n') if vocabulaire else []
+                corpus.index = {mot: ident for ident, mot in enumerate(corpus.vocabulaire)}
+                corpus.ids.frombytes(donnees['ids'].astype(np.dtype(f"u{corpus.ids.itemsize}")).tobytes())
+                corpus.bornes = array('Q')
+                corpus.bornes.frombytes(donnees['bornes'].astype(np.uint64).tobytes())
+                corpus.nombre_textes = len(corpus.bornes) - 1
+
+                empreintes = donnees['empreintes'].tobytes()
+                empreintes = [empreintes[i:i + TAILLE_EMPREINTE]
+                              for i in range(0, len(empreintes), TAILLE_EMPREINTE)]
+
+                compteur = CompteurNgrammes(
+                    donnees['unigrammes'],
+                    donnees['bigrammes_cles'], donnees['bigrammes_comptes'],
+                    donnees['bigrammes_premiers'],
+                    donnees['trigrammes_cles'], donnees['trigrammes_comptes'],
+                    donnees['trigrammes_premiers'])
+                positions_integrees = int(donnees['positions_integrees'])
+        except (OSError, KeyError, ValueError) as e:
+            print(f"⚠️ État du corpus illisible ({chemin}): {e}")
+            return None
+
+        if len(empreintes) != corpus.nombre_textes:
+            return None
+        return cls(empreintes, corpus, compteur, positions_integrees)
+
+
+def fusionner_frequences(comptes, dictionnaire_actuel, anciens_comptes):
+    """Fréquences du dictionnaire par arithmétique exacte.
+
+    La fréquence stockée d'un mot se décompose en sa part issue du corpus
+    précédent (`anciens_comptes`, connue grâce à l'état) et un reste ajouté à
+    la main. Le nouveau dictionnaire vaut donc comptes actuels + reste, sans
+    facteur d'échelle estimé. Un mot déjà présent ne descend jamais sous 1.
+    Renvoie le Counter et le nombre de mots conservés hors corpus.
+    """
+    compteur_mots = Counter(comptes)
+    mots_conserves = 0
+    for mot, freq in dictionnaire_actuel.items():
+        reste = max(0, freq - anciens_comptes.get(mot, 0))
+        if mot in compteur_mots:
+            compteur_mots[mot] += reste
+        else:
+            compteur_mots[mot] = max(1, reste)
+            mots_conserves += 1
+    return compteur_mots, mots_conserves
+
+
+def remplacer_frequences(comptes, dictionnaire_actuel):
+    """Fréquences du dictionnaire sans état du corpus (première exécution,
+    `--full-rebuild`).
+
+    Le comptage du corpus REMPLACE la fréquence stockée, il ne s'y ajoute pas :
+    la valeur stockée provient déjà d'un passage sur ce même corpus, et
+    `stockée + nouvelle` gonflait le dictionnaire d'un corpus à chaque
+    exécution. Les mots absents du corpus (ajouts à la main, reliquats d'un
+    corpus antérieur) gardent leur fréquence, ramenée à l'échelle du comptage
+    frais estimée sur les mots présents des deux côtés (1 en régime établi),
+    sans descendre sous 1. Renvoie le Counter et le nombre de mots conservés
+    hors corpus.
+    """
+    compteur_mots = Counter(comptes)
+    stock_commun = sum(f for m, f in dictionnaire_actuel.items() if m in compteur_mots)
+    frais_commun = sum(compteur_mots[m] for m in dictionnaire_actuel if m in compteur_mots)
+    echelle = (frais_commun / stock_commun) if stock_commun else 1.0
+
+    mots_conserves = 0
+    for mot, freq in dictionnaire_actuel.items():
+        if mot not in compteur_mots:
+            compteur_mots[mot] = max(1, round(freq * echelle))
+            mots_conserves += 1
+    return compteur_mots, mots_conserves
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Évaluation hors ligne des prédictions sur des textes mis de côté.
+
+Le corpus est coupé en deux selon l'empreinte de chaque texte : une même
+phrase tombe toujours du même côté, d'une exécution et d'une mise à jour du
+corpus à l'autre, ce qui rend les mesures comparables entre deux builds. Le
+dictionnaire et les n-grammes sont construits sur la part d'apprentissage,
+puis les textes de test sont rejoués mot à mot comme s'ils étaient tapés :
+
+- précision top-1 / top-3 / top-5 : le mot suivant figure-t-il parmi les k
+  premières prédictions du contexte (clé à deux mots, sinon dernier mot,
+  comme `SuggestionEngine.resolveNgramContext`) ;
+- rang moyen et rang réciproque moyen du mot quand il est prédit ;
+- économie de frappes (keystroke savings rate) : avant la première lettre,
+  la barre propose les prédictions du contexte ; après chaque lettre, celles
+  qui commencent par la saisie puis les complétions du dictionnaire (formes
+  sans accents, par fréquence décroissante). Un mot proposé est choisi en
+  une frappe. Économie = 1 - frappes / lettres des mots.
+
+La barre de suggestions est ici simplifiée (pas d'usage personnel ni de
+correction orthographique) : la mesure compare deux modèles entre eux, elle
+ne prédit pas l'expérience exacte sur l'appareil.
+"""
+
+import bisect
+import hashlib
+import heapq
+import json
+import os
+
+from index_prefixes import normaliser
+from tokenisation import contenu_texte, decouper_mots
+
+PART_TEST_PAR_DEFAUT = 0.1
+# Suggestions kreyòl visibles dans la barre (3 kreyòl + 2 français en bilingue)
+SUGGESTIONS_VISIBLES = 3
+RANGS_EVALUES = (1, 3, 5)
+_ECHELLE_EMPREINTE = 1 << 32
+
+
+def est_texte_test(contenu, part_test):
+    """Vrai si le texte appartient à la part de test (décision stable)"""
+    empreinte = hashlib.blake2b(contenu.encode('utf-8'), digest_size=4).digest()
+    return int.from_bytes(empreinte, 'little') < part_test * _ECHELLE_EMPREINTE
+
+
+def separer_textes(textes, part_test=PART_TEST_PAR_DEFAUT):
+    """(apprentissage, test) : les textes vides restent côté apprentissage"""
+    apprentissage, test = [], []
+    for texte in textes:
+        contenu = contenu_texte(texte)
+        if contenu and est_texte_test(contenu, part_test):
+            test.append(texte)
+        else:
+            apprentissage.append(texte)
+    return apprentissage, test
+
+
+class EvaluateurPredictions:
+    """Rejoue des textes tokenisés face à un modèle {contexte: [{word, probability}]}"""
+
+    def __init__(self, predictions, dictionnaire, suggestions_visibles=SUGGESTIONS_VISIBLES):
+        self.predictions = {contexte: [p["word"] for p in candidats]
+                            for contexte, candidats in predictions.items()}
+        self.suggestions_visibles = suggestions_visibles
+        # Formes normalisées triées, chacune avec le rang de fréquence du mot
+        mots = sorted(dictionnaire.items(), key=lambda item: -item[1])
+        self._formes = sorted((normaliser(mot), rang, mot) for rang, (mot, _) in enumerate(mots))
+        self._cles = [forme for forme, _, _ in self._formes]
+        self._completions = {}
+
+    def candidats(self, precedent, dernier):
+        """Prédictions du contexte, avec le repli du clavier"""
+        if precedent is not None:
+            paire = self.predictions.get(f"{precedent} {dernier}")
+            if paire is not None:
+                return paire
+        return self.predictions.get(dernier, [])
+
+    def completions(self, saisie):
+        """Mots du dictionnaire commençant par la saisie (sans accents), par fréquence"""
+        forme = normaliser(saisie)
+        resultat = self._completions.get(forme)
+        if resultat is None:
+            debut = bisect.bisect_left(self._cles, forme)
+            fin = bisect.bisect_left(self._cles, forme + '\U0010ffff')
+            meilleurs = heapq.nsmallest(self.suggestions_visibles, self._formes[debut:fin],
+                                        key=lambda entree: entree[1])
+            resultat = self._completions[forme] = [mot for _, _, mot in meilleurs]
+        return resultat
+
+    def _frappes(self, mot, predits):
+        """Frappes nécessaires pour saisir `mot`, suggestions comprises"""
+        visibles = self.suggestions_visibles
+        if mot in predits[:visibles]:
+            return 1
+        for longueur in range(1, len(mot)):
+            saisie = mot[:longueur]
+            forme = normaliser(saisie)
+            barre = [p for p in predits if normaliser(p).startswith(forme)][:visibles]
+            if mot in barre:
+                return longueur + 1
+            for complet in self.completions(saisie):
+                if len(barre) >= visibles:
+                    break
+                if complet not in barre:
+                    barre.append(complet)
+            if mot in barre:
+                return longueur + 1
+        return len(mot)
+
+    def evaluer(self, textes_tokenises):
+        """Métriques sur une suite de textes, chacun donné comme liste de mots"""
+        positions = contextes_connus = 0
+        trouves = {k: 0 for k in RANGS_EVALUES}
+        somme_rangs = somme_reciproques = predits_total = 0
+        lettres = frappes = mots = 0
+
+        for texte in textes_tokenises:
+            precedent = dernier = None
+            for mot in texte:
+                predits = self.candidats(precedent, dernier) if dernier is not None else []
+                if dernier is not None:
+                    positions += 1
+                    if predits:
+                        contextes_connus += 1
+                    if mot in predits:
+                        rang = predits.index(mot) + 1
+                        predits_total += 1
+                        somme_rangs += rang
+                        somme_reciproques += 1 / rang
+                        for k in RANGS_EVALUES:
+                            if rang <= k:
+                                trouves[k] += 1
+                mots += 1
+                lettres += len(mot)
+                frappes += self._frappes(mot, predits)
+                precedent, dernier = dernier, mot
+
+        resultat = {
+            "mots": mots,
+            "positions": positions,
+            "couverture": round(contextes_connus / positions, 4) if positions else 0.0,
+        }
+        for k in RANGS_EVALUES:
+            resultat[f"top{k}"] = round(trouves[k] / positions, 4) if positions else 0.0
+        resultat["rang_moyen"] = round(somme_rangs / predits_total, 3) if predits_total else None
+        resultat["rang_reciproque_moyen"] = round(somme_reciproques / positions, 4) if positions else 0.0
+        resultat["economie_frappes"] = round(1 - frappes / lettres, 4) if lettres else 0.0
+        return resultat
+
+
+def tokeniser_textes_test(textes, pattern_mot):
+    """Listes de mots des textes, tokenisés comme le corpus d'apprentissage"""
+    resultat = []
+    for texte in textes:
+        contenu = contenu_texte(texte)
+        if contenu:
+            mots = decouper_mots(contenu, pattern_mot)
+            if mots:
+                resultat.append(mots)
+    return resultat
+
+
+def afficher_evaluation(resultat):
+    print(f"   - Mots rejoués: {resultat['mots']:,} ({resultat['positions']:,} positions avec contexte)")
+    print(f"   - Couverture des contextes: {resultat['couverture']:.1%}")
+    print(f"   - Précision top-1 / top-3 / top-5: {resultat['top1']:.1%} / "
+          f"{resultat['top3']:.1%} / {resultat['top5']:.1%}")
+    if resultat['rang_moyen'] is not None:
+        print(f"   - Rang moyen quand prédit: {resultat['rang_moyen']:.2f} "
+              f"(rang réciproque moyen {resultat['rang_reciproque_moyen']:.3f})")
+    print(f"   - Économie de frappes: {resultat['economie_frappes']:.1%}")
+
+
+def ecrire_evaluation(resultat, chemin):
+    """Écrit le rapport d'évaluation (remplacement atomique)"""
+    os.makedirs(os.path.dirname(chemin) or '.', exist_ok=True)
+    temporaire = chemin + '.tmp'
+    with open(temporaire, 'w', encoding='utf-8') as f:
+        json.dump(resultat, f, ensure_ascii=False, indent=2)
+    os.replace(temporaire, chemin)
@@ -0,0 +1,435 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Index de correction orthographique par suppressions symétriques (SymSpell).
+
+Sur l'appareil, une saisie d'au moins 3 lettres sans aucune complétion
+déclenche `getSpellCorrectionSuggestions` : une distance de Levenshtein
+contre chaque mot du dictionnaire, sur les formes sans accents, puis une
+seconde fois sur les mots tels quels. Le fichier `<langue>_corrections.bin`
+précalcule le travail côté dictionnaire.
+
+Deux chaînes à distance d ≤ 2 ont toujours une chaîne commune obtenue en
+supprimant au plus d caractères de chacune. Chaque forme normalisée du
+dictionnaire est donc indexée sous toutes ses variantes à 0, 1 ou 2
+suppressions ; une correction génère les variantes de la saisie, lit leur
+alvéole (table de hachage, empreinte FNV-1a) et ne calcule la distance que
+pour les quelques formes qui s'y trouvent.
+
+    en-tête      44 octets : magie b"KSC1", version, distance maximale,
+                 nombres de mots et de formes, bits d'alvéoles, largeur
+                 des entrées (2 ou 4 octets), nombres d'entrées et de mots
+                 spéciaux, tailles des deux blocs de texte
+    frequences   uint32[mots]          (mots par fréquence décroissante)
+    offsets_mots uint32[mots + 1]
+    debuts_f     uint32[formes + 1]    mots de chaque forme dans `mots_f`
+    mots_f       uint32[mots]          rangs, croissants au sein d'une forme
+    offsets_f    uint32[formes + 1]
+    alveoles     uint32[2^bits + 1]    formes de chaque alvéole dans `entrees`
+    speciaux     uint32[speciaux]      rangs des mots dont la forme change
+                                       de longueur (ß → ss)
+    entrees      uint16 ou uint32[entrees]  identifiants de formes
+    texte        mots puis formes, en UTF-8
+
+Les variantes elles-mêmes ne sont pas stockées : une alvéole regroupe
+plusieurs variantes, et la distance est toujours recalculée, donc une
+collision n'ajoute qu'un candidat. Les résultats sont ceux du parcours
+linéaire du clavier, ordre compris (distance, puis fréquence décroissante,
+puis ordre du dictionnaire).
+"""
+
+import mmap
+import os
+import struct
+
+import numpy as np
+
+from ecriture_assets import chemin_evaluation
+from index_prefixes import classer_mots, normaliser
+
+MAGIE = b"KSC1"
+VERSION_FORMAT = 1
+EN_TETE = struct.Struct("<4sHHIIIIIIII")
+DISTANCE_MAX = 2
+# maxResults de getSpellCorrectionSuggestions (MAX_SUGGESTIONS du moteur)
+LIMITE_PAR_DEFAUT = 5
+FNV_BASE = 2166136261
+FNV_PREMIER = 16777619
+# Une alvéole pour deux variantes distinctes en moyenne
+VARIANTES_PAR_ALVEOLE = 2
+
+
+def chemin_index_corrections(chemin_dict):
+    """Chemin de l'index de corrections correspondant à un dictionnaire JSON
+    (hors de l'APK, cf. `ecriture_assets.DOSSIER_EVALUATION`)"""
+    base = chemin_evaluation(chemin_dict, "")
+    if base.endswith("_dict"):
+        base = base[:-len("_dict")]
+    return base + "_corrections.bin"
+
+
+def distance_levenshtein(s1, s2, borne=None):
+    """Distance d'édition, comparaison insensible à la casse (LevenshteinDistance.calculate).
+
+    Avec `borne`, renvoie borne + 1 dès que la distance la dépasse
+    forcément : seules les distances ≤ borne sont alors exactes.
+    """
+    if not s1:
+        return len(s2)
+    if not s2:
+        return len(s1)
+    if borne is not None and abs(len(s1) - len(s2)) > borne:
+        return borne + 1
+    s1, s2 = s1.lower(), s2.lower()
+    precedente = list(range(len(s2) + 1))
+    for i, c1 in enumerate(s1, 1):
+        courante = [i]
+        for j, c2 in enumerate(s2, 1):
+            courante.append(min(precedente[j] + 1, courante[j - 1] + 1,
+                                precedente[j - 1] + (c1 != c2)))
+        if borne is not None and min(courante) > borne:
+            return borne + 1
+        precedente = courante
+    return precedente[-1]
+
+
+def corrections_reference(saisie, mots, formes=None, distance_max=DISTANCE_MAX,
+                          limite=LIMITE_PAR_DEFAUT):
+    """Parcours linéaire de `findClosestMatches(Normalized)` : [(mot, fréquence,
+    distance)] par distance puis fréquence décroissante. Avec `formes`, la
+    saisie doit être déjà normalisée."""
+    trouves = []
+    for (mot, frequence), forme in zip(mots, formes if formes is not None else (m for m, _ in mots)):
+        if abs(len(forme) - len(saisie)) <= 2:
+            distance = distance_levenshtein(saisie, forme, distance_max)
+            if distance <= distance_max:
+                trouves.append((mot, frequence, distance))
+    trouves.sort(key=lambda t: (t[2], -t[1]))
+    return trouves[:limite]
+
+
+def variantes_suppression(forme, distance_max=DISTANCE_MAX):
+    """La forme et toutes ses variantes à au plus `distance_max` suppressions"""
+    variantes = {forme}
+    courantes = {forme}
+    for _ in range(distance_max):
+        suivantes = set()
+        for chaine in courantes:
+            for i in range(len(chaine)):
+                suivantes.add(chaine[:i] + chaine[i + 1:])
+        variantes |= suivantes
+        courantes = suivantes
+    return variantes
+
+
+def empreintes(chaines):
+    """Empreintes FNV-1a 32 bits des chaînes (UTF-8), calculées colonne par colonne"""
+    encodees = [c.encode('utf-8') for c in chaines]
+    longueurs = np.fromiter(map(len, encodees), dtype=np.int64, count=len(encodees))
+    resultat = np.full(len(encodees), FNV_BASE, dtype=np.uint32)
+    if not len(encodees):
+        return resultat
+    bloc = np.frombuffer(b"".join(encodees), dtype=np.uint8)
+    debuts = np.cumsum(longueurs) - longueurs
+    # Colonne j : le j-ième octet des chaînes assez longues, lu dans le bloc
+    actifs = np.flatnonzero(longueurs)
+    j = 0
+    while len(actifs):
+        octets = bloc[debuts[actifs] + j].astype(np.uint32)
+        resultat[actifs] = (resultat[actifs] ^ octets) * np.uint32(FNV_PREMIER)
+        j += 1
+        actifs = actifs[longueurs[actifs] > j]
+    return resultat
+
+
+def _offsets(chaines_encodees):
+    offsets = np.zeros(len(chaines_encodees) + 1, dtype='<u4')
+    np.cumsum([len(c) for c in chaines_encodees], out=offsets[1:])
+    return offsets
+
+
+def encoder_index(dictionnaire, distance_max=DISTANCE_MAX):
+    """Sérialise l'index de corrections de `dictionnaire` ({mot: freq} ou paires)"""
+    mots = classer_mots(dictionnaire)
+    formes_mots = [normaliser(mot) for mot, _ in mots]
+
+    # Formes distinctes, numérotées par premier mot (le plus fréquent)
+    identifiants = {}
+    for forme in formes_mots:
+        identifiants.setdefault(forme, len(identifiants))
+    formes = list(identifiants)
+    groupes = [[] for _ in formes]
+    for rang, forme in enumerate(formes_mots):
+        groupes[identifiants[forme]].append(rang)
+    debuts_formes = np.zeros(len(formes) + 1, dtype='<u4')
+    np.cumsum([len(g) for g in groupes], out=debuts_formes[1:])
+
+    chaines, proprietaires = [], []
+    for ident, forme in enumerate(formes):
+        variantes = variantes_suppression(forme, distance_max)
+        chaines.extend(variantes)
+        proprietaires.extend([ident] * len(variantes))
+    cles = empreintes(chaines)
+    distinctes = len(np.unique(cles))
+    bits = max(1, (distinctes // VARIANTES_PAR_ALVEOLE).bit_length())
+    alveoles = (cles & np.uint32((1 << bits) - 1)).astype(np.uint64)
+    # Paires (alvéole, forme) distinctes, triées
+    paires = np.unique((alveoles << np.uint64(32)) | np.array(proprietaires, dtype=np.uint64))
+    debuts_alveoles = np.searchsorted(paires >> np.uint64(32),
+                                      np.arange((1 << bits) + 1, dtype=np.uint64))
+    largeur = 2 if len(formes) <= 0xFFFF else 4
+    entrees = (paires & np.uint64(0xFFFFFFFF)).astype(f'<u{largeur}')
+
+    speciaux = [rang for rang, (mot, _) in enumerate(mots) if len(formes_mots[rang]) != len(mot)]
+
+    mots_encodes = [mot.encode('utf-8') for mot, _ in mots]
+    formes_encodees = [forme.encode('utf-8') for forme in formes]
+    texte_mots = b"".join(mots_encodes)
+    texte_formes = b"".join(formes_encodees)
+    en_tete = EN_TETE.pack(MAGIE, VERSION_FORMAT, distance_max, len(mots), len(formes),
+                           bits, largeur, len(entrees), len(speciaux),
+                           len(texte_mots), len(texte_formes))
+    return b"".join([
+        en_tete,
+        np.array([freq for _, freq in mots], dtype='<u4').tobytes(),
+        _offsets(mots_encodes).tobytes(),
+        debuts_formes.tobytes(),
+        np.array([r for g in groupes for r in g], dtype='<u4').tobytes(),
+        _offsets(formes_encodees).tobytes(),
+        debuts_alveoles.astype('<u4').tobytes(),
+        np.array(speciaux, dtype='<u4').tobytes(),
+        entrees.tobytes(),
+        texte_mots,
+        texte_formes,
+    ])
+
+
+def ecrire_index_corrections(dictionnaire, chemin, distance_max=DISTANCE_MAX):
+    """Écrit l'index (remplacement atomique) ; renvoie sa taille"""
+    donnees = encoder_index(dictionnaire, distance_max)
+    os.makedirs(os.path.dirname(chemin) or '.', exist_ok=True)
+    temporaire = chemin + '.tmp'
+    with open(temporaire, 'wb') as f:
+        f.write(donnees)
+    os.replace(temporaire, chemin)
+    return len(donnees)
+
+
+class IndexCorrections:
+    """Interrogation d'un index `_corrections.bin` projeté en mémoire"""
+
+    def __init__(self, chemin):
+        with open(chemin, 'rb') as f:
+            self._carte = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magie, version, self.distance_max, self.nombre_mots, nombre_formes, bits, largeur, \
+            nombre_entrees, nombre_speciaux, taille_mots, taille_formes = \
+            EN_TETE.unpack_from(self._carte, 0)
+        if magie != MAGIE or version != VERSION_FORMAT:
+            self.fermer()
+            raise ValueError(f"Index de corrections invalide: {chemin}")
+
+        self._position = EN_TETE.size
+        n = self.nombre_mots
+        self._frequences = self._tableau(n)
+        self._offsets_mots = self._tableau(n + 1)
+        self._debuts_formes = self._tableau(nombre_formes + 1)
+        self._mots_formes = self._tableau(n)
+        self._offsets_formes = self._tableau(nombre_formes + 1)
+        self._masque = (1 << bits) - 1
+        self._alveoles = self._tableau((1 << bits) + 1)
+        self._speciaux = self._tableau(nombre_speciaux)
+        self._entrees = self._tableau(nombre_entrees, f'<u{largeur}')
+        self._texte_mots = self._position
+        self._texte_formes = self._position + taille_mots
+        if self._texte_formes + taille_formes != len(self._carte):
+            self.fermer()
+            raise ValueError(f"Index de corrections tronqué: {chemin}")
+
+    def _tableau(self, nombre, type_='<u4'):
+        tableau = np.frombuffer(self._carte, dtype=type_, count=nombre, offset=self._position)
+        self._position += tableau.nbytes
+        return tableau
+
+    def fermer(self):
+        # Les vues numpy retiennent le mmap : on les libère avant de le fermer
+        self._frequences = self._offsets_mots = self._debuts_formes = None
+        self._mots_formes = self._offsets_formes = None
+        self._alveoles = self._entrees = self._speciaux = None
+        self._carte.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fermer()
+        return False
+
+    def __len__(self):
+        return self.nombre_mots
+
+    def mot(self, rang):
+        """(mot, fréquence) de rang donné"""
+        debut = self._texte_mots + int(self._offsets_mots[rang])
+        fin = self._texte_mots + int(self._offsets_mots[rang + 1])
+        return self._carte[debut:fin].decode('utf-8'), int(self._frequences[rang])
+
+    def forme(self, ident):
+        debut = self._texte_formes + int(self._offsets_formes[ident])
+        fin = self._texte_formes + int(self._offsets_formes[ident + 1])
+        return self._carte[debut:fin].decode('utf-8')
+
+    def formes_candidates(self, forme):
+        """Identifiants des formes partageant une variante avec `forme`"""
+        alveoles = empreintes(variantes_suppression(forme, self.distance_max)) & self._masque
+        identifiants = set()
+        for alveole in np.unique(alveoles).tolist():
+            debut, fin = int(self._alveoles[alveole]), int(self._alveoles[alveole + 1])
+            identifiants.update(self._entrees[debut:fin].tolist())
+        return identifiants
+
+    def _trier(self, trouves, limite):
+        """(rang, distance) → [(mot, fréquence, distance)] dans l'ordre du clavier"""
+        trouves.sort(key=lambda t: (t[1], t[0]))
+        return [(*self.mot(rang), distance) for rang, distance in trouves[:limite]]
+
+    def corriger(self, saisie, limite=LIMITE_PAR_DEFAUT):
+        """Corrections de `saisie` comme `getSpellCorrectionSuggestions` :
+        formes sans accents d'abord, mots tels quels si rien n'est trouvé"""
+        entree = normaliser(saisie)
+        trouves = []
+        for ident in self.formes_candidates(entree):
+            distance = distance_levenshtein(entree, self.forme(ident), self.distance_max)
+            if distance <= self.distance_max:
+                debut, fin = int(self._debuts_formes[ident]), int(self._debuts_formes[ident + 1])
+                trouves.extend((rang, distance) for rang in self._mots_formes[debut:fin].tolist())
+        if trouves:
+            return self._trier(trouves, limite)
+
+        # Passe directe : elle ne peut trouver mieux que la passe normalisée
+        # que si une lettre change de longueur en se normalisant (ß → ss)
+        if len(entree) != len(saisie):
+            rangs = range(self.nombre_mots)
+        else:
+            rangs = self._speciaux.tolist()
+        for rang in rangs:
+            mot, _ = self.mot(rang)
+            if abs(len(mot) - len(saisie)) <= 2:
+                distance = distance_levenshtein(saisie, mot, self.distance_max)
+                if distance <= self.distance_max:
+                    trouves.append((rang, distance))
+        return self._trier(trouves, limite)
+
+
+def saisies_de_test(dictionnaire, nombre=30):
+    """Fautes de frappe déterministes (suppression, substitution, insertion,
+    accent retiré) sur des mots répartis dans tout le dictionnaire"""
+    mots = [mot for mot, _ in classer_mots(dictionnaire) if len(mot) >= 4]
+    if not mots:
+        return []
+    pas = max(1, len(mots) // nombre)
+    saisies = []
+    for i, mot in enumerate(mots[::pas][:nombre]):
+        milieu = len(mot) // 2
+        saisies.append([
+            mot[:milieu] + mot[milieu + 1:],
+            mot[:milieu] + 'x' + mot[milieu + 1:],
+            mot[:milieu] + 'q' + mot[milieu:] + 'z',
+            normaliser(mot) + 'k',
+        ][i % 4])
+    return saisies
+
+
+def valider_index_corrections(chemin, dictionnaire, saisies=None):
+    """Compare l'index au parcours linéaire du clavier sur des fautes de
+    frappe typiques. Renvoie les saisies en écart."""
+    mots = classer_mots(dictionnaire)
+    formes = [normaliser(mot) for mot, _ in mots]
+    saisies = saisies if saisies is not None else saisies_de_test(dictionnaire)
+    ecarts = []
+    with IndexCorrections(chemin) as index:
+        for saisie in saisies:
+            attendu = corrections_reference(normaliser(saisie), mots, formes) or \
+                corrections_reference(saisie, mots)
+            if index.corriger(saisie) != attendu:
+                ecarts.append(saisie)
+    return ecarts
+
+
+def mesurer_latence(chemin_dict):
+    """Latence moyenne d'une correction : index contre parcours linéaire"""
+    import json
+    import tempfile
+    import time
+
+    with open(chemin_dict, 'r', encoding='utf-8') as f:
+        dictionnaire = json.load(f)
+    mots = classer_mots(dictionnaire)
+    formes = [normaliser(mot) for mot, _ in mots]
+    saisies = saisies_de_test(dictionnaire)
+
+    with tempfile.TemporaryDirectory() as dossier:
+        chemin = os.path.join(dossier, "corrections.bin")
+        debut = time.perf_counter()
+        taille = ecrire_index_corrections(dictionnaire, chemin)
+        construction = time.perf_counter() - debut
+        with IndexCorrections(chemin) as index:
+            debut = time.perf_counter()
+            for saisie in saisies:
+                index.corriger(saisie)
+            temps_index = (time.perf_counter() - debut) / len(saisies)
+        ecarts = valider_index_corrections(chemin, dictionnaire, saisies)
+
+    debut = time.perf_counter()
+    for saisie in saisies:
+        corrections_reference(normaliser(saisie), mots, formes) or corrections_reference(saisie, mots)
+    temps_lineaire = (time.perf_counter() - debut) / len(saisies)
+
+    return {
+        'mots': len(mots),
+        'saisies': len(saisies),
+        'index_octets': taille,
+        'dict_octets': os.path.getsize(chemin_dict),
+        'construction_s': construction,
+        'index_us': temps_index * 1e6,
+        'lineaire_us': temps_lineaire * 1e6,
+        'ecarts': ecarts,
+    }
+
+
+def main():
+    import sys
+
+    if len(sys.argv) < 2:
+        print("Usage: python index_corrections.py <dict.json> [saisie ...]")
+        return 1
+    chemin_dict = sys.argv[1]
+    if len(sys.argv) > 2:
+        import json
+        import tempfile
+
+        with open(chemin_dict, 'r', encoding='utf-8') as f:
+            dictionnaire = json.load(f)
+        with tempfile.TemporaryDirectory() as dossier:
+            chemin = os.path.join(dossier, "corrections.bin")
+            ecrire_index_corrections(dictionnaire, chemin)
+            with IndexCorrections(chemin) as index:
+                for saisie in sys.argv[2:]:
+                    corrections = ", ".join(f"{mot} ({distance})" for mot, _, distance in index.corriger(saisie))
+                    print(f"🔧 {saisie}: {corrections or '-'}")
+        return 0
+
+    mesures = mesurer_latence(chemin_dict)
+    print(f"📊 {mesures['mots']:,} mots, {mesures['saisies']} fautes de frappe")
+    print(f"   Index : {mesures['index_octets']:,} octets (dictionnaire JSON: {mesures['dict_octets']:,}), "
+          f"construit en {mesures['construction_s']:.2f} s")
+    print(f"   Correction : {mesures['index_us']:.0f} µs avec l'index, "
+          f"{mesures['lineaire_us']:.0f} µs en parcours linéaire")
+    if mesures['ecarts']:
+        print(f"❌ {len(mesures['ecarts'])} écarts, ex.: {mesures['ecarts'][:5]}")
+        return 1
+    print("✅ Corrections identiques au parcours linéaire")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
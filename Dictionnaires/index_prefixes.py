@@ -0,0 +1,366 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Index de préfixes du dictionnaire, exporté en évaluation (hors de l'APK,
+cf. `ecriture_assets.DOSSIER_EVALUATION`).
+
+Sur l'appareil, `getDictionarySuggestions` parcourt tout le dictionnaire à
+chaque frappe pour trouver les `CANDIDATE_POOL_SIZE` mots les plus fréquents
+dont la forme normalisée (sans accents) commence par la saisie. Le fichier
+`<langue>_prefixes.bin` précalcule cette réponse :
+
+- les mots, rangés par fréquence décroissante (l'identifiant d'un mot est son
+  rang, comme dans la liste `dictionary` du clavier) ;
+- le tableau trié de leurs formes normalisées, où les mots d'un préfixe donné
+  occupent une plage contiguë ;
+- un trie réduit aux préfixes couvrant plus de K mots, dont chaque nœud porte
+  sa plage et ses K meilleurs mots. Ses fils sont contigus et triés par
+  caractère : une saisie se résout en O(longueur du préfixe).
+
+Quand la saisie dépasse le trie, la plage restante compte au plus K mots :
+il suffit de la filtrer puis de la trier par rang.
+
+    en-tête      28 octets : magie b"KPX1", version, K, nombres de mots, de
+                 nœuds et d'entrées top-K, tailles des deux blocs de texte
+    frequences   uint32[mots]
+    offsets_mots uint32[mots + 1]     (mots, dans l'ordre des rangs)
+    ordre        uint32[mots]         rang du mot à chaque position triée
+    offsets_f    uint32[mots + 1]     (formes normalisées, dans l'ordre trié)
+    noeuds       uint32[noeuds][6] : caractère, premier fils, nombre de fils,
+                 début et fin de plage, début du top-K (0xFFFFFFFF si aucun)
+    top_k        uint32[entrées]      rangs, croissants
+    texte        mots puis formes, en UTF-8
+
+Les formes sont triées par points de code, ce qui coïncide avec l'ordre des
+`String` Kotlin pour les caractères du plan multilingue de base.
+"""
+
+import bisect
+import mmap
+import os
+import struct
+
+import numpy as np
+
+from ecriture_assets import chemin_evaluation
+
+MAGIE = b"KPX1"
+VERSION_FORMAT = 1
+EN_TETE = struct.Struct("<4sHHIIIII")
+CHAMPS_NOEUD = 6
+SANS_TOP_K = 0xFFFFFFFF
+# CANDIDATE_POOL_SIZE de SuggestionEngine : taille du vivier de candidats
+TAILLE_TOP_K = 40
+
+# Même table que AccentTolerantMatcher.normalize (clavier Android)
+_ACCENTS = {}
+for _lettres, _base in (("àáâäãåāăą", 'a'), ("èéêëēėęě", 'e'), ("ìíîïīįĩ", 'i'),
+                        ("òóôöõøōőœ", 'o'), ("ùúûüūůũűų", 'u'), ("ýÿŷ", 'y'),
+                        ("ç", 'c'), ("ñ", 'n'), ("ß", 'ss')):
+    for _lettre in _lettres:
+        _ACCENTS[_lettre] = _base
+
+
+def normaliser(texte):
+    """Forme sans accents, en minuscules (miroir de AccentTolerantMatcher)"""
+    return ''.join(_ACCENTS.get(c, c) for c in texte.lower())
+
+
+def chemin_index(chemin_dict):
+    """Chemin de l'index correspondant à un dictionnaire JSON"""
+    base = chemin_evaluation(chemin_dict, "")
+    if base.endswith("_dict"):
+        base = base[:-len("_dict")]
+    return base + "_prefixes.bin"
+
+
+def classer_mots(dictionnaire):
+    """[(mot, fréquence)] par fréquence décroissante, à égalité dans l'ordre
+    du fichier (tri stable, comme `sortedByDescending` côté clavier)"""
+    paires = dictionnaire.items() if isinstance(dictionnaire, dict) else dictionnaire
+    return sorted(((mot, int(freq)) for mot, freq in paires), key=lambda p: -p[1])
+
+
+def encoder_index(dictionnaire, k=TAILLE_TOP_K):
+    """Sérialise l'index de préfixes de `dictionnaire` ({mot: freq} ou paires)"""
+    mots = classer_mots(dictionnaire)
+    formes = [normaliser(mot) for mot, _ in mots]
+    ordre = sorted(range(len(mots)), key=lambda i: (formes[i], i))
+    formes_triees = [formes[i] for i in ordre]
+    rangs = np.array(ordre, dtype=np.int64)
+
+    # Parcours en largeur : les fils d'un nœud sont créés ensemble, contigus
+    noeuds = [[0, 0, 0, 0, len(mots), SANS_TOP_K]]
+    profondeurs = [0]
+    top_k = []
+    i = 0
+    while i < len(noeuds):
+        noeud = noeuds[i]
+        debut, fin = noeud[3], noeud[4]
+        if fin - debut > k:
+            noeud[5] = len(top_k)
+            top_k.extend(np.sort(rangs[debut:fin])[:k].tolist())
+            profondeur = profondeurs[i]
+            noeud[1] = len(noeuds)
+            position = debut
+            # Les formes qui s'arrêtent à cette profondeur sont en tête de plage
+            while position < fin and len(formes_triees[position]) == profondeur:
+                position += 1
+            while position < fin:
+                caractere = formes_triees[position][profondeur]
+                suivant = position
+                while suivant < fin and formes_triees[suivant][profondeur] == caractere:
+                    suivant += 1
+                noeuds.append([ord(caractere), 0, 0, position, suivant, SANS_TOP_K])
+                profondeurs.append(profondeur + 1)
+                position = suivant
+            noeud[2] = len(noeuds) - noeud[1]
+        i += 1
+
+    mots_encodes = [mot.encode('utf-8') for mot, _ in mots]
+    formes_encodees = [forme.encode('utf-8') for forme in formes_triees]
+    texte_mots = b"".join(mots_encodes)
+    texte_formes = b"".join(formes_encodees)
+
+    en_tete = EN_TETE.pack(MAGIE, VERSION_FORMAT, k, len(mots), len(noeuds), len(top_k),
+                           len(texte_mots), len(texte_formes))
+    return b"".join([
+        en_tete,
+        np.array([freq for _, freq in mots], dtype='<u4').tobytes(),
+        _offsets(mots_encodes).tobytes(),
+        np.array(ordre, dtype='<u4').tobytes(),
+        _offsets(formes_encodees).tobytes(),
+        np.array(noeuds, dtype='<u4').reshape(-1, CHAMPS_NOEUD).tobytes(),
+        np.array(top_k, dtype='<u4').tobytes(),
+        texte_mots,
+        texte_formes,
+    ])
+
+
+def _offsets(chaines_encodees):
+    offsets = np.zeros(len(chaines_encodees) + 1, dtype='<u4')
+    np.cumsum([len(c) for c in chaines_encodees], out=offsets[1:])
+    return offsets
+
+
+def ecrire_index_prefixes(dictionnaire, chemin, k=TAILLE_TOP_K):
+    """Écrit l'index (remplacement atomique) ; renvoie sa taille"""
+    donnees = encoder_index(dictionnaire, k)
+    os.makedirs(os.path.dirname(chemin) or '.', exist_ok=True)
+    temporaire = chemin + '.tmp'
+    with open(temporaire, 'wb') as f:
+        f.write(donnees)
+    os.replace(temporaire, chemin)
+    return len(donnees)
+
+
+class IndexPrefixes:
+    """Interrogation d'un index `.bin` projeté en mémoire"""
+
+    def __init__(self, chemin):
+        with open(chemin, 'rb') as f:
+            self._carte = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magie, version, self.k, self.nombre_mots, nombre_noeuds, nombre_top_k, \
+            taille_mots, taille_formes = EN_TETE.unpack_from(self._carte, 0)
+        if magie != MAGIE or version != VERSION_FORMAT:
+            self.fermer()
+            raise ValueError(f"Index de préfixes invalide: {chemin}")
+
+        self._position = EN_TETE.size
+        n = self.nombre_mots
+        self._frequences = self._tableau(n)
+        self._offsets_mots = self._tableau(n + 1)
+        self._ordre = self._tableau(n)
+        self._offsets_formes = self._tableau(n + 1)
+        self._noeuds = self._tableau(nombre_noeuds * CHAMPS_NOEUD).reshape(-1, CHAMPS_NOEUD)
+        self._top_k = self._tableau(nombre_top_k)
+        self._texte_mots = self._position
+        self._texte_formes = self._position + taille_mots
+        if self._texte_formes + taille_formes != len(self._carte):
+            self.fermer()
+            raise ValueError(f"Index de préfixes tronqué: {chemin}")
+
+    def _tableau(self, nombre):
+        tableau = np.frombuffer(self._carte, dtype='<u4', count=nombre, offset=self._position)
+        self._position += tableau.nbytes
+        return tableau
+
+    def fermer(self):
+        # Les vues numpy retiennent le mmap : on les libère avant de le fermer
+        self._frequences = self._offsets_mots = self._ordre = None
+        self._offsets_formes = self._noeuds = self._top_k = None
+        self._carte.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fermer()
+        return False
+
+    def __len__(self):
+        return self.nombre_mots
+
+    def mot(self, rang):
+        """(mot, fréquence) de rang donné"""
+        debut = self._texte_mots + int(self._offsets_mots[rang])
+        fin = self._texte_mots + int(self._offsets_mots[rang + 1])
+        return self._carte[debut:fin].decode('utf-8'), int(self._frequences[rang])
+
+    def forme(self, position):
+        """Forme normalisée à une position du tableau trié"""
+        debut = self._texte_formes + int(self._offsets_formes[position])
+        fin = self._texte_formes + int(self._offsets_formes[position + 1])
+        return self._carte[debut:fin].decode('utf-8')
+
+    def _enfant(self, noeud, caractere):
+        premier, nombre = int(self._noeuds[noeud, 1]), int(self._noeuds[noeud, 2])
+        caracteres = self._noeuds[premier:premier + nombre, 0]
+        j = int(np.searchsorted(caracteres, caractere))
+        if j < nombre and caracteres[j] == caractere:
+            return premier + j
+        return -1
+
+    def rangs(self, prefixe):
+        """Rangs des K meilleurs mots commençant par `prefixe` (normalisé)"""
+        noeud = 0
+        for profondeur, caractere in enumerate(prefixe):
+            if not self._noeuds[noeud, 2]:
+                # Sous le trie : au plus K formes, filtrées directement
+                debut, fin = int(self._noeuds[noeud, 3]), int(self._noeuds[noeud, 4])
+                positions = [p for p in range(debut, fin) if self.forme(p).startswith(prefixe)]
+                return sorted(int(self._ordre[p]) for p in positions)
+            noeud = self._enfant(noeud, ord(caractere))
+            if noeud < 0:
+                return []
+        debut, fin, top_k = (int(v) for v in self._noeuds[noeud, 3:6])
+        if top_k != SANS_TOP_K:
+            return self._top_k[top_k:top_k + self.k].tolist()
+        return sorted(self._ordre[debut:fin].tolist())
+
+    def completer(self, saisie, limite=None):
+        """[(mot, fréquence)] des meilleurs mots commençant par `saisie`,
+        sans tenir compte des accents ; `limite` ≤ K"""
+        rangs = self.rangs(normaliser(saisie))
+        return [self.mot(r) for r in rangs[:limite or self.k]]
+
+    def plage(self, saisie):
+        """(début, fin) des formes triées commençant par `saisie`"""
+        prefixe = normaliser(saisie)
+        formes = _VueFormes(self)
+        debut = bisect.bisect_left(formes, prefixe)
+        fin = bisect.bisect_left(formes, prefixe + '\U0010FFFF', debut)
+        return debut, fin
+
+
+class _VueFormes:
+    """Séquence des formes triées, pour `bisect`"""
+
+    def __init__(self, index):
+        self.index = index
+
+    def __len__(self):
+        return self.index.nombre_mots
+
+    def __getitem__(self, position):
+        return self.index.forme(position)
+
+
+def completions_reference(dictionnaire, prefixes, k=TAILLE_TOP_K):
+    """Réponses attendues pour `prefixes`, calculées comme le parcours
+    linéaire du clavier (premiers mots par fréquence dont la forme convient)"""
+    attendus = {prefixe: [] for prefixe in prefixes}
+    longueurs = sorted({len(p) for p in prefixes})
+    for mot, freq in classer_mots(dictionnaire):
+        forme = normaliser(mot)
+        for longueur in longueurs:
+            liste = attendus.get(forme[:longueur]) if len(forme) >= longueur else None
+            if liste is not None and len(liste) < k:
+                liste.append((mot, freq))
+    return attendus
+
+
+def valider_index_prefixes(chemin, dictionnaire, longueur_max=3):
+    """Compare l'index au parcours linéaire pour tous les préfixes de 1 à
+    `longueur_max` caractères. Renvoie les préfixes en écart."""
+    with IndexPrefixes(chemin) as index:
+        formes = {normaliser(mot) for mot, _ in classer_mots(dictionnaire)}
+        prefixes = {f[:n] for f in formes for n in range(1, longueur_max + 1) if len(f) >= n}
+        attendus = completions_reference(dictionnaire, prefixes, index.k)
+        return sorted(p for p in prefixes if index.completer(p) != attendus[p])
+
+
+def mesurer_latence(chemin_dict, repetitions=3):
+    """Latence moyenne de complétion : index contre parcours linéaire"""
+    import json
+    import tempfile
+    import time
+
+    with open(chemin_dict, 'r', encoding='utf-8') as f:
+        dictionnaire = json.load(f)
+    mots = classer_mots(dictionnaire)
+    formes = [normaliser(mot) for mot, _ in mots]
+    prefixes = sorted({f[:n] for f in formes for n in (1, 2, 3) if len(f) >= n})
+
+    with tempfile.TemporaryDirectory() as dossier:
+        chemin = os.path.join(dossier, "prefixes.bin")
+        taille = ecrire_index_prefixes(dictionnaire, chemin)
+        with IndexPrefixes(chemin) as index:
+            debut = time.perf_counter()
+            for _ in range(repetitions):
+                for prefixe in prefixes:
+                    index.completer(prefixe)
+            temps_index = (time.perf_counter() - debut) / (repetitions * len(prefixes))
+
+    debut = time.perf_counter()
+    for prefixe in prefixes:
+        trouves = []
+        for i, forme in enumerate(formes):
+            if forme.startswith(prefixe):
+                trouves.append(mots[i])
+                if len(trouves) >= TAILLE_TOP_K:
+                    break
+    temps_lineaire = (time.perf_counter() - debut) / len(prefixes)
+
+    return {
+        'mots': len(mots),
+        'prefixes': len(prefixes),
+        'index_octets': taille,
+        'dict_octets': os.path.getsize(chemin_dict),
+        'index_us': temps_index * 1e6,
+        'lineaire_us': temps_lineaire * 1e6,
+    }
+
+
+def main():
+    import sys
+
+    if len(sys.argv) < 2:
+        print("Usage: python index_prefixes.py <dict.json> [saisie ...]")
+        return 1
+    chemin_dict = sys.argv[1]
+    if len(sys.argv) > 2:
+        import json
+        import tempfile
+
+        with open(chemin_dict, 'r', encoding='utf-8') as f:
+            dictionnaire = json.load(f)
+        with tempfile.TemporaryDirectory() as dossier:
+            chemin = os.path.join(dossier, "prefixes.bin")
+            ecrire_index_prefixes(dictionnaire, chemin)
+            with IndexPrefixes(chemin) as index:
+                for saisie in sys.argv[2:]:
+                    mots = ", ".join(mot for mot, _ in index.completer(saisie, 10))
+                    print(f"🔎 {saisie}: {mots}")
+        return 0
+
+    mesures = mesurer_latence(chemin_dict)
+    print(f"📊 {mesures['mots']:,} mots, {mesures['prefixes']:,} préfixes de 1 à 3 caractères")
+    print(f"   Index : {mesures['index_octets']:,} octets (dictionnaire JSON: {mesures['dict_octets']:,})")
+    print(f"   Complétion : {mesures['index_us']:.1f} µs avec l'index, "
+          f"{mesures['lineaire_us']:.1f} µs en parcours linéaire")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Mesure des étapes d'un pipeline et rapport d'exécution JSON.
+
+`executer_pipeline` passe chaque étape par `MesureEtapes.executer`, qui
+relève le temps réel, le temps CPU, le pic RSS du processus et, après
+l'étape, les volumes traités (textes, tokens, n-grammes) fournis par le
+pipeline. Avec `--tracemalloc`, le pic mémoire Python de chaque étape
+(tracemalloc, qui voit aussi les tableaux NumPy) est relevé en plus ; il
+ralentit nettement le code Python pur, d'où une mesure à la demande.
+Avec `--profile DOSSIER`, chaque étape est en plus profilée par cProfile
+dans `DOSSIER/<langue>_<n>_<étape>.prof` (lisible avec `python -m pstats` ou snakeviz).
+
+Le rapport est écrit à côté de RAPPORT_LINGUISTIQUE.md, pour que la CI puisse
+suivre le coût du build d'une exécution à l'autre.
+"""
+
+import cProfile
+import json
+import os
+import platform
+import re
+import sys
+import time
+import tracemalloc
+import unicodedata
+from datetime import datetime
+
+try:
+    import resource
+    HAS_RESOURCE = True
+except ImportError:  # Windows
+    HAS_RESOURCE = False
+
+
+def _nom_fichier(nom):
+    """« Génération N-grams » → « generation_n-grams »"""
+    sans_accents = unicodedata.normalize('NFKD', nom).encode('ascii', 'ignore').decode('ascii')
+    return re.sub(r'[^a-z0-9\-]+', '_', sans_accents.lower()).strip('_')
+
+
+def rss_max_mo():
+    """Pic RSS du processus, en Mo (ru_maxrss : Ko sous Linux, octets sous macOS)"""
+    if not HAS_RESOURCE:
+        return None
+    pic = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(pic / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+class MesureEtapes:
+    """Chronomètre, mémoire et volumes de chaque étape d'un pipeline"""
+
+    def __init__(self, langue, compteurs=None, dossier_profils=None, trace_memoire=False):
+        self.langue = langue
+        # compteurs() → {nom: volume} relevé après chaque étape
+        self.compteurs = compteurs or (lambda: {})
+        self.dossier_profils = dossier_profils
+        self.trace_memoire = trace_memoire
+        self.etapes = []
+        self.debut = datetime.now()
+        self._debut_total = time.perf_counter()
+
+    def executer(self, nom, fonction):
+        """Exécute `fonction` en la mesurant ; les exceptions sont propagées"""
+        trace_active = tracemalloc.is_tracing()
+        if self.trace_memoire:
+            if not trace_active:
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+            memoire_debut = tracemalloc.get_traced_memory()[0]
+        profil = cProfile.Profile() if self.dossier_profils else None
+
+        mesure = {"nom": nom, "succes": False}
+        debut, debut_cpu = time.perf_counter(), time.process_time()
+        try:
+            if profil is not None:
+                profil.enable()
+            succes = fonction()
+            mesure["succes"] = bool(succes)
+            return succes
+        except Exception as e:
+            mesure["erreur"] = str(e)
+            raise
+        finally:
+            if profil is not None:
+                profil.disable()
+            mesure["secondes"] = round(time.perf_counter() - debut, 4)
+            mesure["cpu_secondes"] = round(time.process_time() - debut_cpu, 4)
+            if self.trace_memoire:
+                memoire_fin, pic = tracemalloc.get_traced_memory()
+                if not trace_active:
+                    tracemalloc.stop()
+                mesure["memoire_pic_mo"] = round(pic / (1024 * 1024), 2)
+                mesure["memoire_delta_mo"] = round((memoire_fin - memoire_debut) / (1024 * 1024), 2)
+            mesure["rss_max_mo"] = rss_max_mo()
+            try:
+                mesure["volumes"] = self.compteurs()
+            except Exception:
+                mesure["volumes"] = {}
+            if profil is not None:
+                mesure["profil"] = self._ecrire_profil(profil, nom)
+            self.etapes.append(mesure)
+
+    def _ecrire_profil(self, profil, nom):
+        os.makedirs(self.dossier_profils, exist_ok=True)
+        chemin = os.path.join(self.dossier_profils,
+                              f"{self.langue}_{len(self.etapes) + 1}_{_nom_fichier(nom)}.prof")
+        profil.dump_stats(chemin)
+        return chemin
+
+    def rapport(self, **metadonnees):
+        """Dictionnaire JSON du rapport d'exécution"""
+        return {
+            "langue": self.langue,
+            "date": self.debut.isoformat(timespec='seconds'),
+            "python": platform.python_version(),
+            "plateforme": platform.platform(),
+            **metadonnees,
+            "total_secondes": round(time.perf_counter() - self._debut_total, 4),
+            "rss_max_mo": rss_max_mo(),
+            "succes": all(e["succes"] for e in self.etapes),
+            "etapes": self.etapes,
+        }
+
+    def ecrire(self, chemin, **metadonnees):
+        """Écrit le rapport (remplacement atomique) ; renvoie False en cas d'échec"""
+        try:
+            temporaire = chemin + '.tmp'
+            with open(temporaire, 'w', encoding='utf-8') as f:
+                json.dump(self.rapport(**metadonnees), f, ensure_ascii=False, indent=2)
+            os.replace(temporaire, chemin)
+            return True
+        except OSError as e:
+            print(f"⚠️ Rapport d'exécution non écrit ({chemin}): {e}")
+            return False
+
+    def afficher_resume(self):
+        print("\n⏱️ DURÉE DES ÉTAPES")
+        print("-" * 30)
+        for e in self.etapes:
+            memoire = f", pic {e['memoire_pic_mo']:.1f} Mo" if "memoire_pic_mo" in e else ""
+            print(f"   {e['nom']:<25} {e['secondes']:>8.3f} s  (CPU {e['cpu_secondes']:.3f} s{memoire})")
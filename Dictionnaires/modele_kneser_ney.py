@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Modèle de langue lissé (Kneser-Ney interpolé) sur les comptes NumPy.
+
+Le modèle brut (`CompteurNgrammes.predictions`) exporte des fréquences
+relatives c(w | contexte) / c(contexte) : une suite jamais vue après « an ka »
+n'y a aucune chance, et le clavier doit se rabattre lui-même de la clé à deux
+mots sur la clé à un mot. Ici, chaque niveau retranche une décote D aux
+comptes observés et redistribue la masse libérée, le poids de repli γ, sur
+le niveau inférieur :
+
+    P3(w | u v) = max(c(u v w) - D3, 0) / c(u v ·) + γ(u v) · P2'(w | v)
+    P2(w | v)   = max(c(v w) - D2, 0) / c(v ·)     + γ(v)   · P1(w)
+    P1(w)       = max(N(· w) - D1, 0) / N(· ·)     + γ      / |V|
+
+P1 et P2' (niveaux inférieurs) comptent les contextes distincts qui précèdent
+un mot ou une paire (comptes de continuation) plutôt que ses occurrences.
+Chaque décote vaut D = n1 / (n1 + 2 n2), n_k étant le nombre de n-grammes du
+niveau vus k fois.
+
+Les scores sont précalculés, au format habituel
+`{contexte: [{"word", "probability"}]}` : chaque clé porte ses suites
+observées, classées et filtrées par probabilité interpolée, et le clavier
+n'a qu'une recherche à faire. Le fichier garde ainsi la taille du modèle
+brut ; les clés à deux mots qui n'apportent rien de plus que leur dernier mot
+sont même omises. Les poids de repli des contextes exportés sont écrits à
+part (`*_backoff.json`, dans `assets_evaluation/` : le clavier ne les lit
+pas), pour qui voudrait compléter une liste par le niveau inférieur.
+"""
+
+import numpy as np
+
+from comptage_ngrammes import DECALAGE_32, MASQUE_32
+from ecriture_assets import chemin_evaluation, ecrire_json
+
+# Décote quand un niveau n'a aucun n-gramme vu une seule fois
+DECOTE_PAR_DEFAUT = 0.5
+NOM_MODELE = "interpolated-kneser-ney"
+# Valeurs de --ngram-model ; "mle" garde les fréquences relatives brutes
+MODELES = ("kneser-ney", "mle")
+
+
+def decote(comptes):
+    """D = n1 / (n1 + 2 n2) (Ney, Essen et Kneser)"""
+    n1 = int(np.count_nonzero(comptes == 1))
+    n2 = int(np.count_nonzero(comptes == 2))
+    if n1 == 0:
+        return DECOTE_PAR_DEFAUT
+    return n1 / (n1 + 2 * n2)
+
+
+def chemin_poids_repli(chemin_ngrams):
+    """Chemin du fichier des poids de repli associé à un fichier de n-grammes,
+    hors des assets de l'APK"""
+    return chemin_evaluation(chemin_ngrams, "_backoff.json")
+
+
+def _cles(contextes, mots):
+    return (contextes.astype(np.uint64) << DECALAGE_32) | mots.astype(np.uint64)
+
+
+def _distinctes(valeurs):
+    """Valeurs distinctes triées (tri en place, plus rapide ici que np.unique)"""
+    valeurs.sort()
+    return valeurs[np.r_[True, valeurs[1:] != valeurs[:-1]]] if len(valeurs) else valeurs
+
+
+class _Unigrammes:
+    """P1 : continuation des mots, interpolée avec la loi uniforme"""
+
+    def __init__(self, continuation, taille_vocabulaire):
+        self.decote = decote(continuation)
+        total = continuation.sum()
+        if total > 0:
+            vus = np.count_nonzero(continuation)
+            self.probabilites = (np.maximum(continuation - self.decote, 0) / total
+                                 + self.decote * vus / total / taille_vocabulaire)
+        else:
+            self.probabilites = np.full(taille_vocabulaire, 1 / max(taille_vocabulaire, 1))
+
+    def scores(self, contextes, mots):
+        return self.probabilites[mots]
+
+
+class _Niveau:
+    """Niveau interpolé : clés (contexte << 32 | mot) triées, leurs comptes et
+    leurs premières positions dans le corpus.
+
+    `contexte_inferieur[c]` est le contexte du niveau inférieur auquel se
+    rabat le contexte c (le dernier mot, ou 0 pour les unigrammes).
+    """
+
+    def __init__(self, cles, comptes, premiers, nombre_contextes, contexte_inferieur, inferieur):
+        self.cles = cles
+        self.premiers = premiers
+        self.contexte_inferieur = contexte_inferieur
+        self.inferieur = inferieur
+        self.decote = decote(comptes)
+
+        contextes = (cles >> DECALAGE_32).astype(np.int64)
+        self.mots = (cles & MASQUE_32).astype(np.int64)
+        self.contextes = contextes
+        self.observes = comptes > 0
+        totaux = np.bincount(contextes, weights=comptes, minlength=nombre_contextes)
+        distincts = np.bincount(contextes[self.observes], minlength=nombre_contextes)
+        connus = totaux > 0
+        # Un contexte jamais suivi se rabat entièrement sur le niveau inférieur
+        self.poids_repli = np.ones(nombre_contextes)
+        self.poids_repli[connus] = self.decote * distincts[connus] / totaux[connus]
+        self.parts = np.zeros(len(cles))
+        self.parts[self.observes] = (np.maximum(comptes[self.observes] - self.decote, 0)
+                                     / totaux[contextes[self.observes]])
+
+    def scores(self, contextes, mots):
+        """Probabilités interpolées de paires (contexte, mot) quelconques"""
+        parts = np.zeros(len(mots))
+        if len(self.cles):
+            cles = _cles(contextes, mots)
+            indices = np.minimum(np.searchsorted(self.cles, cles), len(self.cles) - 1)
+            trouves = self.cles[indices] == cles
+            parts[trouves] = self.parts[indices[trouves]]
+        inferieurs = self.contexte_inferieur[contextes]
+        return parts + self.poids_repli[contextes] * self.inferieur.scores(inferieurs, mots)
+
+    def meilleurs(self, k, retenus=None):
+        """Les k suites observées les plus probables de chaque contexte.
+
+        Seules les suites vues après le contexte sont classées : le fichier
+        garde ainsi le nombre d'entrées du modèle brut, et le score lissé
+        décide de l'ordre et du seuil. Renvoie (contextes, mots, scores),
+        groupés par contexte croissant puis par score décroissant (à égalité,
+        ordre de première apparition, comme dans le modèle brut).
+        """
+        contextes = self.contextes[self.observes]
+        mots = self.mots[self.observes]
+        premiers = self.premiers[self.observes]
+        if retenus is not None:
+            garde = retenus[contextes]
+            contextes, mots, premiers = contextes[garde], mots[garde], premiers[garde]
+        scores = self.scores(contextes, mots)
+
+        ordre = np.lexsort((premiers, -scores, contextes))
+        contextes, mots, scores = contextes[ordre], mots[ordre], scores[ordre]
+        debuts = np.flatnonzero(np.r_[True, contextes[1:] != contextes[:-1]])
+        rangs = np.arange(len(contextes)) - np.repeat(debuts, np.diff(np.r_[debuts, len(contextes)]))
+        garde = rangs < k
+        return contextes[garde], mots[garde], scores[garde]
+
+
+class ModeleKneserNey:
+    """Kneser-Ney interpolé à trois niveaux sur un `CompteurNgrammes`"""
+
+    def __init__(self, compteur):
+        self.compteur = compteur
+        taille_vocabulaire = len(compteur.unigrammes)
+        nombre_bigrammes = len(compteur.bigrammes_cles)
+        mots2 = (compteur.bigrammes_cles & MASQUE_32).astype(np.int64)
+        contextes_t = (compteur.trigrammes_cles >> DECALAGE_32).astype(np.int64)
+        mots3 = (compteur.trigrammes_cles & MASQUE_32).astype(np.int64)
+
+        # Continuation : mots distincts vus avant w, avant la paire (v, w)
+        self.unigrammes = _Unigrammes(np.bincount(mots2, minlength=taille_vocabulaire),
+                                      taille_vocabulaire)
+        # Les comptes élagués (`comptage_borne.compter_en_flux`) peuvent garder
+        # un trigramme dont le bigramme suffixe a été oublié : il est ignoré
+        suffixes = _cles(mots2[contextes_t], mots3)
+        indices = np.searchsorted(compteur.bigrammes_cles, suffixes)
+        connus = indices < nombre_bigrammes
+        connus[connus] = compteur.bigrammes_cles[indices[connus]] == suffixes[connus]
+        continuation_b = np.bincount(indices[connus], minlength=nombre_bigrammes)
+
+        vers_unigrammes = np.zeros(taille_vocabulaire, dtype=np.int64)
+        # Clés à un mot : comptes bruts, c'est le niveau le plus haut de ce contexte
+        self.bigrammes = _Niveau(compteur.bigrammes_cles, compteur.bigrammes_comptes,
+                                 compteur.bigrammes_premiers, taille_vocabulaire, vers_unigrammes, self.unigrammes)
+        self.bigrammes_continuation = _Niveau(compteur.bigrammes_cles, continuation_b,
+                                              compteur.bigrammes_premiers, taille_vocabulaire, vers_unigrammes, self.unigrammes)
+        self.trigrammes = _Niveau(compteur.trigrammes_cles, compteur.trigrammes_comptes,
+                                  compteur.trigrammes_premiers, nombre_bigrammes, mots2, self.bigrammes_continuation)
+        self.poids_repli = {}
+        self.cles_redondantes = 0
+
+    @property
+    def decotes(self):
+        return {
+            "unigrams": self.unigrammes.decote,
+            "bigrams": self.bigrammes.decote,
+            "bigrams_continuation": self.bigrammes_continuation.decote,
+            "trigrams": self.trigrammes.decote,
+        }
+
+    def predictions(self, vocabulaire, seuil, max_candidats, min_occurrences_contexte=1):
+        """Même contrat que `CompteurNgrammes.predictions`, scores lissés.
+
+        Clés à un mot puis à deux mots, chacune dans l'ordre de première
+        apparition de son contexte. Une clé à deux mots qui proposerait les
+        mêmes suites, dans le même ordre, que son dernier mot seul n'est pas
+        exportée : le repli du clavier donne déjà ce résultat.
+        Renvoie aussi le nombre de contextes à deux mots écartés faute
+        d'occurrences ; les poids de repli des clés exportées sont gardés
+        dans `poids_repli`.
+        """
+        compteur = self.compteur
+        predictions = {}
+        self.poids_repli = {}
+        self.cles_redondantes = 0
+
+        # Contextes à un mot
+        contextes, mots, scores = self.bigrammes.meilleurs(max_candidats)
+        premiers = np.full(len(compteur.unigrammes), np.iinfo(np.int64).max, dtype=np.int64)
+        np.minimum.at(premiers, self.bigrammes.contextes, compteur.bigrammes_premiers)
+        listes_un_mot = {}
+        for contexte, candidats in self._regrouper(contextes, mots, scores, premiers, seuil, vocabulaire):
+            cle = vocabulaire[contexte]
+            predictions[cle] = candidats
+            listes_un_mot[contexte] = [c["word"] for c in candidats]
+            self.poids_repli[cle] = round(float(self.bigrammes.poids_repli[contexte]), 4)
+
+        # Contextes à deux mots (indices de bigrammes)
+        retenus = compteur.bigrammes_comptes >= min_occurrences_contexte
+        contextes_t = self.trigrammes.contextes
+        contextes_ignores = len(_distinctes(contextes_t[~retenus[contextes_t]]))
+        contextes, mots, scores = self.trigrammes.meilleurs(max_candidats, retenus)
+        premiers = np.full(len(compteur.bigrammes_cles), np.iinfo(np.int64).max, dtype=np.int64)
+        np.minimum.at(premiers, contextes_t, compteur.trigrammes_premiers)
+        for contexte, candidats in self._regrouper(contextes, mots, scores, premiers, seuil, vocabulaire):
+            mot1, mot2 = compteur.bigramme(contexte)
+            if listes_un_mot.get(mot2) == [c["word"] for c in candidats]:
+                self.cles_redondantes += 1
+                continue
+            cle = f"{vocabulaire[mot1]} {vocabulaire[mot2]}"
+            predictions[cle] = candidats
+            self.poids_repli[cle] = round(float(self.trigrammes.poids_repli[contexte]), 4)
+
+        return predictions, contextes_ignores
+
+    @staticmethod
+    def _regrouper(contextes, mots, scores, premiers, seuil, vocabulaire):
+        """(contexte, [{word, probability}]) par première apparition du contexte"""
+        garde = scores > seuil
+        contextes, mots, scores = contextes[garde], mots[garde], scores[garde]
+        if not len(contextes):
+            return
+        # Tri stable : l'ordre des scores est conservé dans chaque contexte
+        ordre = np.argsort(premiers[contextes], kind='stable')
+        contextes, mots, scores = contextes[ordre].tolist(), mots[ordre].tolist(), scores[ordre].tolist()
+
+        courant, candidats = None, None
+        for contexte, mot, score in zip(contextes, mots, scores):
+            if contexte != courant:
+                if candidats:
+                    yield courant, candidats
+                courant, candidats = contexte, []
+            candidats.append({"word": vocabulaire[mot], "probability": round(score, 3)})
+        if candidats:
+            yield courant, candidats
+
+    def ecrire_poids_repli(self, chemin, compact=False, compression=None, bilan=None):
+        """Écrit décotes et poids de repli des clés exportées (remplacement atomique)"""
+        donnees = {
+            "model": NOM_MODELE,
+            "discounts": {nom: round(d, 4) for nom, d in self.decotes.items()},
+            "backoff": self.poids_repli,
+        }
+        return ecrire_json(donnees, chemin, compact, compression, bilan)
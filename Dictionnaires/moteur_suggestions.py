@@ -0,0 +1,473 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Moteur de suggestions de référence, miroir de `SuggestionEngine.kt`.
+
+Le classement des suggestions n'existe que côté Kotlin et ne s'exerce que
+sur un émulateur (`regression_smoke_test.py`). Ce module en reprend la
+logique, règle pour règle, sur les assets générés :
+
+- `score_dictionnaire` ↔ `calculateDictionaryScore` ;
+- `resoudre_contexte` ↔ `resolveNgramContext` ;
+- `MoteurSuggestions.corrections_orthographiques` ↔ `getSpellCorrectionSuggestions` ;
+- `MoteurSuggestions.fusionner_et_classer` ↔ `mergeAndRankSuggestions` ;
+- `MoteurSuggestions.suggestions_frappe` ↔ `createBilingualSuggestions`
+  (chemin emprunté à chaque frappe, le service activant le mode bilingue) ;
+- `MoteurSuggestions.predictions_contextuelles` ↔ `generateContextualSuggestions`.
+
+Le dictionnaire et les n-grammes peuvent venir des JSON ou des formats
+exportés en évaluation dans `assets_evaluation/` (`_prefixes.bin`,
+`_corrections.bin`, `.bin`) : les réponses sont les mêmes, seul le coût
+change. `rejouer` tape des textes du
+corpus mot à mot et mesure, à chaque frappe, la latence des appels et la
+qualité de la barre. Les temps Python ne sont pas ceux de l'appareil, mais
+ils comparent deux formats ou deux index sur une même machine.
+
+Usage:
+  python moteur_suggestions.py [--language luxembourgish|creole]
+                               [--dict F] [--ngrams F.json|F.bin]
+                               [--prefix-index F.bin] [--spell-index F.bin]
+                               [--french F | --no-french]
+                               [--corpus F] [--max-words N] [--output F]
+"""
+
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+from banc_essai import CORPUS_PAR_DEFAUT, RACINE, charger_corpus
+from evaluation_predictions import tokeniser_textes_test
+from index_corrections import IndexCorrections, corrections_reference
+from index_prefixes import IndexPrefixes, normaliser
+from ngrams_binaires import LecteurNgramsBinaires
+from options import option_presente, valeur_option
+
+# Constantes de SuggestionEngine / BilingualConfig / FrenchDictionary
+MAX_SUGGESTIONS = 5
+MAX_WORD_HISTORY = 5
+MIN_WORD_LENGTH = 1
+USAGE_WEIGHT = 5.0
+MAX_COUNTED_USAGES = 20
+CANDIDATE_POOL_SIZE = 40
+BONUS_NGRAM = 50.0
+SEUIL_FRANCAIS = 3
+MAX_SUGGESTIONS_KREYOL = 3
+MAX_SUGGESTIONS_FRANCAISES = 2
+BOOST_KREYOL = 1.5
+MALUS_FRANCAIS = 0.8
+
+KREYOL = "kreyol"
+FRANCAIS = "francais"
+
+ASSETS_ANDROID = os.path.join(RACINE, "android_keyboard", "app", "src", "main", "assets")
+# (dictionnaire, n-grammes, corpus, module du pipeline pour la tokenisation)
+LANGUES = {
+    "luxembourgish": (os.path.join(ASSETS_ANDROID, "luxemburgish_dict.json"),
+                      os.path.join(ASSETS_ANDROID, "luxemburgish_ngrams.json"),
+                      os.path.join(RACINE, "Dictionnaires", "luxemburgish_data", "transcriptions.json"),
+                      "LuxembourgishComplet"),
+    "creole": (os.path.join(RACINE, "clavier_creole", "assets", "creole_dict.json"),
+               os.path.join(RACINE, "clavier_creole", "assets", "creole_ngrams.json"),
+               CORPUS_PAR_DEFAUT,
+               "KreyolComplet"),
+}
+CHEMIN_FRANCAIS = os.path.join(ASSETS_ANDROID, "french_simple_dict.json")
+
+
+def appliquer_casse(saisie, suggestion):
+    """Reporte la casse de la saisie sur la suggestion (applyCasingPattern)"""
+    if not saisie or not suggestion:
+        return suggestion
+    lettres = [c for c in saisie if c.isalpha()]
+    if len(lettres) >= 2 and all(c.isupper() for c in lettres):
+        return suggestion.upper()
+    if saisie[0].isupper() and all(c.islower() or not c.isalpha() for c in saisie[1:]):
+        return suggestion[:1].upper() + suggestion[1:]
+    resultat = []
+    for i, caractere in enumerate(suggestion):
+        if i < len(saisie):
+            if saisie[i].isupper():
+                caractere = caractere.upper()
+            elif saisie[i].islower():
+                caractere = caractere.lower()
+        resultat.append(caractere)
+    return ''.join(resultat)
+
+
+def score_dictionnaire(mot, saisie, frequence, distance=0, usages=0):
+    """Score d'une suggestion du dictionnaire (calculateDictionaryScore)"""
+    score = float(frequence)
+    score += min(usages, MAX_COUNTED_USAGES) * USAGE_WEIGHT
+    if distance > 0:
+        score += (3 - distance) * 100_000.0
+    if normaliser(mot).startswith(normaliser(saisie)):
+        score += 50.0
+    if len(mot) <= 6:
+        score += 10.0
+    if len(mot) > 12:
+        score -= 10.0
+    if mot != normaliser(mot):
+        score += 5.0
+    return score
+
+
+def resoudre_contexte(precedent, dernier, a_la_cle):
+    """Clé n-gramme interrogée : la paire si présente, sinon le dernier mot"""
+    if precedent is not None:
+        paire = f"{precedent} {dernier}"
+        if a_la_cle(paire):
+            return paire
+    return dernier
+
+
+def charger_dictionnaire(chemin):
+    """[(mot, fréquence)] en minuscules, par fréquence décroissante (loadDictionary)"""
+    with open(chemin, 'r', encoding='utf-8') as f:
+        donnees = json.load(f)
+    if isinstance(donnees, dict):
+        donnees = donnees.get("words", list(donnees.items()))
+    mots = []
+    for entree in donnees:
+        frequence = int(entree[1]) if len(entree) > 1 else 1
+        mots.append((str(entree[0]).lower(), frequence))
+    return sorted(mots, key=lambda p: -p[1])
+
+
+def charger_ngrams(chemin):
+    """Modèle n-gramme : dict depuis le JSON, lecteur projeté depuis un `.bin`"""
+    if chemin.endswith(".bin"):
+        return LecteurNgramsBinaires(chemin)
+    with open(chemin, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+class MoteurSuggestions:
+    """Moteur de suggestions bilingue, sans Android ni coroutines"""
+
+    def __init__(self, dictionnaire, ngrams, dictionnaire_francais=None,
+                 index_prefixes=None, index_corrections=None, usages=None):
+        self.dictionnaire = dictionnaire
+        self.formes = [normaliser(mot) for mot, _ in dictionnaire]
+        self.ngrams = ngrams
+        self.index_prefixes = index_prefixes
+        self.index_corrections = index_corrections
+        self.francais = dictionnaire_francais or []
+        # getWordFrequency retient la première occurrence d'un mot
+        self._frequences_francaises = dict(reversed(self.francais))
+        self._cache_francais = {}
+        self.usages = usages or {}
+        self.historique = []
+
+    @classmethod
+    def depuis_assets(cls, chemin_dict, chemin_ngrams, chemin_francais=None, chemin_index=None,
+                      chemin_corrections=None):
+        francais = charger_dictionnaire(chemin_francais) if chemin_francais else None
+        index = IndexPrefixes(chemin_index) if chemin_index else None
+        corrections = IndexCorrections(chemin_corrections) if chemin_corrections else None
+        return cls(charger_dictionnaire(chemin_dict), charger_ngrams(chemin_ngrams), francais,
+                   index, corrections)
+
+    def fermer(self):
+        for ressource in (self.ngrams, self.index_prefixes, self.index_corrections):
+            if hasattr(ressource, "fermer"):
+                ressource.fermer()
+
+    # ------------------------------------------------------------------
+    # Historique
+    # ------------------------------------------------------------------
+
+    def ajouter_mot_historique(self, mot):
+        mot = mot.lower().strip()
+        if mot and len(mot) >= MIN_WORD_LENGTH:
+            self.historique.append(mot)
+            if len(self.historique) > MAX_WORD_HISTORY:
+                self.historique.pop(0)
+
+    def effacer_historique(self):
+        self.historique.clear()
+
+    # ------------------------------------------------------------------
+    # Sources de candidats
+    # ------------------------------------------------------------------
+
+    def _candidats_ngram(self, contexte):
+        if isinstance(self.ngrams, LecteurNgramsBinaires):
+            return self.ngrams.candidats(contexte)
+        return self.ngrams.get(contexte, [])
+
+    def suggestions_dictionnaire(self, saisie):
+        """[(mot, fréquence, distance)] par préfixe, sinon corrections (getDictionarySuggestions)"""
+        if len(saisie) < MIN_WORD_LENGTH:
+            return []
+        if self.index_prefixes is not None:
+            correspondances = [(mot, freq, 0) for mot, freq in
+                               self.index_prefixes.completer(saisie, CANDIDATE_POOL_SIZE)]
+        else:
+            forme = normaliser(saisie)
+            correspondances = []
+            for (mot, freq), forme_mot in zip(self.dictionnaire, self.formes):
+                if forme_mot.startswith(forme):
+                    correspondances.append((mot, freq, 0))
+                    if len(correspondances) >= CANDIDATE_POOL_SIZE:
+                        break
+        if not correspondances and len(saisie) >= 3:
+            return self.corrections_orthographiques(saisie)
+        return correspondances
+
+    def corrections_orthographiques(self, saisie):
+        """Levenshtein ≤ 2 sur les formes sans accents, puis sur les mots tels quels"""
+        if len(saisie) < 3:
+            return []
+        if self.index_corrections is not None:
+            return self.index_corrections.corriger(saisie, MAX_SUGGESTIONS)
+        trouves = corrections_reference(normaliser(saisie), self.dictionnaire, self.formes,
+                                        limite=MAX_SUGGESTIONS)
+        if trouves:
+            return trouves
+        return corrections_reference(saisie, self.dictionnaire, limite=MAX_SUGGESTIONS)
+
+    def suggestions_ngrams(self):
+        """Mots suivants probables d'après l'historique (getNgramSuggestions)"""
+        if not self.historique:
+            return []
+        dernier = self.historique[-1]
+        precedent = self.historique[-2] if len(self.historique) >= 2 else None
+        contexte = resoudre_contexte(precedent, dernier, self.ngrams.__contains__)
+        vus, suggestions = set(), []
+        for entree in self._candidats_ngram(contexte):
+            mot = entree.get("word")
+            if mot is not None and mot not in vus:
+                vus.add(mot)
+                suggestions.append((mot, float(entree.get("probability") or 0.0)))
+        suggestions.sort(key=lambda s: -s[1])
+        return [mot for mot, _ in suggestions[:MAX_SUGGESTIONS]]
+
+    def suggestions_francaises(self, saisie):
+        """[(mot, score)] du dictionnaire français, à partir de 3 lettres"""
+        if len(saisie) < SEUIL_FRANCAIS or not self.francais:
+            return []
+        cle = saisie.lower()
+        mots = self._cache_francais.get(cle)
+        if mots is None:
+            correspondances = [p for p in self.francais if p[0].startswith(cle)]
+            correspondances.sort(key=lambda p: (-p[1], len(p[0])))
+            mots = self._cache_francais[cle] = [mot for mot, _ in correspondances[:MAX_SUGGESTIONS_FRANCAISES]]
+        resultat = []
+        for mot in mots:
+            score = score_dictionnaire(mot, saisie, self._frequences_francaises.get(mot, 0))
+            resultat.append((appliquer_casse(saisie, mot), score * MALUS_FRANCAIS))
+        resultat.sort(key=lambda s: -s[1])
+        return resultat
+
+    # ------------------------------------------------------------------
+    # Classements
+    # ------------------------------------------------------------------
+
+    def fusionner_et_classer(self, suggestions_dict, suggestions_ngram, saisie):
+        """Fusion dictionnaire + n-grammes du mode mixte (mergeAndRankSuggestions)"""
+        scores = {}
+        for mot, frequence, distance in suggestions_dict:
+            scores[appliquer_casse(saisie, mot)] = score_dictionnaire(
+                mot, saisie, frequence, distance, self.usages.get(mot, 0))
+        for mot in suggestions_ngram:
+            cle = appliquer_casse(saisie, mot)
+            scores[cle] = scores.get(cle, 0.0) + BONUS_NGRAM
+        classes = sorted(scores.items(), key=lambda item: -item[1])
+        return [mot for mot, _ in classes[:MAX_SUGGESTIONS]]
+
+    def suggestions_kreyol(self, saisie):
+        """[(mot, score)] de la langue du clavier (getKreyolSuggestions)"""
+        scores = {}
+        for mot, frequence, distance in self.suggestions_dictionnaire(saisie):
+            scores[mot] = score_dictionnaire(mot, saisie, frequence, distance, self.usages.get(mot, 0))
+        if self.historique:
+            saisie_min = saisie.lower()
+            for mot in self.suggestions_ngrams():
+                if mot.lower().startswith(saisie_min):
+                    scores[mot] = scores.get(mot, 0.0) + BONUS_NGRAM
+        classes = [(appliquer_casse(saisie, mot), score * BOOST_KREYOL) for mot, score in scores.items()]
+        classes.sort(key=lambda s: -s[1])
+        return classes[:MAX_SUGGESTIONS_KREYOL]
+
+    def suggestions_frappe(self, saisie):
+        """Barre affichée pendant la frappe : [(mot, score, langue)], kreyòl d'abord"""
+        if len(saisie) < MIN_WORD_LENGTH:
+            return []
+        kreyol = self.suggestions_kreyol(saisie)
+        francais = self.suggestions_francaises(saisie)
+        resultat, utilises = [], set()
+
+        def ajouter(suggestions, langue, limite):
+            for mot, score in suggestions:
+                if len(resultat) < limite and mot.lower() not in utilises:
+                    resultat.append((mot, score, langue))
+                    utilises.add(mot.lower())
+
+        ajouter(kreyol[:3], KREYOL, MAX_SUGGESTIONS)
+        ajouter(francais[:2], FRANCAIS, MAX_SUGGESTIONS)
+        ajouter(kreyol[3:], KREYOL, MAX_SUGGESTIONS)
+        return resultat
+
+    def suggestions_mixtes(self, saisie):
+        """Mode mixte historique (generateSuggestions hors bilingue)"""
+        if len(saisie) < MIN_WORD_LENGTH:
+            return []
+        fusion = self.fusionner_et_classer(self.suggestions_dictionnaire(saisie),
+                                           self.suggestions_ngrams(), saisie)
+        return [appliquer_casse(saisie, mot) for mot in fusion]
+
+    def predictions_contextuelles(self):
+        """Barre affichée après un espace (generateContextualSuggestions)"""
+        if not self.historique or not len(self.ngrams):
+            return []
+        return self.suggestions_ngrams()
+
+
+# ----------------------------------------------------------------------
+# Rejeu de sessions de frappe
+# ----------------------------------------------------------------------
+
+def _repartition(durees_ns):
+    """Moyenne et centiles (µs) d'une liste de durées en nanosecondes"""
+    if not durees_ns:
+        return {"appels": 0}
+    triees = sorted(durees_ns)
+
+    def centile(p):
+        return round(triees[min(len(triees) - 1, int(p * len(triees)))] / 1000, 1)
+
+    return {
+        "appels": len(triees),
+        "moyenne_us": round(sum(triees) / len(triees) / 1000, 1),
+        "p50_us": centile(0.50),
+        "p90_us": centile(0.90),
+        "p99_us": centile(0.99),
+        "max_us": round(triees[-1] / 1000, 1),
+    }
+
+
+def rejouer(moteur, textes_tokenises, max_mots=None):
+    """Tape les textes mot à mot et mesure chaque appel du moteur.
+
+    Après chaque mot, la barre contextuelle est calculée ; puis chaque lettre
+    du mot suivant recalcule la barre de frappe. Dès que le mot visé y figure
+    (casse ignorée), il est choisi en une frappe.
+    """
+    latences = {"contexte": [], "frappe": []}
+    mots = lettres = frappes = 0
+    predits_top1 = predits_barre = proposes_avant_fin = 0
+    horloge = time.perf_counter_ns
+
+    for texte in textes_tokenises:
+        moteur.effacer_historique()
+        for mot in texte:
+            if max_mots is not None and mots >= max_mots:
+                break
+            debut = horloge()
+            barre = moteur.predictions_contextuelles()
+            latences["contexte"].append(horloge() - debut)
+            mots += 1
+            lettres += len(mot)
+            if barre[:1] == [mot]:
+                predits_top1 += 1
+            if mot in barre:
+                predits_barre += 1
+                frappes += 1
+            else:
+                tape = len(mot)
+                for longueur in range(1, len(mot)):
+                    debut = horloge()
+                    barre = moteur.suggestions_frappe(mot[:longueur])
+                    latences["frappe"].append(horloge() - debut)
+                    if any(suggestion.lower() == mot for suggestion, _, _ in barre):
+                        tape = longueur + 1
+                        proposes_avant_fin += 1
+                        break
+                frappes += tape
+            moteur.ajouter_mot_historique(mot)
+        if max_mots is not None and mots >= max_mots:
+            break
+
+    return {
+        "mots": mots,
+        "lettres": lettres,
+        "qualite": {
+            "prediction_top1": round(predits_top1 / mots, 4) if mots else 0.0,
+            "prediction_dans_barre": round(predits_barre / mots, 4) if mots else 0.0,
+            "propose_en_cours_de_frappe": round(proposes_avant_fin / mots, 4) if mots else 0.0,
+            "economie_frappes": round(1 - frappes / lettres, 4) if lettres else 0.0,
+        },
+        "latence": {nom: _repartition(durees) for nom, durees in latences.items()},
+    }
+
+
+def main():
+    langue = valeur_option("--language", "luxembourgish")
+    if langue not in LANGUES:
+        print(f"❌ Langue inconnue: {langue} (choix: {', '.join(LANGUES)})")
+        return 1
+    chemin_dict, chemin_ngrams, chemin_corpus, nom_module = LANGUES[langue]
+    chemin_dict = valeur_option("--dict", chemin_dict)
+    chemin_ngrams = valeur_option("--ngrams", chemin_ngrams)
+    chemin_corpus = valeur_option("--corpus", chemin_corpus)
+    chemin_index = valeur_option("--prefix-index")
+    chemin_corrections = valeur_option("--spell-index")
+    chemin_francais = None if option_presente("--no-french") else valeur_option("--french", CHEMIN_FRANCAIS)
+    max_mots = valeur_option("--max-words", None, int)
+    sortie = valeur_option("--output", f"benchmarks/moteur_suggestions_{langue}.json")
+
+    print("⌨️ REJEU DU MOTEUR DE SUGGESTIONS")
+    print("=" * 40)
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    pattern_mot = __import__(nom_module).PATTERN_MOT
+    textes = tokeniser_textes_test(charger_corpus(chemin_corpus), pattern_mot)
+
+    debut = time.perf_counter()
+    moteur = MoteurSuggestions.depuis_assets(chemin_dict, chemin_ngrams, chemin_francais,
+                                             chemin_index, chemin_corrections)
+    chargement = time.perf_counter() - debut
+    print(f"📖 {len(moteur.dictionnaire):,} mots, {len(moteur.ngrams):,} contextes "
+          f"(chargement {chargement * 1000:.0f} ms)")
+    try:
+        resultat = rejouer(moteur, textes, max_mots)
+    finally:
+        moteur.fermer()
+
+    qualite = resultat["qualite"]
+    print(f"\n🎯 {resultat['mots']:,} mots rejoués ({resultat['lettres']:,} lettres)")
+    print(f"   - Prédiction exacte avant la première lettre: {qualite['prediction_top1']:.1%} "
+          f"(dans la barre: {qualite['prediction_dans_barre']:.1%})")
+    print(f"   - Mot proposé en cours de frappe: {qualite['propose_en_cours_de_frappe']:.1%}")
+    print(f"   - Économie de frappes: {qualite['economie_frappes']:.1%}")
+    for nom, mesure in resultat["latence"].items():
+        if mesure["appels"]:
+            print(f"⏱️ {nom:<9} {mesure['appels']:>8,} appels  p50 {mesure['p50_us']:>8.1f} µs  "
+                  f"p90 {mesure['p90_us']:>8.1f} µs  p99 {mesure['p99_us']:>9.1f} µs  "
+                  f"max {mesure['max_us']:>9.1f} µs")
+
+    rapport = {
+        "date": datetime.now().isoformat(timespec='seconds'),
+        "langue": langue,
+        "assets": {
+            "dictionnaire": os.path.relpath(os.path.abspath(chemin_dict), RACINE),
+            "ngrams": os.path.relpath(os.path.abspath(chemin_ngrams), RACINE),
+            "index_prefixes": chemin_index and os.path.relpath(os.path.abspath(chemin_index), RACINE),
+            "index_corrections": chemin_corrections and
+            os.path.relpath(os.path.abspath(chemin_corrections), RACINE),
+            "francais": chemin_francais and os.path.relpath(os.path.abspath(chemin_francais), RACINE),
+        },
+        "corpus": os.path.relpath(os.path.abspath(chemin_corpus), RACINE),
+        "chargement_ms": round(chargement * 1000, 1),
+        **resultat,
+    }
+    os.makedirs(os.path.dirname(sortie) or '.', exist_ok=True)
+    with open(sortie, 'w', encoding='utf-8') as f:
+        json.dump(rapport, f, ensure_ascii=False, indent=2)
+    print(f"\n💾 Résultats: {sortie}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
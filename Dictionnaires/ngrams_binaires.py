@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Format binaire compact des n-grammes, exporté en évaluation (hors de l'APK,
+cf. `ecriture_assets.DOSSIER_EVALUATION`).
+
+Le JSON `{contexte: [{"word": ..., "probability": ...}]}` est lu en entier et
+parsé par `JSONObject` au démarrage du clavier. Le fichier `.bin` contient les
+mêmes prédictions, dans une forme qui se projette en mémoire (mmap) et s'y
+interroge sans étape de chargement :
+
+    en-tête      24 octets : magie b"KNG1", version, nombres de contextes,
+                 de chaînes et de candidats, taille du bloc de texte
+    offsets      uint32[chaines + 1] : début de chaque chaîne dans le bloc
+    debuts       uint32[contextes + 1] : premier candidat de chaque contexte
+    candidats    uint32[candidats] : (id du mot << 10) | probabilité en ‰
+    texte        chaînes UTF-8 concaténées
+
+Toutes les valeurs sont en petit-boutiste. Les contextes occupent les
+premières entrées de la table des chaînes, triés par octets UTF-8 : le
+contexte i est la chaîne i, et une recherche dichotomique suffit à le
+retrouver. Les mots candidats qui ne sont pas aussi des contextes suivent.
+Les probabilités du JSON ont trois décimales : en millièmes sur 10 bits, la
+quantification ne perd rien.
+"""
+
+import bisect
+import mmap
+import os
+import struct
+
+import numpy as np
+
+from ecriture_assets import chemin_evaluation
+
+MAGIE = b"KNG1"
+VERSION_FORMAT = 1
+EN_TETE = struct.Struct("<4sHHIIII")
+BITS_PROBABILITE = 10
+ECHELLE_PROBABILITE = 1000
+MASQUE_PROBABILITE = (1 << BITS_PROBABILITE) - 1
+MAX_CHAINES = 1 << (32 - BITS_PROBABILITE)
+
+
+def chemin_binaire(chemin_json):
+    """Chemin du `.bin` correspondant à un fichier de n-grammes JSON"""
+    return chemin_evaluation(chemin_json, ".bin")
+
+
+def encoder_ngrams(predictions):
+    """Sérialise `{contexte: [{word, probability}]}` au format binaire"""
+    contextes = sorted(predictions, key=lambda c: c.encode('utf-8'))
+    chaines = list(contextes)
+    ids = {c: i for i, c in enumerate(contextes)}
+    autres = sorted({p["word"] for candidats in predictions.values() for p in candidats} - ids.keys(),
+                    key=lambda m: m.encode('utf-8'))
+    for mot in autres:
+        ids[mot] = len(chaines)
+        chaines.append(mot)
+    if len(chaines) > MAX_CHAINES:
+        raise ValueError(f"Trop de chaînes pour le format binaire: {len(chaines)} > {MAX_CHAINES}")
+
+    debuts = [0]
+    candidats = []
+    for contexte in contextes:
+        for p in predictions[contexte]:
+            millieme = int(round(p["probability"] * ECHELLE_PROBABILITE))
+            millieme = min(max(millieme, 0), ECHELLE_PROBABILITE)
+            candidats.append((ids[p["word"]] << BITS_PROBABILITE) | millieme)
+        debuts.append(len(candidats))
+
+    encodees = [c.encode('utf-8') for c in chaines]
+    offsets = np.zeros(len(encodees) + 1, dtype='<u4')
+    np.cumsum([len(e) for e in encodees], out=offsets[1:])
+    texte = b"".join(encodees)
+
+    en_tete = EN_TETE.pack(MAGIE, VERSION_FORMAT, 0, len(contextes), len(chaines),
+                           len(candidats), len(texte))
+    return b"".join([
+        en_tete,
+        offsets.tobytes(),
+        np.array(debuts, dtype='<u4').tobytes(),
+        np.array(candidats, dtype='<u4').tobytes(),
+        texte,
+    ])
+
+
+def ecrire_ngrams_binaires(predictions, chemin):
+    """Écrit le fichier binaire (remplacement atomique) ; renvoie sa taille"""
+    donnees = encoder_ngrams(predictions)
+    os.makedirs(os.path.dirname(chemin) or '.', exist_ok=True)
+    temporaire = chemin + '.tmp'
+    with open(temporaire, 'wb') as f:
+        f.write(donnees)
+    os.replace(temporaire, chemin)
+    return len(donnees)
+
+
+class LecteurNgramsBinaires:
+    """Lecture d'un fichier `.bin` projeté en mémoire, sans tout décoder"""
+
+    def __init__(self, chemin):
+        with open(chemin, 'rb') as f:
+            self._carte = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magie, version, _, self.nombre_contextes, self.nombre_chaines, \
+            self.nombre_candidats, taille_texte = EN_TETE.unpack_from(self._carte, 0)
+        if magie != MAGIE or version != VERSION_FORMAT:
+            self.fermer()
+            raise ValueError(f"Fichier n-grammes binaire invalide: {chemin}")
+
+        position = EN_TETE.size
+        self._offsets = np.frombuffer(self._carte, dtype='<u4', count=self.nombre_chaines + 1,
+                                      offset=position)
+        position += self._offsets.nbytes
+        self._debuts = np.frombuffer(self._carte, dtype='<u4', count=self.nombre_contextes + 1,
+                                     offset=position)
+        position += self._debuts.nbytes
+        self._candidats = np.frombuffer(self._carte, dtype='<u4', count=self.nombre_candidats,
+                                        offset=position)
+        self._texte = position + self._candidats.nbytes
+        if self._texte + taille_texte != len(self._carte):
+            self.fermer()
+            raise ValueError(f"Fichier n-grammes binaire tronqué: {chemin}")
+
+    def fermer(self):
+        # Les vues numpy retiennent le mmap : on les libère avant de le fermer
+        self._offsets = self._debuts = self._candidats = None
+        self._carte.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fermer()
+        return False
+
+    def _octets(self, i):
+        debut = self._texte + int(self._offsets[i])
+        return self._carte[debut:self._texte + int(self._offsets[i + 1])]
+
+    def chaine(self, i):
+        return self._octets(i).decode('utf-8')
+
+    def _indice(self, contexte):
+        cle = contexte.encode('utf-8')
+        i = bisect.bisect_left(_VueContextes(self), cle)
+        if i < self.nombre_contextes and self._octets(i) == cle:
+            return i
+        return -1
+
+    def __len__(self):
+        return self.nombre_contextes
+
+    def __contains__(self, contexte):
+        return self._indice(contexte) >= 0
+
+    def candidats(self, contexte):
+        """[{word, probability}] du contexte, dans l'ordre du JSON ; [] si absent"""
+        i = self._indice(contexte)
+        if i < 0:
+            return []
+        return self._decoder(i)
+
+    def _decoder(self, i):
+        resultat = []
+        for valeur in self._candidats[self._debuts[i]:self._debuts[i + 1]].tolist():
+            resultat.append({
+                "word": self.chaine(valeur >> BITS_PROBABILITE),
+                "probability": (valeur & MASQUE_PROBABILITE) / ECHELLE_PROBABILITE,
+            })
+        return resultat
+
+    def en_dict(self):
+        """Décode tout le fichier (contextes dans l'ordre des octets)"""
+        return {self.chaine(i): self._decoder(i) for i in range(self.nombre_contextes)}
+
+
+class _VueContextes:
+    """Séquence des clés (octets) des contextes, pour `bisect`"""
+
+    def __init__(self, lecteur):
+        self.lecteur = lecteur
+
+    def __len__(self):
+        return self.lecteur.nombre_contextes
+
+    def __getitem__(self, i):
+        return self.lecteur._octets(i)
+
+
+def valider_ngrams_binaires(chemin, predictions):
+    """Vérifie qu'un `.bin` relu redonne exactement `predictions`.
+
+    Renvoie la liste des contextes en écart (vide si tout concorde).
+    """
+    ecarts = []
+    with LecteurNgramsBinaires(chemin) as lecteur:
+        if len(lecteur) != len(predictions):
+            ecarts.append(f"{len(lecteur)} contextes au lieu de {len(predictions)}")
+        for contexte, attendus in predictions.items():
+            attendus = [{"word": p["word"], "probability": round(p["probability"], 3)}
+                        for p in attendus]
+            if lecteur.candidats(contexte) != attendus:
+                ecarts.append(contexte)
+    return ecarts
+
+
+def comparer_formats(chemin_json, chemin_bin=None):
+    """Tailles (brutes et compressées, comme dans l'APK) et temps de chargement"""
+    import gzip
+    import json
+    import time
+
+    chemin_bin = chemin_bin or chemin_binaire(chemin_json)
+    with open(chemin_json, 'rb') as f:
+        brut_json = f.read()
+    debut = time.perf_counter()
+    predictions = json.loads(brut_json.decode('utf-8'))
+    temps_json = time.perf_counter() - debut
+
+    if not os.path.exists(chemin_bin):
+        ecrire_ngrams_binaires(predictions, chemin_bin)
+    with open(chemin_bin, 'rb') as f:
+        brut_bin = f.read()
+
+    # Ouverture + une requête : c'est tout ce que le clavier aurait à payer
+    debut = time.perf_counter()
+    with LecteurNgramsBinaires(chemin_bin) as lecteur:
+        lecteur.candidats(next(iter(predictions), ""))
+    temps_bin = time.perf_counter() - debut
+
+    return {
+        'contextes': len(predictions),
+        'json_octets': len(brut_json),
+        'json_gzip_octets': len(gzip.compress(brut_json, mtime=0)),
+        'bin_octets': len(brut_bin),
+        'bin_gzip_octets': len(gzip.compress(brut_bin, mtime=0)),
+        'json_chargement_s': temps_json,
+        'bin_ouverture_s': temps_bin,
+        'ecarts': valider_ngrams_binaires(chemin_bin, predictions),
+    }
+
+
+def main():
+    import sys
+
+    if len(sys.argv) < 2:
+        print("Usage: python ngrams_binaires.py <ngrams.json> [ngrams.bin]")
+        return 1
+    mesures = comparer_formats(*sys.argv[1:3])
+    print(f"📊 {mesures['contextes']} contextes")
+    print(f"   JSON : {mesures['json_octets']:>10,} octets ({mesures['json_gzip_octets']:,} compressé), "
+          f"chargement {mesures['json_chargement_s'] * 1000:.1f} ms")
+    print(f"   BIN  : {mesures['bin_octets']:>10,} octets ({mesures['bin_gzip_octets']:,} compressé), "
+          f"ouverture {mesures['bin_ouverture_s'] * 1000:.1f} ms")
+    if mesures['ecarts']:
+        print(f"❌ {len(mesures['ecarts'])} écarts, ex.: {mesures['ecarts'][:5]}")
+        return 1
+    print("✅ Relecture identique au JSON")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Lecture des options de ligne de commande communes aux pipelines.
+
+Les pipelines se lancent sans argument (`python KreyolComplet.py`) ; les
+options restent donc facultatives et sont lues directement dans `sys.argv`,
+sous la forme `--option valeur` ou `--option=valeur`.
+"""
+
+import sys
+
+
+def option_presente(nom, argv=None):
+    """Vrai si le drapeau `nom` (ex. "--strict") figure sur la ligne de commande"""
+    argv = sys.argv if argv is None else argv
+    return any(arg == nom or arg.startswith(nom + "=") for arg in argv)
+
+
+def valeur_option(nom, defaut=None, conversion=str, argv=None):
+    """Valeur de l'option `nom`, convertie, ou `defaut` si elle est absente"""
+    argv = sys.argv if argv is None else argv
+    for i, arg in enumerate(argv):
+        if arg.startswith(nom + "="):
+            return conversion(arg.split("=", 1)[1])
+        if arg == nom and i + 1 < len(argv):
+            return conversion(argv[i + 1])
+    return defaut
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Chargement des datasets Hugging Face limité aux colonnes de texte.
+
+Les pipelines ne lisent que `Texte` (et `Source`). Charger les rows complètes
+fait pourtant télécharger, décoder et garder en mémoire toutes les autres
+colonnes, dont l'audio des corpus de transcriptions.
+
+- Quand les métadonnées du dépôt décrivent ses colonnes, `load_dataset` reçoit
+  `columns=[...]`. Les fichiers Parquet ne sont alors lus que pour ces
+  colonnes ; en streaming, seuls leurs blocs sont téléchargés.
+- Sinon (pas de Parquet, colonnes inconnues), les colonnes sont retirées dès
+  l'ouverture (`select_columns`), avant toute itération. Les features audio
+  n'étant plus dans le schéma, elles ne sont jamais décodées.
+
+Les splits se parcourent ensuite par lots (`lots_de_colonnes`) : chaque lot est
+une table Arrow de quelques milliers de rows, dont les colonnes de texte
+passent en listes de chaînes, sans dictionnaire Python par row.
+
+`datasets` (plus d'une seconde d'import) n'est importé qu'au premier
+chargement depuis le Hub : `HAS_DATASETS` vérifie seulement qu'il est installé.
+"""
+
+import importlib.util
+
+HAS_DATASETS = importlib.util.find_spec("datasets") is not None
+
+COLONNES_TEXTE = ("Texte", "Source")
+TAILLE_LOT = 10_000
+
+
+def _datasets():
+    """Module `datasets`, importé au premier appel"""
+    import datasets
+    return datasets
+
+
+def colonnes_du_depot(depot, **options):
+    """Colonnes du dépôt, sans lire les données : métadonnées du dépôt, sinon
+    schéma lu à l'ouverture en streaming (pied des fichiers Parquet). None si
+    elles restent inconnues."""
+    try:
+        features = _datasets().load_dataset_builder(depot, **options).info.features
+        if not features:
+            splits = _datasets().load_dataset(depot, streaming=True, **options)
+            features = next(iter(splits.values())).features
+    except Exception:
+        return None
+    return list(features) if features else None
+
+
+def projeter(dataset, colonnes):
+    """Garde les `colonnes` présentes dans chaque split (Dataset, IterableDataset
+    ou leurs dictionnaires de splits)"""
+    if hasattr(dataset, "keys"):
+        for split in list(dataset.keys()):
+            dataset[split] = projeter(dataset[split], colonnes)
+        return dataset
+    presentes = dataset.column_names
+    if presentes is None:
+        # Streaming sans schéma connu : aucune feature n'y est décodée
+        return dataset
+    gardees = [c for c in colonnes if c in presentes]
+    return dataset.select_columns(gardees) if gardees != list(presentes) else dataset
+
+
+def charger_colonnes(depot, colonnes=COLONNES_TEXTE, sonder=True, **options):
+    """`load_dataset(depot, **options)` réduit aux `colonnes` qui existent.
+
+    Avec `sonder=False` (Hub déjà trouvé injoignable), les colonnes du dépôt
+    ne sont pas demandées : la sonde repasserait par toutes les tentatives
+    réseau de `datasets` avant le chargement lui-même. Toutes les colonnes
+    sont alors ouvertes puis projetées.
+
+    Renvoie (dataset, lecture_projetee) : `lecture_projetee` est vrai quand
+    les autres colonnes n'ont pas du tout été lues.
+    """
+    disponibles = None
+    if sonder:
+        disponibles = colonnes_du_depot(depot, **{cle: valeur for cle, valeur in options.items()
+                                                  if cle in ("revision", "token")})
+    if disponibles:
+        retenues = [c for c in colonnes if c in disponibles]
+        if retenues:
+            try:
+                dataset = _datasets().load_dataset(depot, columns=retenues, **options)
+                return projeter(dataset, colonnes), True
+            except (ValueError, TypeError):
+                # Format sans option `columns` (pas du Parquet)
+                pass
+    return projeter(_datasets().load_dataset(depot, **options), colonnes), False
+
+
+def _colonne(lot, nom):
+    """Valeurs d'une colonne d'un lot (table Arrow ou dict de listes), None si absente"""
+    if isinstance(lot, dict):
+        return lot.get(nom)
+    return lot.column(nom).to_pylist() if nom in lot.column_names else None
+
+
+def lots_arrow(split, taille=TAILLE_LOT):
+    """Lots de `taille` rows d'un split (Dataset ou IterableDataset), en tables
+    Arrow ; en dictionnaires de listes si le format Arrow est indisponible"""
+    try:
+        return split.with_format("arrow").iter(batch_size=taille)
+    except (ValueError, NotImplementedError):
+        return split.iter(batch_size=taille)
+
+
+def lots_de_colonnes(split, colonnes, taille=TAILLE_LOT):
+    """Parcourt un split par lots de `taille` rows.
+
+    Produit (nombre_de_rows, {colonne: valeurs ou None si absente}).
+    """
+    for lot in lots_arrow(split, taille):
+        nombre = len(next(iter(lot.values()), ())) if isinstance(lot, dict) else lot.num_rows
+        yield nombre, {nom: _colonne(lot, nom) for nom in colonnes}
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Statistiques du dictionnaire, calculées sur des tableaux NumPy.
+
+Les analyses et le rapport linguistique reposaient sur des compréhensions de
+liste répétées sur tous les mots (classes de fréquence, longueurs, digrammes,
+diacritiques, entropie, Pareto). Ici, les fréquences et les longueurs sont
+chargées une fois dans des tableaux, et les mots sont concaténés en un seul
+flux de points de code (séparés par '\\n') : chaque statistique devient une
+opération vectorisée sur ces tableaux.
+
+Les résultats sont ceux des anciennes boucles, ordre des égalités compris
+(ordre du dictionnaire, puis première apparition pour les digrammes).
+"""
+
+import numpy as np
+
+SEPARATEUR = '\n'
+# Au-delà (alphabets très larges), les digrammes sont comptés par tri
+MAX_CASES_BINCOUNT = 1 << 22
+
+
+class StatistiquesLexique:
+    """Fréquences, longueurs et caractères d'un dictionnaire {mot: fréquence}"""
+
+    def __init__(self, dictionnaire):
+        self.dictionnaire = dictionnaire
+        self.mots = list(dictionnaire)
+        n = len(self.mots)
+        self.frequences = np.fromiter(dictionnaire.values(), dtype=np.int64, count=n)
+        self.longueurs = np.fromiter(map(len, self.mots), dtype=np.int64, count=n)
+        self.total = int(self.frequences.sum())
+
+        # Tous les mots bout à bout : position du mot i = debuts[i]
+        self._texte = SEPARATEUR.join(self.mots)
+        self._points = np.frombuffer(self._texte.encode('utf-32-le'), dtype=np.uint32)
+        self._debuts = np.zeros(n, dtype=np.int64)
+        if n:
+            np.cumsum(self.longueurs[:-1] + 1, out=self._debuts[1:])
+
+    def __len__(self):
+        return len(self.mots)
+
+    # ------------------------------------------------------------------
+    # Fréquences
+    # ------------------------------------------------------------------
+
+    @property
+    def type_token_ratio(self):
+        return len(self.mots) / self.total if self.total > 0 else 0
+
+    def effectif(self, minimum, maximum=None):
+        """Nombre de mots de fréquence comprise entre minimum et maximum (inclus)"""
+        masque = self.frequences >= minimum
+        if maximum is not None:
+            masque &= self.frequences <= maximum
+        return int(np.count_nonzero(masque))
+
+    def mots_pour_couvrir(self, part=0.8):
+        """Nombre minimal de mots (les plus fréquents) couvrant `part` des occurrences"""
+        if not len(self.mots):
+            return 0
+        cumul = np.cumsum(np.sort(self.frequences)[::-1])
+        return int(np.searchsorted(cumul, self.total * part)) + 1
+
+    def cumul_premiers(self, n):
+        """Occurrences cumulées des n premiers mots (ordre du dictionnaire)"""
+        return np.cumsum(self.frequences[:n])
+
+    def entropie(self):
+        """Entropie de Shannon de la distribution des mots, en bits"""
+        positives = self.frequences[self.frequences > 0]
+        if not positives.size:
+            return 0.0
+        p = positives / self.total
+        return float(-(p * np.log2(p)).sum())
+
+    # ------------------------------------------------------------------
+    # Longueurs et caractères
+    # ------------------------------------------------------------------
+
+    def histogramme_longueurs(self):
+        """[(longueur, nombre de mots)] par longueur croissante"""
+        comptes = np.bincount(self.longueurs)
+        longueurs = np.flatnonzero(comptes)
+        return list(zip(longueurs.tolist(), comptes[longueurs].tolist()))
+
+    def nombre_mots_longs(self, longueur_min=10):
+        return int(np.count_nonzero(self.longueurs >= longueur_min))
+
+    def mots_longs(self, longueur_min=10, limite=None):
+        """[(mot, longueur, fréquence)] par longueur décroissante, stable"""
+        indices = np.flatnonzero(self.longueurs >= longueur_min)
+        indices = indices[np.argsort(-self.longueurs[indices], kind='stable')][:limite]
+        return [(self.mots[i], int(self.longueurs[i]), int(self.frequences[i]))
+                for i in indices.tolist()]
+
+    def _mots_aux_positions(self, positions):
+        """Indices (triés, uniques) des mots contenant ces positions du flux"""
+        return np.unique(np.searchsorted(self._debuts, positions, side='right') - 1)
+
+    def masque_caracteres(self, caracteres):
+        """Masque des mots contenant au moins un des caractères"""
+        codes = np.array([ord(c) for c in caracteres], dtype=np.uint32)
+        positions = np.flatnonzero(np.isin(self._points, codes))
+        masque = np.zeros(len(self.mots), dtype=bool)
+        masque[self._mots_aux_positions(positions)] = True
+        return masque
+
+    def mots_contenant(self, caractere):
+        """Mots contenant `caractere`, dans l'ordre du dictionnaire"""
+        return [self.mots[i] for i in np.flatnonzero(self.masque_caracteres(caractere)).tolist()]
+
+    def masque_chiffres(self):
+        """Masque des mots contenant au moins un chiffre (au sens de str.isdigit)"""
+        chiffres = [c for c in set(self._texte) if c.isdigit()]
+        if not chiffres:
+            return np.zeros(len(self.mots), dtype=bool)
+        return self.masque_caracteres(chiffres)
+
+    def occurrences_caracteres(self, caracteres):
+        """{caractère: occurrences dans l'ensemble des mots}"""
+        return {c: self._texte.count(c) for c in caracteres}
+
+    def digrammes_frequents(self, n):
+        """[(digramme, nombre)] comme Counter.most_common : par nombre
+        décroissant, à égalité par première apparition"""
+        points = self._points
+        if points.size < 2 or n <= 0:
+            return []
+        # Caractères renumérotés de façon dense : une paire de caractères
+        # voisins tient alors dans un entier < A² et se compte par bincount,
+        # sans tri. Les paires à cheval sur deux mots (séparateur) sont écartées.
+        alphabet = np.flatnonzero(np.bincount(points))
+        table = np.full(int(alphabet[-1]) + 1, -1, dtype=np.int64)
+        table[alphabet] = np.arange(len(alphabet))
+        codes = table[points]
+        taille = len(alphabet)
+        cles = codes[:-1] * taille + codes[1:]
+        separateur = int(table[ord(SEPARATEUR)]) if ord(SEPARATEUR) < len(table) else -1
+
+        if taille * taille <= MAX_CASES_BINCOUNT:
+            comptes = np.bincount(cles, minlength=taille * taille)
+            presentes = np.flatnonzero(comptes)
+            comptes = comptes[presentes]
+        else:
+            presentes, comptes = np.unique(cles, return_counts=True)
+        valides = (presentes // taille != separateur) & (presentes % taille != separateur)
+        presentes, comptes = presentes[valides], comptes[valides]
+
+        # Seules les paires à égalité avec la n-ième ont besoin de leur
+        # première apparition pour être départagées
+        if len(comptes) > n:
+            seuil = np.partition(comptes, len(comptes) - n)[len(comptes) - n]
+            garder = comptes >= seuil
+            presentes, comptes = presentes[garder], comptes[garder]
+        selection = np.flatnonzero(np.isin(cles, presentes))
+        rangs = np.searchsorted(presentes, cles[selection])
+        premiers = np.full(len(presentes), len(cles), dtype=np.int64)
+        np.minimum.at(premiers, rangs, selection)
+        ordre = np.lexsort((premiers, -comptes))[:n]
+
+        resultat = []
+        for cle, compte in zip(presentes[ordre].tolist(), comptes[ordre].tolist()):
+            premier, second = divmod(cle, taille)
+            resultat.append((chr(alphabet[premier]) + chr(alphabet[second]), compte))
+        return resultat
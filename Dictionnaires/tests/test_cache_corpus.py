@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Instantanés du cache local du corpus (cache_corpus.py)"""
+
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cache_corpus import CacheCorpus
+
+DEPOT = "POTOMITAN/essai"
+
+
+def _fichier_local(tmp_path, textes):
+    chemin = tmp_path / "textes.json"
+    chemin.write_text(json.dumps([{"Texte": t, "Source": "Essai"} for t in textes]), encoding="utf-8")
+    return str(chemin)
+
+
+def test_tranches_sans_acces_par_indice(tmp_path):
+    cache = CacheCorpus(DEPOT, str(tmp_path / "cache"))
+    textes = cache.importer_json(_fichier_local(tmp_path, ["an", "de", "twa"]))
+
+    assert [t["Texte"] for t in textes[:2]] == ["an", "de"]
+    assert [t["Texte"] for t in textes] == ["an", "de", "twa"]
+    with pytest.raises(TypeError):
+        textes[1]
+
+
+def test_secours_repris_hors_ligne(tmp_path):
+    repertoire = str(tmp_path / "cache")
+    chemin = _fichier_local(tmp_path, ["an", "de"])
+    CacheCorpus(DEPOT, repertoire).importer_json(chemin)
+
+    # Exécution suivante, sans révision distante ni instantané du Hub
+    revision, textes = CacheCorpus(DEPOT, repertoire).dernier_instantane()
+    assert revision.startswith("local-")
+    assert [t["Texte"] for t in textes] == ["an", "de"]
+    assert CacheCorpus(DEPOT, repertoire).dernier_instantane(secours=False) == (None, None)
+
+    # Le fichier modifié hors ligne est relu
+    _fichier_local(tmp_path, ["an", "de", "twa"])
+    nouvelle, textes = CacheCorpus(DEPOT, repertoire).dernier_instantane()
+    assert nouvelle != revision
+    assert len(textes) == 3
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Comptage des n-grammes sur identifiants (comptage_ngrammes.py)"""
+
+import os
+import re
+import sys
+from collections import Counter
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from comptage_ngrammes import CompteurNgrammes, _kiemes_comptes, compter_en_parallele
+from tokenisation import decouper_mots, tokeniser_corpus
+
+PATTERN_MOT = re.compile(r'\b[a-zàèéò\-]{2,}\b')
+MOTS = ["an", "ka", "manjé", "diri", "yo", "dòmi", "bonnè", "lakay"]
+
+
+def _textes(graine, nombre):
+    generateur = np.random.default_rng(graine)
+    return [" ".join(generateur.choice(MOTS, generateur.integers(0, 12)))
+            for _ in range(nombre)]
+
+
+def test_kieme_compte_par_bloc_avec_egalites():
+    generateur = np.random.default_rng(7)
+    tailles = generateur.integers(4, 40, 300)
+    valeurs = generateur.geometric(0.4, int(tailles.sum())).astype(np.int64)
+
+    for k in (1, 3, 4):
+        attendus = [np.sort(bloc)[::-1][k - 1]
+                    for bloc in np.split(valeurs, np.cumsum(tailles)[:-1])]
+        assert _kiemes_comptes(valeurs, tailles, k).tolist() == attendus
+
+
+def test_cles_empaquetees_comme_counter():
+    """Mêmes comptes, et même ordre à égalité, que des Counter de tuples"""
+    textes = _textes(3, 200)
+    unigrammes, bigrammes, trigrammes = Counter(), Counter(), Counter()
+    for texte in textes:
+        mots = decouper_mots(texte, PATTERN_MOT)
+        unigrammes.update(mots)
+        bigrammes.update(zip(mots, mots[1:]))
+        trigrammes.update(zip(mots, mots[1:], mots[2:]))
+
+    corpus = tokeniser_corpus(textes, PATTERN_MOT)
+    compteur = CompteurNgrammes.depuis_corpus(corpus)
+    mot = corpus.vocabulaire
+
+    assert {mot[i]: int(n) for i, n in enumerate(compteur.unigrammes)} == unigrammes
+    assert {(mot[a], mot[b]): int(n) for (a, b), n
+            in zip(map(compteur.bigramme, range(compteur.nombre_bigrammes)),
+                   compteur.bigrammes_comptes)} == bigrammes
+    comptes_t = {}
+    for cle, n in zip(compteur.trigrammes_cles.tolist(), compteur.trigrammes_comptes):
+        a, b = compteur.bigramme(cle >> 32)
+        comptes_t[(mot[a], mot[b], mot[cle & 0xFFFFFFFF])] = int(n)
+    assert comptes_t == trigrammes
+
+    assert [((mot[a], mot[b]), n) for (a, b), n in compteur.bigrammes_plus_frequents(10)] \
+        == bigrammes.most_common(10)
+
+
+def test_comptage_parallele_identique_au_serie():
+    """--workers : fusion des tranches identique à un comptage en un morceau"""
+    textes = _textes(5, 300)
+    corpus = tokeniser_corpus(textes, PATTERN_MOT)
+    compteur = CompteurNgrammes.depuis_corpus(corpus)
+
+    for flux in (textes, iter(textes)):
+        corpus_p, compteur_p = compter_en_parallele(flux, PATTERN_MOT, 3)
+        assert corpus_p.vocabulaire == corpus.vocabulaire
+        assert corpus_p.ids == corpus.ids and corpus_p.bornes == corpus.bornes
+        assert corpus_p.nombre_textes == corpus.nombre_textes
+        for attribut in vars(compteur):
+            assert np.array_equal(getattr(compteur_p, attribut), getattr(compteur, attribut)), attribut
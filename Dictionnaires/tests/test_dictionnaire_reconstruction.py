@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Dictionnaire d'une reconstruction complète comparé à une reconstruction incrémentale"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from KreyolComplet import KreyolPipelineUnique
+from LuxembourgishComplet import LuxembourgishPipelineUnique
+
+PIPELINES = [
+    (KreyolPipelineUnique, "textes_kreyol",
+     ["an ka manjé diri", "yo ka dòmi bonnè", "an ka dòmi"],
+     {"ka": 40, "manjé": 12, "bonjou": 9}),
+    (LuxembourgishPipelineUnique, "textes_luxembourgeois",
+     ["ech sinn hei", "du bass do", "ech sinn do"],
+     {"sinn": 40, "hei": 12, "moien": 9}),
+]
+
+
+def _dictionnaire(classe, attribut, textes, dictionnaire, chemin_etat, complet):
+    """Un passage de creer_dictionnaire, l'état écrit ensuite dans `chemin_etat`"""
+    pipeline = classe()
+    setattr(pipeline, attribut, [{"Texte": texte} for texte in textes])
+    pipeline.dictionnaire_actuel = dict(dictionnaire)
+    pipeline.chemin_etat = chemin_etat
+    pipeline.recomptage_complet = complet
+    assert pipeline.creer_dictionnaire()
+    pipeline._sauvegarder_etat()
+    return pipeline.nouveau_dictionnaire
+
+
+@pytest.mark.parametrize("classe, attribut, textes, dictionnaire", PIPELINES)
+def test_reconstruction_complete_comme_incrementale(tmp_path, classe, attribut, textes, dictionnaire):
+    """Dictionnaire de départ non vide : fréquences stockées gonflées et un
+    mot ajouté à la main, absent du corpus"""
+    chemin_etat = str(tmp_path / "etat" / "corpus.npz")
+    premier = _dictionnaire(classe, attribut, textes, dictionnaire, chemin_etat, complet=True)
+
+    incremental = _dictionnaire(classe, attribut, textes, premier, chemin_etat, complet=False)
+    complet = _dictionnaire(classe, attribut, textes, premier, str(tmp_path / "absent.npz"), complet=True)
+
+    assert list(complet.items()) == list(incremental.items())
+    # Le même corpus relu ne change plus rien
+    assert complet == premier
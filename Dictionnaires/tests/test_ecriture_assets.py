@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Écriture atomique des assets dans plusieurs cibles (ecriture_assets.py)"""
+
+import gzip
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import ecriture_assets
+from ecriture_assets import ecrire_contenu
+
+
+def test_memes_octets_dans_chaque_cible(tmp_path):
+    cibles = [tmp_path / "flutter" / "kreyol.json", tmp_path / "android" / "kreyol.json"]
+    ecrire_contenu(b'{"an": 3}', [str(cible) for cible in cibles], compression="gzip")
+
+    for cible in cibles:
+        assert cible.read_bytes() == b'{"an": 3}'
+        assert gzip.decompress(cible.with_suffix(".json.gz").read_bytes()) == b'{"an": 3}'
+    assert not [nom for nom in os.listdir(tmp_path / "flutter") if nom.endswith(".tmp")]
+
+
+def test_echec_sans_temporaire_ni_cible_modifiee(tmp_path, monkeypatch):
+    """Un échec sur la seconde cible retire les temporaires déjà écrits et
+    laisse les anciens fichiers intacts"""
+    cibles = [tmp_path / "a.json", tmp_path / "b.json"]
+    for cible in cibles:
+        cible.write_bytes(b"ancien")
+
+    appels = []
+    fsync = os.fsync
+
+    def fsync_defaillant(descripteur):
+        appels.append(descripteur)
+        if len(appels) == 2:
+            raise OSError("disque plein")
+        fsync(descripteur)
+
+    monkeypatch.setattr(ecriture_assets.os, "fsync", fsync_defaillant)
+    with pytest.raises(OSError):
+        ecrire_contenu(b"nouveau", [str(cible) for cible in cibles])
+
+    assert sorted(os.listdir(tmp_path)) == ["a.json", "b.json"]
+    assert [cible.read_bytes() for cible in cibles] == [b"ancien", b"ancien"]
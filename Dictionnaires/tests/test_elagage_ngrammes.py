@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Élagage des n-grammes sous un budget d'octets (elagage_ngrammes.py)"""
+
+import os
+import re
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from comptage_ngrammes import CompteurNgrammes
+from ecriture_assets import octets_json
+from elagage_ngrammes import ElagueurNgrammes
+from tokenisation import decouper_mots, tokeniser_corpus
+
+PATTERN_MOT = re.compile(r'\b[a-zàèéò\-]{2,}\b')
+MOTS = ["an", "ka", "manjé", "diri", "yo", "dòmi", "bonnè", "lakay", "pou", "nou"]
+
+
+def _couverture(predictions, textes):
+    """Part des positions où le mot suivant est proposé, en lisant la clé à
+    deux mots si elle existe, sinon celle du dernier mot (comme le clavier)"""
+    servies = total = 0
+    for texte in textes:
+        mots = decouper_mots(texte, PATTERN_MOT)
+        for i in range(len(mots) - 1):
+            cle = f"{mots[i - 1]} {mots[i]}" if i else None
+            liste = predictions.get(cle) or predictions.get(mots[i], [])
+            servies += any(p["word"] == mots[i + 1] for p in liste)
+            total += 1
+    return servies / total
+
+
+def test_budget_et_couverture():
+    generateur = np.random.default_rng(17)
+    # Mots tirés selon une loi décroissante : des suites fréquentes et rares
+    poids = 1 / np.arange(1, len(MOTS) + 1)
+    textes = [" ".join(generateur.choice(MOTS, generateur.integers(2, 15), p=poids / poids.sum()))
+              for _ in range(400)]
+    corpus = tokeniser_corpus(textes, PATTERN_MOT)
+    compteur = CompteurNgrammes.depuis_corpus(corpus)
+    predictions, _ = compteur.predictions(corpus.vocabulaire, 0.0, 5)
+    elagueur = ElagueurNgrammes(predictions, compteur, corpus.index)
+
+    taille = octets_json(predictions)
+    elaguees, rapport = elagueur.elaguer()
+    assert elaguees == predictions and rapport["octets_apres"] == taille
+    assert rapport["couverture_avant"] == round(_couverture(predictions, textes), 4)
+
+    # Plus gros retrait possible : une clé avec toute sa liste
+    plus_gros_retrait = int(np.max(elagueur.octets_cles + np.bincount(
+        elagueur.contextes, weights=elagueur.octets_suites)))
+    couvertures = []
+    for budget in (taille * 3 // 4, taille // 2, taille // 4):
+        elaguees, rapport = elagueur.elaguer(max_octets=budget)
+        assert rapport["budget_respecte"]
+        assert rapport["octets_apres"] == octets_json(elaguees) <= budget
+        assert budget - rapport["octets_apres"] < plus_gros_retrait
+        assert rapport["couverture_apres"] == round(_couverture(elaguees, textes), 4)
+        for cle, candidats in elaguees.items():
+            assert all(p in predictions[cle] for p in candidats)
+        couvertures.append(rapport["couverture_apres"])
+    assert couvertures == sorted(couvertures, reverse=True)
+
+    elaguees, rapport = elagueur.elaguer(max_contextes=20)
+    assert len(elaguees) == rapport["contextes_apres"] <= 20
+    assert rapport["couverture_apres"] == round(_couverture(elaguees, textes), 4)
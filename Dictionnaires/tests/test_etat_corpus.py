@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Mise à jour incrémentale de l'état du corpus comparée à un recomptage complet"""
+
+import os
+import re
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from comptage_ngrammes import CompteurNgrammes
+from etat_corpus import EtatCorpus, empreinte_texte
+from tokenisation import tokeniser_corpus
+
+PATTERN_MOT = re.compile(r'\b[a-zàèéò\-]{2,}\b')
+
+TEXTES = [
+    "an ka manjé diri",
+    "yo ka dòmi",
+    "an ka dòmi bonnè",
+    "yo ka manjé diri",
+    "an ka dòmi",
+    "yo ka dòmi",
+]
+
+
+def _etat_complet(textes):
+    corpus = tokeniser_corpus(textes, PATTERN_MOT)
+    return EtatCorpus([empreinte_texte(t) for t in textes], corpus,
+                      CompteurNgrammes.depuis_corpus(corpus))
+
+
+def _sorties(etat):
+    vocabulaire = etat.corpus.vocabulaire
+    predictions, _ = etat.compteur.predictions(vocabulaire, 0.0, 5)
+    return vocabulaire, list(etat.comptes_mots().items()), predictions
+
+
+def _verifier(nouveaux_textes):
+    etat, bilan = _etat_complet(TEXTES).mettre_a_jour(nouveaux_textes, PATTERN_MOT)
+    assert _sorties(etat) == _sorties(_etat_complet(nouveaux_textes))
+    return bilan
+
+
+def test_retrait_departage_comme_un_recomptage():
+    """Sans « an ka manjé diri », « ka dòmi » devient le premier vu après « ka »"""
+    bilan = _verifier(TEXTES[1:] + ["an ka chanté"])
+    assert bilan == {'conserves': 5, 'nouveaux': 1, 'retires': 1}
+
+
+def test_retrait_d_un_texte_en_double():
+    """Le premier « yo ka dòmi » disparaît : c'est le second qui est conservé"""
+    bilan = _verifier(TEXTES[:1] + TEXTES[2:])
+    assert bilan == {'conserves': 5, 'nouveaux': 0, 'retires': 1}
+
+
+def test_texte_insere_au_milieu():
+    _verifier(TEXTES[:2] + ["yo ka chanté"] + TEXTES[2:])
+
+
+def test_ajout_en_fin():
+    bilan = _verifier(TEXTES + ["yo ka chanté bonnè"])
+    assert bilan == {'conserves': 6, 'nouveaux': 1, 'retires': 0}
@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Corrections par suppressions symétriques (index_corrections.py)"""
+
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from index_corrections import (IndexCorrections, ecrire_index_corrections, saisies_de_test,
+                               valider_index_corrections)
+
+
+def _dictionnaire(graine, nombre):
+    generateur = np.random.default_rng(graine)
+    lettres = list("abdeèéiklmnoòt")
+    dictionnaire = {"straße": 3, "strasse": 2, "lakay": 9, "lakày": 4}
+    while len(dictionnaire) < nombre:
+        mot = "".join(generateur.choice(lettres, generateur.integers(2, 8)))
+        dictionnaire[mot] = int(generateur.integers(1, 20))
+    return dictionnaire
+
+
+def test_corrections_comme_le_parcours_lineaire(tmp_path):
+    dictionnaire = _dictionnaire(13, 500)
+    chemin = str(tmp_path / "essai_corrections.bin")
+    ecrire_index_corrections(dictionnaire, chemin)
+
+    saisies = saisies_de_test(dictionnaire, 60) + ["strase", "straßen", "xtrage", "lakai", "zzzzzz"]
+    assert valider_index_corrections(chemin, dictionnaire, saisies) == []
+    with IndexCorrections(chemin) as index:
+        corrections = index.corriger("lakai")
+        assert corrections[0] == ("lakay", 9, 1) and ("lakày", 4, 1) in corrections
+        # Sans accents « xtrage » est à 3 de « strasse » : seule la passe
+        # directe retrouve « straße »
+        assert index.corriger("xtrage") == [("straße", 3, 2)]
+        assert index.corriger("zzzzzz") == []
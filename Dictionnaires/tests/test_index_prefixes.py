@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Complétion par l'index de préfixes (index_prefixes.py)"""
+
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from index_prefixes import IndexPrefixes, completions_reference, ecrire_index_prefixes, normaliser
+
+
+def _dictionnaire(graine, nombre):
+    generateur = np.random.default_rng(graine)
+    lettres = list("abdeèéiklmnoòt")
+    dictionnaire = {}
+    while len(dictionnaire) < nombre:
+        mot = "".join(generateur.choice(lettres, generateur.integers(1, 7)))
+        dictionnaire[mot] = int(generateur.integers(1, 20))
+    return dictionnaire
+
+
+def test_completions_comme_le_parcours_lineaire(tmp_path):
+    """K petit : la recherche passe par le trie puis filtre sous ses feuilles"""
+    dictionnaire = _dictionnaire(11, 400)
+    chemin = str(tmp_path / "essai_prefixes.bin")
+    ecrire_index_prefixes(dictionnaire, chemin, k=3)
+
+    formes = {normaliser(mot) for mot in dictionnaire}
+    prefixes = {f[:n] for f in formes for n in range(1, 5) if len(f) >= n}
+    attendus = completions_reference(dictionnaire, prefixes, k=3)
+    with IndexPrefixes(chemin) as index:
+        assert len(index) == len(dictionnaire)
+        for prefixe in prefixes:
+            assert index.completer(prefixe) == attendus[prefixe], prefixe
+        assert index.completer("È") == attendus["e"]
+        assert index.completer("zz") == []
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Kneser-Ney sur des comptes élagués par le comptage en mémoire bornée"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from comptage_borne import _compteur_depuis_tables
+from modele_kneser_ney import ModeleKneserNey
+
+VOCABULAIRE = ["an", "ka", "manjé", "dòmi"]
+
+
+def _cle(*ids):
+    cle = 0
+    for ident in ids:
+        cle = (cle << 32) | ident
+    return cle
+
+
+def _compteur_elague(comptes_b, comptes_t):
+    """Compteur construit comme par `compter_en_flux`, à partir de tables
+    dont des bigrammes suffixes ont été oubliés"""
+    premiers_b = {cle: rang for rang, cle in enumerate(comptes_b)}
+    premiers_t = {cle: rang for rang, cle in enumerate(comptes_t)}
+    return _compteur_depuis_tables([4, 4, 3, 1], comptes_b, premiers_b, comptes_t, premiers_t)
+
+
+def test_suffixes_oublies_apres_tous_les_bigrammes():
+    """« ka manjé » et « ka dòmi » oubliés, « an ka · » retenus"""
+    compteur = _compteur_elague({_cle(0, 1): 4},
+                                {_cle(0, 1, 2): 3, _cle(0, 1, 3): 1})
+
+    predictions, _ = ModeleKneserNey(compteur).predictions(VOCABULAIRE, 0.01, 5)
+
+    assert [c["word"] for c in predictions["an ka"]] == ["manjé", "dòmi"]
+    assert [c["word"] for c in predictions["an"]] == ["ka"]
+
+
+def test_suffixe_oublie_non_attribue_au_bigramme_suivant():
+    """« ka manjé » oublié : sa continuation ne va pas à « manjé an »"""
+    compteur = _compteur_elague({_cle(0, 1): 4, _cle(2, 0): 1},
+                                {_cle(0, 1, 2): 3})
+
+    modele = ModeleKneserNey(compteur)
+
+    assert not modele.bigrammes_continuation.observes.any()
+
+
+def test_egalite_departagee_par_premiere_apparition():
+    """« ka dòmi » vu avant « ka manjé », à compte égal : dòmi d'abord"""
+    comptes_b = {_cle(1, 2): 2, _cle(1, 3): 2}
+    premiers_b = {_cle(1, 3): 0, _cle(1, 2): 5}
+    compteur = _compteur_depuis_tables([0, 4, 2, 2], comptes_b, premiers_b, {}, {})
+
+    predictions, _ = ModeleKneserNey(compteur).predictions(VOCABULAIRE, 0.01, 5)
+
+    assert [c["word"] for c in predictions["ka"]] == ["dòmi", "manjé"]
@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Relecture du format binaire des n-grammes (ngrams_binaires.py)"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ngrams_binaires import LecteurNgramsBinaires, ecrire_ngrams_binaires, valider_ngrams_binaires
+
+PREDICTIONS = {
+    "ka": [{"word": "manjé", "probability": 0.5}, {"word": "dòmi", "probability": 0.25}],
+    "an ka": [{"word": "dòmi", "probability": 1.0}],
+    "zòrèy": [{"word": "ka", "probability": 0.333}, {"word": "an", "probability": 0.001}],
+    "é": [],
+}
+
+
+def test_relecture_identique(tmp_path):
+    chemin = str(tmp_path / "ngrams.bin")
+    taille = ecrire_ngrams_binaires(PREDICTIONS, chemin)
+
+    assert os.path.getsize(chemin) == taille
+    assert valider_ngrams_binaires(chemin, PREDICTIONS) == []
+    with LecteurNgramsBinaires(chemin) as lecteur:
+        assert len(lecteur) == len(PREDICTIONS)
+        assert lecteur.en_dict() == PREDICTIONS
+        assert "an ka" in lecteur and "manjé" not in lecteur
+        assert lecteur.candidats("ka") == PREDICTIONS["ka"]
+        assert lecteur.candidats("yo") == []
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tokenisation unique du corpus, partagée par les pipelines.
+
+Le corpus n'est découpé qu'une seule fois : chaque mot est interné dans un
+vocabulaire (mot -> identifiant entier) et le texte devient un flux compact
+d'identifiants `array('I')`. Les bornes des textes sont conservées pour que
+les n-grammes ne franchissent jamais la frontière entre deux textes.
+
+Le dictionnaire, les n-grammes et le rapport linguistique lisent tous ce même
+flux, au lieu de recompiler la regex et de re-tokeniser chaque texte.
+"""
+
+from array import array
+
+
+def contenu_texte(texte):
+    """Extrait la chaîne d'un élément du corpus (dict {"Texte": ...} ou chaîne)"""
+    if isinstance(texte, dict):
+        return texte.get("Texte", "") or ""
+    return str(texte) if texte is not None else ""
+
+
+class CorpusTokenise:
+    """Flux d'identifiants de mots avec les bornes de chaque texte"""
+
+    def __init__(self):
+        # identifiant -> mot, dans l'ordre de première apparition
+        self.vocabulaire = []
+        # mot -> identifiant
+        self.index = {}
+        # identifiants de tous les tokens, textes mis bout à bout
+        self.ids = array('I')
+        # bornes[k]:bornes[k+1] délimite le k-ième texte non vide
+        self.bornes = array('Q', [0])
+        self.nombre_textes = 0
+
+    def ajouter_texte(self, mots):
+        """Ajoute les mots d'un texte au flux (mots déjà normalisés)"""
+        index = self.index
+        vocabulaire = self.vocabulaire
+        ids = self.ids
+        for mot in mots:
+            ident = index.get(mot)
+            if ident is None:
+                ident = index[mot] = len(vocabulaire)
+                vocabulaire.append(mot)
+            ids.append(ident)
+        self.bornes.append(len(ids))
+
+    def segments(self):
+        """Itère sur les identifiants de chaque texte, sous forme de tranches"""
+        ids = self.ids
+        bornes = self.bornes
+        for k in range(len(bornes) - 1):
+            debut, fin = bornes[k], bornes[k + 1]
+            if fin > debut:
+                yield ids[debut:fin]
+
+    def mot(self, ident):
+        """Mot correspondant à un identifiant"""
+        return self.vocabulaire[ident]
+
+    @property
+    def total_tokens(self):
+        return len(self.ids)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __getstate__(self):
+        # L'index se reconstruit depuis le vocabulaire : inutile de le faire
+        # transiter entre processus.
+        etat = self.__dict__.copy()
+        del etat['index']
+        return etat
+
+    def __setstate__(self, etat):
+        self.__dict__.update(etat)
+        self.index = {mot: ident for ident, mot in enumerate(self.vocabulaire)}
+
+
+def decouper_mots(contenu, pattern_mot):
+    """Découpe un texte en mots normalisés (minuscules, sans tirets de bord)"""
+    mots = []
+    for mot in pattern_mot.findall(contenu.lower()):
+        mot = mot.strip('-')
+        if len(mot) >= 2:
+            mots.append(mot)
+    return mots
+
+
+def iterer_contenus(textes):
+    """Générateur des contenus non vides du corpus, un texte à la fois.
+
+    `textes` peut être une liste, un instantané du cache ou un autre
+    générateur : rien n'est matérialisé, seul le texte courant est en mémoire.
+    """
+    for texte in textes:
+        contenu = contenu_texte(texte)
+        if contenu:
+            yield contenu
+
+
+def tokeniser_corpus(textes, pattern_mot):
+    """Tokenise tout le corpus en une seule passe.
+
+    Les textes vides sont ignorés, exactement comme le faisaient les anciennes
+    boucles de `creer_dictionnaire` et `creer_ngrams`.
+    """
+    corpus = CorpusTokenise()
+    for contenu in iterer_contenus(textes):
+        corpus.ajouter_texte(decouper_mots(contenu, pattern_mot))
+        corpus.nombre_textes += 1
+    return corpus